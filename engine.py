@@ -8,11 +8,13 @@
 # agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
 # not expressly granted therein are reserved by Shotgun Software Inc.
 import logging
+import math
 import os
 import subprocess
 import sys
 import tempfile
 import threading
+import time
 import uuid
 import re
 
@@ -24,6 +26,53 @@ import sgtk
 from sgtk.util.filesystem import ensure_folder_exists
 
 
+def _get_interval_from_env(names, default):
+    """
+    Returns a positive number of seconds read from the first of the given
+    environment variables that is set, or the default if none is set or the
+    value isn't a positive number.
+
+    :param list names: The names of the environment variables, in order of
+        precedence.
+    :param float default: The default number of seconds.
+    """
+    for name in names:
+        if name in os.environ:
+            try:
+                value = float(os.environ[name])
+            except ValueError:
+                return default
+            return value if value > 0 and math.isfinite(value) else default
+    return default
+
+
+def _get_count_from_env(names, default):
+    """
+    Returns a positive whole number read from the first of the given
+    environment variables that is set, or the default if none is set or the
+    value isn't a positive whole number.
+
+    :param list names: The names of the environment variables, in order of
+        precedence.
+    :param int default: The default number.
+    """
+    for name in names:
+        if name in os.environ:
+            try:
+                value = int(os.environ[name])
+            except ValueError:
+                return default
+            return value if value > 0 else default
+    return default
+
+
+def _seconds_to_ms(seconds):
+    """
+    Returns a number of seconds as the whole milliseconds Qt timers expect.
+    """
+    return int(seconds * 1000.0)
+
+
 class PhotoshopCCEngine(sgtk.platform.Engine):
     """
     A Photoshop CC engine for Shotgun Toolkit.
@@ -37,25 +86,95 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
 
     # Backwards compatibility added to support tk-photoshop environment vars.
     # https://community.shotgridsoftware.com/t/adobe-engine-crashing-on-long-operations/8329
-    SHOTGUN_ADOBE_HEARTBEAT_INTERVAL = os.environ.get(
-        "SHOTGUN_ADOBE_HEARTBEAT_INTERVAL",
-        os.environ.get(
-            "SGTK_PHOTOSHOP_HEARTBEAT_INTERVAL",
-            1.0,
-        ),
+    SHOTGUN_ADOBE_HEARTBEAT_INTERVAL = _get_interval_from_env(
+        ["SHOTGUN_ADOBE_HEARTBEAT_INTERVAL", "SGTK_PHOTOSHOP_HEARTBEAT_INTERVAL"],
+        1.0,
     )
-    SHOTGUN_ADOBE_HEARTBEAT_TOLERANCE = os.environ.get(
-        "SHOTGUN_ADOBE_HEARTBEAT_TOLERANCE",
-        os.environ.get(
-            "SGTK_PHOTOSHOP_HEARTBEAT_TOLERANCE",
-            2,
-        ),
+    SHOTGUN_ADOBE_HEARTBEAT_TOLERANCE = _get_count_from_env(
+        ["SHOTGUN_ADOBE_HEARTBEAT_TOLERANCE", "SGTK_PHOTOSHOP_HEARTBEAT_TOLERANCE"],
+        2,
+    )
+    # The heartbeat interval above is used while there is activity on the
+    # connection. While it's idle, the interval doubles after each heartbeat,
+    # up to this ceiling, in seconds.
+    SHOTGUN_ADOBE_HEARTBEAT_MAX_INTERVAL = _get_interval_from_env(
+        ["SHOTGUN_ADOBE_HEARTBEAT_MAX_INTERVAL"], 10.0
     )
     SHOTGUN_ADOBE_NETWORK_DEBUG = (
         "SGTK_PHOTOSHOP_NETWORK_DEBUG" in os.environ
         or "SHOTGUN_ADOBE_NETWORK_DEBUG" in os.environ
     )
 
+    # Multi-step operations, like exporting a jpeg, are run as a single
+    # ExtendScript job in the host unless this is disabled, in which case each
+    # step is driven over RPC.
+    SHOTGUN_ADOBE_SCRIPTED_OPERATIONS = (
+        "SHOTGUN_ADOBE_DISABLE_SCRIPTED_OPERATIONS" not in os.environ
+    )
+
+    # State pushes to the panel requested within this many seconds of each
+    # other are coalesced into a single push of the latest state.
+    SHOTGUN_ADOBE_STATE_PUSH_INTERVAL = _get_interval_from_env(
+        ["SHOTGUN_ADOBE_STATE_PUSH_INTERVAL"], 0.1
+    )
+
+    # Active document changes received within this many seconds of each other
+    # are coalesced, so that only the document that is active once they settle
+    # has its context resolved.
+    SHOTGUN_ADOBE_DOCUMENT_CHANGE_INTERVAL = _get_interval_from_env(
+        ["SHOTGUN_ADOBE_DOCUMENT_CHANGE_INTERVAL"], 0.25
+    )
+
+    # Documents found not to be under any pipeline configuration are
+    # remembered for this many seconds, or until they're modified, rather than
+    # resolved again on every activation.
+    SHOTGUN_ADOBE_NEGATIVE_CONTEXT_TTL = _get_interval_from_env(
+        ["SHOTGUN_ADOBE_NEGATIVE_CONTEXT_TTL"], 300.0
+    )
+
+    # The contexts of the documents open when the engine starts are resolved
+    # from a background thread, at most one every this many seconds. Setting
+    # SHOTGUN_ADOBE_DISABLE_CONTEXT_PREFETCH turns this off.
+    SHOTGUN_ADOBE_CONTEXT_PREFETCH = (
+        "SHOTGUN_ADOBE_DISABLE_CONTEXT_PREFETCH" not in os.environ
+    )
+    SHOTGUN_ADOBE_CONTEXT_PREFETCH_INTERVAL = _get_interval_from_env(
+        ["SHOTGUN_ADOBE_CONTEXT_PREFETCH_INTERVAL"], 0.1
+    )
+
+    # Setting SHOTGUN_ADOBE_RPC_METRICS in the environment turns on recording
+    # of the call count, total time and latency percentiles of each RPC method
+    # used by the engine. The metrics are available through get_rpc_metrics()
+    # and are logged when the engine is destroyed. If
+    # SHOTGUN_ADOBE_RPC_METRICS_FILE is also set, they are written to that JSON
+    # file every SHOTGUN_ADOBE_RPC_METRICS_INTERVAL seconds. The file left by
+    # a previous session is rotated rather than overwritten, keeping the last
+    # few. When the switch isn't set, nothing is recorded and the bridge is
+    # left untouched.
+    SHOTGUN_ADOBE_RPC_METRICS = "SHOTGUN_ADOBE_RPC_METRICS" in os.environ
+    SHOTGUN_ADOBE_RPC_METRICS_FILE = os.environ.get("SHOTGUN_ADOBE_RPC_METRICS_FILE")
+    SHOTGUN_ADOBE_RPC_METRICS_INTERVAL = _get_interval_from_env(
+        ["SHOTGUN_ADOBE_RPC_METRICS_INTERVAL"], 60.0
+    )
+
+    # Messages received from the panel are handled for at most this many
+    # seconds per pass of the event loop. Whatever is left is handled on the
+    # next pass, so that a burst of messages doesn't freeze the UI.
+    SHOTGUN_ADOBE_MESSAGE_BUDGET = _get_interval_from_env(
+        ["SHOTGUN_ADOBE_MESSAGE_BUDGET"], 0.05
+    )
+
+    # Log messages forwarded to the panel are buffered and sent in batches.
+    # The buffer holds at most LOG_FORWARD_BUFFER_SIZE messages, dropping the
+    # oldest ones beyond that, and is flushed on each heartbeat or as soon as
+    # LOG_FORWARD_BATCH_SIZE messages are waiting.
+    LOG_FORWARD_BUFFER_SIZE = 1000
+    LOG_FORWARD_BATCH_SIZE = 100
+
+    # The schemas of at most this many of the projects recently worked in are
+    # loaded in the background at startup, most recent first.
+    SCHEMA_PREWARM_MAX_PROJECTS = 10
+
     TEST_SCRIPT_BASENAME = "run_tests.py"
 
     PY_TO_JS_LOG_LEVEL_MAPPING = {
@@ -68,22 +187,35 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
 
     _COMMAND_UID_COUNTER = 0
     _LOCK = threading.Lock()
-    _FAILED_PINGS = 0
-    _CONTEXT_CACHE = dict()
+    _CONTEXT_CACHE = None
     _CHECK_CONNECTION_TIMER = None
-    _CONTEXT_CHANGES_DISABLED = False
     _DIALOG_PARENT = None
     _WIN32_PHOTOSHOP_MAIN_HWND = None
     _PROXY_WIN_HWND = None
     _HEARTBEAT_DISABLED = False
     _PROJECT_CONTEXT = None
-    _CONTEXT_CACHE_KEY = "photoshopcc_context_cache"
 
     _HAS_CHECKED_CONTEXT_POST_LAUNCH = False
 
     ############################################################################
     # context changing
 
+    def pre_context_change(self, old_context, new_context):
+        """
+        Runs before a context change. Apps are reloaded as part of the change,
+        and will register their commands again.
+
+        :param old_context: The context being changed away from.
+        :param new_context: The context being changed to.
+        """
+        super().pre_context_change(old_context, new_context)
+
+        # commands registered after this point are matched back up with the
+        # uids they were given before the context change. the commands
+        # themselves are replaced, so they're indexed again as they register.
+        self.__command_registrations = dict()
+        self.__command_index.clear()
+
     def post_context_change(self, old_context, new_context):
         """
         Runs after a context change has occurred. This will trigger the
@@ -103,6 +235,8 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
         else:
             project_id = None
 
+        self.__add_recent_project(new_context)
+
         # callback to set the schema loaded flag
         def _on_schema_loaded():
             self.__schema_loaded = True
@@ -142,32 +276,126 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
         self.__jump_to_sg_command_id = self.__get_command_uid()
         self.__jump_to_fs_command_id = self.__get_command_uid()
 
+        # registered commands keep their uid across app reloads. we track how
+        # many times each command name has been registered since the last
+        # reload, and the uid given to each of those registrations.
+        self.__command_registrations = dict()
+        self.__command_uid_lookup = dict()
+
+        # registered commands by uid, so that a command triggered from the
+        # panel is found straight away.
+        self.__command_index = self.__tk_photoshopcc.CommandIndex()
+
         # get the adobe instance. it may have been initialized already by a
         # previous instance of the engine. if not, initialize a new one.
-        self._adobe = self.__tk_photoshopcc.AdobeBridge.get_or_create(
+        adobe = self.__tk_photoshopcc.AdobeBridge.get_or_create(
             identifier=self.instance_name,
             port=self.SHOTGUN_ADOBE_PORT,
             logger=self.logger,
             network_debug=self.SHOTGUN_ADOBE_NETWORK_DEBUG,
         )
 
+        # record rpc metrics if requested. the periodic dump to file, if any,
+        # is started once the apps are initialized.
+        self.__rpc_metrics = None
+        self.__rpc_metrics_timer = None
+        if self.SHOTGUN_ADOBE_RPC_METRICS:
+            self.__rpc_metrics = self.__tk_photoshopcc.RPCMetrics(adobe)
+            self.__rpc_metrics.install()
+
+        # log messages are forwarded to js in batches, and only if they're at
+        # or above the configured level for the panel. this needs to exist
+        # before the adobe attribute is set, since that is what enables the
+        # forwarding.
+        self.__js_log_levels = self.__get_js_log_levels()
+        self.__log_forwarder = self.__tk_photoshopcc.LogForwarder(
+            adobe,
+            buffer_size=self.LOG_FORWARD_BUFFER_SIZE,
+            batch_size=self.LOG_FORWARD_BATCH_SIZE,
+        )
+        self._adobe = adobe
+
         self.logger.debug("Network debug logging is %s" % self._adobe.network_debug)
 
+        # used to read several attributes of an Adobe object in one round trip
+        self.__property_snapshot = self.__tk_photoshopcc.PropertySnapshot(
+            self._adobe, self.logger
+        )
+
+        # tracks whether context changes are disabled, see
+        # context_changes_disabled().
+        self.__context_change_guard = self.__tk_photoshopcc.ContextChangeGuard()
+
+        # operations that run as a single job in the host
+        self.__export_as_jpeg_op = self.__tk_photoshopcc.ScriptedOperation(
+            self._adobe,
+            self.__tk_photoshopcc.EXPORT_AS_JPEG_SCRIPT,
+            self.logger,
+        )
+
+        # decides when to check the connection. the tolerance is expressed as
+        # a number of heartbeats at the base interval, which we turn into the
+        # length of time heartbeats are allowed to fail for.
+        self.__heartbeat = self.__tk_photoshopcc.HeartbeatScheduler(
+            min_interval=self.SHOTGUN_ADOBE_HEARTBEAT_INTERVAL,
+            max_interval=self.SHOTGUN_ADOBE_HEARTBEAT_MAX_INTERVAL,
+            tolerance=(
+                self.SHOTGUN_ADOBE_HEARTBEAT_TOLERANCE
+                * self.SHOTGUN_ADOBE_HEARTBEAT_INTERVAL
+            ),
+        )
+
         self.logger.debug("%s: Initializing..." % (self,))
 
-        # connect to all the adobe bridge signals
-        self.adobe.logging_received.connect(self._handle_logging)
-        self.adobe.command_received.connect(self._handle_command)
-        self.adobe.active_document_changed.connect(self._handle_active_document_change)
-        self.adobe.run_tests_request_received.connect(self._run_tests)
-        self.adobe.state_requested.connect(self.__send_state)
+        # state pushes are coalesced through a single shot timer. we keep
+        # track of how many requested pushes were folded into a later one.
+        self.__send_state_timer = None
+        self.__state_pushes_suppressed = 0
+
+        # active document changes are coalesced the same way. we keep the
+        # path of the latest document and count the switches skipped over.
+        self.__document_change_timer = None
+        self.__pending_document_path = None
+        self.__document_changes_skipped = 0
+
+        # a hash of the commands last sent to the panel, so that we only send
+        # them again when they change, and the context whose state the panel
+        # shows. both are forgotten whenever the panel clears its state.
+        self.__sent_commands_hash = None
+        self.__state_context = None
+
+        # connect to all the adobe bridge signals. their emissions are queued
+        # up and handled by the message pump, within a time budget per tick.
+        # user-facing messages share a lane so that they're handled in the
+        # order they arrived in. a command triggered right after a document
+        # switch must run in the new document's context. js log messages go
+        # last, and are handled all at once.
+        pump = self.__tk_photoshopcc.MessagePump(
+            self.SHOTGUN_ADOBE_MESSAGE_BUDGET, self.logger
+        )
+        pump.connect(self.adobe.command_received, self._handle_command, pump.NORMAL)
+        pump.connect(
+            self.adobe.active_document_changed,
+            self.__on_active_document_changed,
+            pump.NORMAL,
+        )
+        pump.connect(self.adobe.state_requested, self.__on_state_requested, pump.NORMAL)
+        pump.connect(
+            self.adobe.run_tests_request_received, self._run_tests, pump.NORMAL
+        )
+        pump.connect(
+            self.adobe.logging_received,
+            self._handle_logging_messages,
+            pump.LOW,
+            bulk=True,
+        )
+        self.__message_pump = pump
 
         # in order to use frameworks, they have to be imported via
         # import_module. so they're exposed in the bundled python. keep a handle
         # on them for reuse.
         self.__shotgun_data = self.__tk_photoshopcc.shotgun_data
         self.__shotgun_globals = self.__tk_photoshopcc.shotgun_globals
-        self.__settings = self.__tk_photoshopcc.shotgun_settings
 
         # import here since the engine is responsible for defining Qt.
         from sgtk.platform.qt import QtCore
@@ -177,8 +405,54 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
             QtCore.QCoreApplication.instance()
         )
 
-        # get outselves a settings manager where we can store metadata.
-        self.__settings_manager = self.__settings.UserSettings(self)
+        # documents' contexts are indexed on disk so that they survive panel
+        # extension restarts. the cache location is specific to the project,
+        # so the index only ever holds contexts in our project.
+        self.__context_index = self.__open_context_index()
+
+        # the projects recently worked in, whose schemas are loaded ahead of a
+        # switch to them. unlike the index, it's kept in the site's cache
+        # location so that it spans projects, and it's never cleared.
+        self.__recent_projects = self.__tk_photoshopcc.RecentProjects(
+            os.path.join(self.site_cache_location, "recent_projects.json"),
+            self.SCHEMA_PREWARM_MAX_PROJECTS + 1,
+            self.logger,
+        )
+
+        # documents' contexts are also cached in memory, up to the configured
+        # number of documents. contexts read back from the index stay
+        # serialized until their document is switched to. the cache is shared
+        # by all the engine's instances, so an existing one is only resized.
+        if PhotoshopCCEngine._CONTEXT_CACHE is None:
+            PhotoshopCCEngine._CONTEXT_CACHE = self.__tk_photoshopcc.ContextCache(
+                self.get_setting("context_cache_size"),
+                sgtk.Context.deserialize,
+            )
+        else:
+            self._CONTEXT_CACHE.resize(self.get_setting("context_cache_size"))
+
+        # checks and parses paths for our path templates, rejecting paths
+        # outside of a template's static part without parsing them.
+        self.__template_index = self.__tk_photoshopcc.TemplateIndex(self.sgtk)
+
+        # toolkit instances used to resolve contexts, one per pipeline
+        # configuration. ours is the one most documents will resolve with.
+        self.__toolkit_pool = self.__tk_photoshopcc.ToolkitPool(
+            sgtk.sgtk_from_path, self.logger
+        )
+        self.__toolkit_pool.add(self.sgtk)
+
+        # contexts of the open documents are prefetched once the apps are
+        # initialized. what it, and other startup work, achieved is recorded
+        # in the startup metrics.
+        self.__context_prefetcher = None
+        self.__startup_metrics = dict()
+
+        # documents outside of pipeline control, which resolve to the project
+        # context.
+        self.__non_pipeline_paths = self.__tk_photoshopcc.NegativeCache(
+            self.SHOTGUN_ADOBE_NEGATIVE_CONTEXT_TTL
+        )
 
         # connect the retriever signals
         self.__sg_data.work_completed.connect(self.__on_worker_signal)
@@ -189,6 +463,25 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
         self.__context_find_uid = None
         self.__context_thumb_uid = None
 
+        # entity records shown in the context header are cached, so that they
+        # can be shown again straight away. we keep track of the record being
+        # queried and the one on display, so that a refresh only updates the
+        # header if something changed. downloaded thumbnails are remembered
+        # per entity for the same reason.
+        self.__header_cache = self.__tk_photoshopcc.HeaderCache(
+            self.get_setting("context_header_cache_ttl"),
+            self.get_setting("context_header_cache_size"),
+        )
+        self.__context_find_key = None
+        self.__context_thumb_key = None
+        self.__context_thumb_speculative = False
+        self.__displayed_context_entity = None
+
+        # the html on display in the context header, so that it's only sent
+        # again when it changes. the panel clears the header when the context
+        # is about to change, which forgets it.
+        self.__context_display_html = None
+
         # keep track if sg global schema has been cached
         self.__schema_loaded = False
 
@@ -211,6 +504,7 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
                 pass
 
         self.__setup_connection_timer()
+        self.__setup_rpc_metrics_timer()
         self.__send_state()
 
         # forward the log file path back to the js side. this is used to direct
@@ -220,32 +514,28 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
 
         # If there's more than one document open at the time that the engine is
         # started up, then we're in a situation where we very likely were restarted.
-        # In that case, we need to try to retrieve a stored cache of serialized
-        # context objects from our settings manager. This will allow us to
-        # prepopulate our in-memory context cache with the contexts that were
-        # known prior to the extension restart.
+        # In that case, we prepopulate our in-memory context cache with the
+        # most recent contexts that were known prior to the extension restart.
+        # They're only deserialized when their document is switched to.
         if len(list(self.adobe.app.documents)) > 1:
-            self.logger.debug("Multiple documents found, loading stored context cache.")
-
-            serial_cache = self.__settings_manager.retrieve(
-                self._CONTEXT_CACHE_KEY,
-                dict(),
-                self.__settings_manager.SCOPE_PROJECT,
-            )
-
-            for key, value in serial_cache.items():
-                self._CONTEXT_CACHE[key] = sgtk.Context.deserialize(value)
-        else:
+            self.logger.debug("Multiple documents found, loading stored context index.")
+            self.__load_stored_contexts()
+        elif self.__context_index:
             # If there are fewer than 2 documents open, we don't need the stored
-            # cache, regardless of whether this is a restart situation or a fresh
+            # index, regardless of whether this is a restart situation or a fresh
             # launch of PS. In that case, we take the opportunity to clear anything
-            # that might exist in the stored cache, as it's data we don't need.
-            self.logger.debug("Single document found, clearing stored context cache.")
+            # that might exist in the stored index, as it's data we don't need.
+            self.logger.debug("Single document found, clearing stored context index.")
+            self.__context_index.clear()
 
-            self.__settings_manager.store(
-                self._CONTEXT_CACHE_KEY,
-                dict(),
-            )
+        # Resolve the contexts of the other open documents in the background,
+        # so that switching to them doesn't have to.
+        self.__start_context_prefetch()
+
+        # Load the schemas of the other projects recently worked in, so that
+        # switching to them doesn't wait on a schema download.
+        self.__prewarm_schemas()
+        self.__add_recent_project(self.context)
 
     def destroy_engine(self):
         """
@@ -261,6 +551,12 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
         if self._CHECK_CONNECTION_TIMER:
             self._CHECK_CONNECTION_TIMER.stop()
 
+        # Drop any state push or document change that is still waiting.
+        if self.__send_state_timer:
+            self.__send_state_timer.stop()
+        if self.__document_change_timer:
+            self.__document_change_timer.stop()
+
         # We're going to hide and force the garbage collection of any dialogs
         # that we know about. This will stop memory leaks, and is also prudent
         # since we're severing the socket.io connection that will allow them
@@ -269,6 +565,25 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
         for dialog in dialogs_still_opened:
             dialog.close()
 
+        # Stop resolving contexts in the background.
+        if self.__context_prefetcher:
+            self.__context_prefetcher.cancel()
+
+        # Report the rpc metrics for this session and stop recording them.
+        if self.__rpc_metrics:
+            if self.__rpc_metrics_timer:
+                self.__rpc_metrics_timer.stop()
+            self.__write_rpc_metrics()
+            self.logger.info("RPC metrics:\n%s" % self.__rpc_metrics.format())
+            self.__rpc_metrics.uninstall()
+
+        # Send any log messages still waiting to be forwarded.
+        self.__log_forwarder.flush()
+
+        # Close the stored context index.
+        if self.__context_index:
+            self.__context_index.close()
+
         # Gracefully stop our data retriever. This call will block until the
         # currently-processing request has completed.
         self.__sg_data.stop()
@@ -279,13 +594,10 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
         # Disconnect the signals in case there are references to this engine
         # out there. without disconnecting, it will still respond to signals
         # from the adobe bridge.
-        self.adobe.logging_received.disconnect(self._handle_logging)
-        self.adobe.command_received.disconnect(self._handle_command)
-        self.adobe.active_document_changed.disconnect(
-            self._handle_active_document_change
+        self.logger.debug(
+            "Message pump metrics: %s" % (self.__message_pump.get_metrics(),)
         )
-        self.adobe.run_tests_request_received.disconnect(self._run_tests)
-        self.adobe.state_requested.disconnect(self.__send_state)
+        self.__message_pump.disconnect()
 
     def post_qt_init(self):
         """
@@ -309,11 +621,130 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
     def register_command(self, name, callback, properties=None):
         """
         Registers a new command with the engine. For Adobe RPC purposes,
-        a "uid" property is added to the command's properties.
+        a "uid" property is added to the command's properties. A command that
+        is registered again when apps are reloaded on a context change gets
+        the same uid back, so the commands sent to the panel stay the same.
         """
         properties = properties or dict()
-        properties["uid"] = self.__get_command_uid()
-        return super().register_command(name, callback, properties)
+        properties["uid"] = self.__get_registered_command_uid(name)
+        result = super().register_command(name, callback, properties)
+
+        # index the command's entry by its uid. the entry is stored under the
+        # given name, unless the name clashed with another command's.
+        command = self.commands.get(name)
+        if command is None or command.get("properties") is not properties:
+            command = next(
+                (
+                    c
+                    for c in self.commands.values()
+                    if c.get("properties") is properties
+                ),
+                None,
+            )
+        if command is not None:
+            self.__command_index.add(command)
+
+        return result
+
+    def snapshot(self, proxy, attr_paths):
+        """
+        Reads several attributes of an Adobe object in a single RPC round
+        trip, rather than one round trip per attribute read.
+
+        Attribute paths are dot separated, so ``"width.value"`` returns the
+        same thing as ``proxy.width.value``. Paths that can't be resolved
+        map to ``None``. Values that aren't strings, numbers or booleans are
+        returned in their string form.
+
+        :param proxy: The Adobe proxy object to read attributes from.
+        :param list attr_paths: The attribute paths to read.
+        :returns: A dictionary mapping each attribute path to its value.
+        """
+        return self.__property_snapshot.snapshot(proxy, attr_paths)
+
+    def get_rpc_metrics(self):
+        """
+        Returns the call count, total time and latency percentiles recorded
+        for each RPC method, keyed by method name. Times are in seconds.
+
+        Metrics are only recorded when ``SHOTGUN_ADOBE_RPC_METRICS`` is set in
+        the environment.
+
+        :returns: A dictionary of metrics, or ``None`` if they aren't enabled.
+        """
+        if not self.__rpc_metrics:
+            return None
+        return self.__rpc_metrics.get_metrics()
+
+    def get_message_pump_metrics(self):
+        """
+        Returns the metrics of the pump handling the messages received from
+        the panel: the number of messages waiting, the most that were ever
+        waiting, the number handled, and the time spent per tick. Counters are
+        also broken down per priority lane. Times are in seconds.
+
+        :returns: A dictionary of metrics.
+        """
+        return self.__message_pump.get_metrics()
+
+    def get_template_fields(self, template, path):
+        """
+        Returns the fields of a path for a template, like
+        ``template.get_fields(path)``. Fields are remembered, so asking again
+        for the same path, as publish plugins do from their accept, validate
+        and publish methods, doesn't parse it again.
+
+        :param template: The template to get the fields for.
+        :param str path: The path to get the fields of.
+        :returns: A dictionary of fields.
+        :raises TankError: If the path doesn't match the template.
+        """
+        return self.__template_index.get_fields(template, path)
+
+    def validate_template_path(self, template, path):
+        """
+        Returns ``True`` if the path matches the template, like
+        ``template.validate(path)``. Paths outside of the template's static
+        part are rejected without being parsed.
+
+        :param template: The template to match.
+        :param str path: The path to match.
+        """
+        return self.__template_index.validate(template, path)
+
+    def get_startup_metrics(self):
+        """
+        Returns what the work done in the background after the engine started
+        achieved. ``contexts_warmed`` is the number of open documents whose
+        context was prefetched, ``contexts_prefetch_failed`` the number that
+        couldn't be resolved, and ``contexts_prefetch_time`` the time the
+        prefetch took, in seconds. ``schemas_warmed`` is the number of other
+        projects whose schema was loaded ahead of a switch to them, and
+        ``schemas_prewarm_time`` the time that took, in seconds. Keys are only
+        present once the work is done.
+
+        :returns: A dictionary of metrics.
+        """
+        return dict(self.__startup_metrics)
+
+    def get_context_cache_stats(self):
+        """
+        Returns the statistics of the in-memory cache of document contexts:
+        its current and maximum size, and the number of hits, misses,
+        evictions and deferred deserializations so far. ``negative_hits`` is
+        the number of activations of documents outside of pipeline control
+        that were resolved to the project context without looking them up.
+        ``toolkit_pool`` holds the statistics of the Toolkit API instances
+        reused to resolve contexts.
+
+        The maximum size is set by the ``context_cache_size`` engine setting.
+
+        :returns: A dictionary of statistics.
+        """
+        stats = self._CONTEXT_CACHE.get_stats()
+        stats["negative_hits"] = self.__non_pipeline_paths.hits
+        stats["toolkit_pool"] = self.__toolkit_pool.get_stats()
+        return stats
 
     def export_as_jpeg(
         self, document=None, output_path=None, max_size=2048, quality=12
@@ -330,108 +761,30 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
         :returns: The full path to the exported image.
         :raises: RuntimeError if the document or its size can't be retrieved.
         """
-        adobe = self.adobe
-
-        # Get some current values so we can restore them.
-        original_ruler_units = adobe.app.preferences.rulerUnits
-        original_dialog_mode = adobe.app.displayDialogs
-
         # If no output_path was given, use a temp file.
         jpeg_pub_path = output_path or os.path.join(
             tempfile.gettempdir(), "%s_sgtk.jpg" % uuid.uuid4().hex
         )
 
-        with self.context_changes_disabled():
-            try:
-                # Set unit system to pixels:
-                adobe.app.preferences.rulerUnits = adobe.Units.PIXELS
-                # Disable dialogs.
-                adobe.app.displayDialogs = adobe.DialogModes.NO
-
-                try:
-                    active_doc = document or adobe.app.activeDocument
-                except RuntimeError as e:
-                    # Exceptions reported by Photoshop CEP through the RPC API
-                    # are pretty useless, so catch the error, raise our own exception
-                    # but still log the original exception for debug purpose.
-                    self.logger.debug(
-                        "Unable to retrieve a document: %s" % e,
-                        exc_info=True,  # Get traceback automatically
-                    )
-                    raise RuntimeError("Unable to retrieve a document")
-
-                orig_name = active_doc.name
-                width_str = str(active_doc.width.value)
-                height_str = str(active_doc.height.value)
-
-                # Get a temp document name so we can manipulate the document without
-                # affecting the original docuement.
-                name, sfx = os.path.splitext(orig_name)
-                # a "." is included in the extension returned by splitext
-                jpeg_name = "%s_tkjpeg%s" % (name, sfx)
-
-                # Find the doc size in pixels
-                # Note: this doesn't handle measurements other than pixels.
-                doc_width = doc_height = 0
-                # It seems we used to get back "<size> px" but now we receive back
-                # just a number, so let's have the " px" bit optional.
-                exp = re.compile("^(?P<value>[0-9]+)( px)?$")
-                mo = exp.match(width_str)
-                if mo:
-                    doc_width = int(mo.group("value"))
-                mo = exp.match(height_str)
-                if mo:
-                    doc_height = int(mo.group("value"))
-
-                jpeg_width = jpeg_height = 0
-                if doc_width and doc_height:
-                    max_sz = max(doc_width, doc_height)
-                    if max_sz > max_size:
-                        scale = min(float(max_size) / float(max_sz), 1.0)
-                        jpeg_width = max(min(int(doc_width * scale), doc_width), 1)
-                        jpeg_height = max(min(int(doc_height * scale), doc_height), 1)
-                else:
-                    raise RuntimeError(
-                        "Unable to retrieve document size from %s x %s "
-                        % (
-                            width_str,
-                            height_str,
-                        )
-                    )
-
-                # Get a file object from Photoshop for this path and the current
-                # jpg save options:
-                jpeg_file = adobe.File(jpeg_pub_path)
-                jpeg_options = adobe.JPEGSaveOptions()
-                jpeg_options.quality = quality
-
-                # duplicate the original doc:
-                save_options = adobe.SaveOptions.DONOTSAVECHANGES
-                jpeg_doc = active_doc.duplicate(jpeg_name)
-
-                try:
-                    # Flatten image:
-                    jpeg_doc.flatten()
-                    # Convert to eight bits
-                    jpeg_doc.bitsPerChannel = adobe.BitsPerChannelType.EIGHT
-                    # Resize if needed:
-                    if jpeg_width and jpeg_height:
-                        jpeg_doc.resizeImage(
-                            "%d px" % jpeg_width, "%d px" % jpeg_height
-                        )
-                    # Save:
-                    jpeg_doc.saveAs(jpeg_file, jpeg_options, True)
-
-                finally:
-                    # Close the doc:
-                    jpeg_doc.close(save_options)
+        # Run the whole export as a single job in the host when we can. If
+        # that fails for any reason, we fall back to driving the export step
+        # by step over RPC.
+        if self.SHOTGUN_ADOBE_SCRIPTED_OPERATIONS:
+            operation = self.__export_as_jpeg_op
+        else:
+            operation = None
 
-            finally:
-                # Set units back to original
-                adobe.app.preferences.rulerUnits = original_ruler_units
-                # Set dialog mode back to original.
-                adobe.app.displayDialogs = original_dialog_mode
-        return jpeg_pub_path
+        with self.context_changes_disabled():
+            return self.__tk_photoshopcc.export_as_jpeg(
+                self.adobe,
+                operation,
+                document,
+                jpeg_pub_path,
+                max_size,
+                quality,
+                self.snapshot,
+                self.logger,
+            )
 
     def generate_thumbnail(self, document=None, output_path=None):
         """
@@ -467,7 +820,7 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
         """
         Save the document in place
         """
-        if document.saved:
+        if self.snapshot(document, ["saved"])["saved"]:
             # since Photoshop 24.1.0, saving an already saved file triggers errors
             return
 
@@ -601,17 +954,20 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
             # Don't error out if the bridge was not yet started
             return ("Adobe Photoshop", "unknown")
 
-        version = self.adobe.app.version
+        app_info = self.snapshot(
+            self.adobe.app, ["name", "version", "systemInformation"]
+        )
+        version = app_info["version"]
         # app.version just returns 18.1.1 which is not what users see in the UI
         # extract a more meaningful version from the systemInformation property
         # which gives something like:
         # Adobe Photoshop Version: 2017.1.1 20170425.r.252 2017/04/25:23:00:00 CL 1113967  x64\rNumber of .....
         # and use it instead if available.
-        m = re.search("Version:\\s+([\\.0-9]+)", self.adobe.app.systemInformation)
+        m = re.search("Version:\\s+([\\.0-9]+)", app_info["systemInformation"] or "")
         if m:
             version = m.group(1)
         return {
-            "name": self.adobe.app.name,
+            "name": app_info["name"],
             "version": version,
         }
 
@@ -644,24 +1000,36 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
 
     def _check_connection(self):
         """Make sure we are still connected to the adobe cc product."""
+        # Forward any log messages buffered since the last tick.
+        self.__log_forwarder.flush()
+
         # If we're in a disabled state, then we don't do anything here. This
         # is controlled by the heartbeat_disabled context manager provided
         # by this engine.
         if self._HEARTBEAT_DISABLED:
             return
 
-        try:
-            self.adobe.ping()
-        except Exception:
-            if self._FAILED_PINGS >= self.SHOTGUN_ADOBE_HEARTBEAT_TOLERANCE:
-                from sgtk.platform.qt import QtCore
-
-                QtCore.QCoreApplication.instance().quit()
+        # The timer always ticks at the minimum interval so that messages
+        # are handled promptly. Only the ping backs off while the connection
+        # is idle.
+        connected = True
+        if self.__heartbeat.is_due():
+            try:
+                self.adobe.ping()
+            except Exception:
+                connected = False
+                # Heartbeats have been failing for too long, so we assume the
+                # panel is gone.
+                if self.__heartbeat.failure():
+                    from sgtk.platform.qt import QtCore
+
+                    QtCore.QCoreApplication.instance().quit()
             else:
-                self._FAILED_PINGS += 1
-        else:
-            self._FAILED_PINGS = 0
+                # The connection is idle, so the next heartbeat can wait
+                # longer.
+                self.__heartbeat.idle()
 
+        if connected:
             # Will allow queued up messages (like logging calls)
             # to be handled on the Python end.
             self.adobe.process_new_messages()
@@ -721,10 +1089,15 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
         # If the _adobe attribute is set, then we can forward logging calls
         # back to the js process via rpc.
         if hasattr(self, "_adobe"):
-            level = self.PY_TO_JS_LOG_LEVEL_MAPPING[record.levelname]
+            # Only levels at or above the panel's threshold are in the lookup,
+            # so this filters out messages the panel won't show before they
+            # are formatted.
+            level = self.__js_log_levels.get(record.levelno)
+            if level is None:
+                return
 
-            # log the message back to js via rpc
-            self.adobe.log_message(level, record.getMessage())
+            # buffer the message to be logged back to js via rpc
+            self.__log_forwarder.add(level, record.getMessage())
 
         # prior to the _adobe attribute being set, we rely on the js process
         # handling stdout and logging it.
@@ -745,6 +1118,8 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
 
         :returns: True if the context changed, False if it did not.
         """
+        self.__on_connection_activity()
+
         # If the config says to not change context on active document change, then
         # we don't do anything here.
         if not self.get_setting("automatic_context_switch"):
@@ -764,7 +1139,7 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
         # might be triggering active document changes that we don't want to
         # result in PTR context changes.
         with self.heartbeat_disabled():
-            if self._CONTEXT_CHANGES_DISABLED:
+            if self.__context_change_guard.disabled:
                 self.logger.debug(
                     "Engine is in 'no context changes' mode. Not changing context."
                 )
@@ -780,13 +1155,18 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
                 return False
 
             cached_context = self.__get_from_context_cache(active_document_path)
+            context = None
 
             if cached_context:
                 context = cached_context
                 self.logger.debug("Document found in context cache: %r" % context)
+            elif self.__non_pipeline_paths.contains(active_document_path):
+                self.logger.debug(
+                    "Document recently found to be outside of PTR control."
+                )
             else:
                 try:
-                    context = sgtk.sgtk_from_path(
+                    context = self.__get_toolkit(
                         active_document_path
                     ).context_from_path(
                         active_document_path,
@@ -795,22 +1175,26 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
                     self.add_to_context_cache(active_document_path, context)
                 except Exception:
                     self.logger.debug(
-                        "Unable to determine context from path. Setting the Project context."
+                        "Unable to determine context from path.", exc_info=True
                     )
-                    # clear the context finding task ids so that any tasks that
-                    # finish won't send data to js.
-                    self.__context_find_uid = None
-                    self.__context_thumb_uid = None
 
-                    # We go to the project context if this is a file outside of
-                    # PTR control.
-                    if self._PROJECT_CONTEXT is None:
-                        self._PROJECT_CONTEXT = sgtk.Context(
-                            tk=self.context.sgtk,
-                            project=self.context.project,
-                        )
+            if context is None:
+                self.logger.debug("Setting the Project context.")
+
+                # clear the context finding task ids so that any tasks that
+                # finish won't send data to js.
+                self.__context_find_uid = None
+                self.__context_thumb_uid = None
 
-                    context = self._PROJECT_CONTEXT
+                # We go to the project context if this is a file outside of
+                # PTR control.
+                if self._PROJECT_CONTEXT is None:
+                    self._PROJECT_CONTEXT = sgtk.Context(
+                        tk=self.context.sgtk,
+                        project=self.context.project,
+                    )
+
+                context = self._PROJECT_CONTEXT
 
             if not context.project:
                 self.logger.debug(
@@ -820,7 +1204,7 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
                 return False
 
             if context and context != self.context:
-                self.adobe.context_about_to_change()
+                self.__context_about_to_change()
                 sgtk.platform.change_context(context)
                 return True
 
@@ -834,6 +1218,11 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
         """
 
         self.logger.debug("Handling command request for uid: %s" % (uid,))
+        self.__on_connection_activity()
+
+        # the command was triggered for the document that is active now, so
+        # switch to its context first if the switch is still pending.
+        self.__flush_pending_document_change()
 
         with self.heartbeat_disabled():
             from sgtk.platform.qt import QtGui
@@ -846,15 +1235,25 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
                 self._jump_to_sg()
             else:
                 # a registered command was triggered
-                for command in self.commands.values():
-                    if command.get("properties", dict()).get("uid") == uid:
-                        self.logger.debug(
-                            "Executing callback for command: %s" % (command,)
-                        )
-                        result = command["callback"]()
-                        if isinstance(result, QtGui.QWidget):
-                            # if the callback returns a widget, keep a handle on it
-                            self.__qt_dialogs.append(result)
+                command = self.__command_index.get(uid)
+                if command is None:
+                    # the index may be out of step with the registered
+                    # commands, such as mid context change. index them again
+                    # before giving up on the command.
+                    self.__command_index.rebuild(self.commands.values())
+                    command = self.__command_index.get(uid)
+
+                if command is None:
+                    self.logger.error(
+                        "Unable to find a registered command with uid: %s" % (uid,)
+                    )
+                    return
+
+                self.logger.debug("Executing callback for command: %s" % (command,))
+                result = command["callback"]()
+                if isinstance(result, QtGui.QWidget):
+                    # if the callback returns a widget, keep a handle on it
+                    self.__qt_dialogs.append(result)
 
     def _handle_logging(self, level, message):
         """
@@ -863,22 +1262,39 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
         :param str level: One of "debug", "info", "warning", or "error".
         :param str message: The log message.
         """
+        self.__on_connection_activity()
 
-        # manually create a record to log to the standard file handler.
-        # we format it to match the regular logs, but tack on the '.js' to
-        # indicate that it came from javascript.
-        record = logging.makeLogRecord(
-            {
-                "levelname": level.upper(),
-                "name": "%s.js" % (self.logger.name,),
-                "msg": message,
-            }
-        )
+        self._handle_logging_messages([(level, message)])
+
+    def _handle_logging_messages(self, messages):
+        """
+        Handles a batch of RPC logging requests.
 
-        # forward this message to the base file handler so that it is logged
-        # appropriately.
-        if sgtk.LogManager().base_file_handler:
-            sgtk.LogManager().base_file_handler.handle(record)
+        :param list messages: A list of (level, message) tuples, in the order
+            they were received.
+        """
+        self.__on_connection_activity()
+
+        # forward the messages to the base file handler so that they are
+        # logged appropriately.
+        handler = sgtk.LogManager().base_file_handler
+        if not handler:
+            return
+
+        name = "%s.js" % (self.logger.name,)
+
+        for level, message in messages:
+            # manually create a record to log to the standard file handler.
+            # we format it to match the regular logs, but tack on the '.js' to
+            # indicate that it came from javascript.
+            record = logging.makeLogRecord(
+                {
+                    "levelname": level.upper(),
+                    "name": name,
+                    "msg": message,
+                }
+            )
+            handler.handle(record)
 
     def _run_tests(self):
         """
@@ -957,6 +1373,23 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
         """
         return self.SHOTGUN_ADOBE_APPID
 
+    @property
+    def state_pushes_suppressed(self):
+        """
+        The number of requested state pushes that were coalesced into a later
+        push rather than sent on their own. Useful for diagnostics.
+        """
+        return self.__state_pushes_suppressed
+
+    @property
+    def document_changes_skipped(self):
+        """
+        The number of active document changes that were superseded by a later
+        one before they settled, and so never had their context resolved.
+        Useful for diagnostics.
+        """
+        return self.__document_changes_skipped
+
     @property
     def context_change_allowed(self):
         """
@@ -974,10 +1407,13 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
         them on exit. This is useful in apps that might be performing operations
         that require changes in the active document that don't want to trigger
         a context change.
+
+        It can be nested, such as around engine methods that use it
+        themselves. Context changes are enabled again once the outermost
+        block exits.
         """
-        self._CONTEXT_CHANGES_DISABLED = True
-        yield
-        self._CONTEXT_CHANGES_DISABLED = False
+        with self.__context_change_guard.disable():
+            yield
 
     @contextmanager
     def heartbeat_disabled(self):
@@ -1288,6 +1724,45 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
             self._COMMAND_UID_COUNTER += 1
             return self._COMMAND_UID_COUNTER
 
+    def __get_js_log_levels(self):
+        """
+        Returns a lookup of python log level numbers to js log levels,
+        containing only the levels that should be forwarded to the panel
+        according to the ``panel_log_level`` setting.
+        """
+        setting_value = self.get_setting("panel_log_level")
+        threshold = logging.getLevelName(str(setting_value).upper())
+
+        if not isinstance(threshold, int):
+            self.logger.warning(
+                "Unknown panel_log_level '%s'. Forwarding all messages to the "
+                "panel." % (setting_value,)
+            )
+            threshold = logging.DEBUG
+
+        js_log_levels = dict()
+        for level_name, js_level in self.PY_TO_JS_LOG_LEVEL_MAPPING.items():
+            level = logging.getLevelName(level_name)
+            if level >= threshold:
+                js_log_levels[level] = js_level
+
+        return js_log_levels
+
+    def __get_registered_command_uid(self, name):
+        """
+        Returns the uid for a command being registered with the given name.
+        The nth registration of a name since apps were last reloaded always
+        gets the same uid.
+        """
+        occurrence = self.__command_registrations.get(name, 0)
+        self.__command_registrations[name] = occurrence + 1
+
+        key = (name, occurrence)
+        if key not in self.__command_uid_lookup:
+            self.__command_uid_lookup[key] = self.__get_command_uid()
+
+        return self.__command_uid_lookup[key]
+
     def __get_icon_path(self, properties):
         """
         Processes the command properties dictionary to find the most appropriate
@@ -1333,13 +1808,98 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
 
         return icon_path
 
+    def __on_active_document_changed(self, active_document_path):
+        """
+        Schedules the context of the new active document to be resolved.
+
+        Changes received while one is already scheduled restart the wait and
+        replace it, so that only the document that is active once the changes
+        settle is handled.
+
+        :param str active_document_path: The path to the new active document.
+        """
+        from sgtk.platform.qt import QtCore
+
+        self.__on_connection_activity()
+
+        if self.__document_change_timer is None:
+            self.__document_change_timer = QtCore.QTimer(
+                parent=QtCore.QCoreApplication.instance(),
+            )
+            self.__document_change_timer.setSingleShot(True)
+            self.__document_change_timer.timeout.connect(
+                self.__handle_pending_document_change
+            )
+
+        if self.__document_change_timer.isActive():
+            self.__document_changes_skipped += 1
+            self.logger.debug(
+                "Skipping active document change to %s (%d skipped so far)."
+                % (self.__pending_document_path, self.__document_changes_skipped)
+            )
+
+        self.__pending_document_path = active_document_path
+
+        self.__document_change_timer.start(
+            _seconds_to_ms(self.SHOTGUN_ADOBE_DOCUMENT_CHANGE_INTERVAL),
+        )
+
+    def __flush_pending_document_change(self):
+        """
+        Handles a scheduled active document change straight away, if there is
+        one, rather than once the changes settle.
+        """
+        if self.__document_change_timer and self.__document_change_timer.isActive():
+            self.__document_change_timer.stop()
+            self.__handle_pending_document_change()
+
+    def __handle_pending_document_change(self):
+        """
+        Handles the active document change that settled.
+        """
+        active_document_path = self.__pending_document_path
+        self.__pending_document_path = None
+        self._handle_active_document_change(active_document_path)
+
     def __send_state(self):
+        """
+        Schedules the current state to be sent back to javascript.
+
+        Requests made while a push is already scheduled restart the wait and
+        are coalesced into that push, so that the state is only computed and
+        sent once, after the requests settle.
+        """
+        from sgtk.platform.qt import QtCore
+
+        if self.__send_state_timer is None:
+            self.__send_state_timer = QtCore.QTimer(
+                parent=QtCore.QCoreApplication.instance(),
+            )
+            self.__send_state_timer.setSingleShot(True)
+            self.__send_state_timer.timeout.connect(self.__send_state_now)
+
+        if self.__send_state_timer.isActive():
+            self.__state_pushes_suppressed += 1
+            self.logger.debug(
+                "State push already scheduled. Coalescing (%d suppressed so far)."
+                % self.__state_pushes_suppressed
+            )
+
+        self.__send_state_timer.start(
+            _seconds_to_ms(self.SHOTGUN_ADOBE_STATE_PUSH_INTERVAL),
+        )
+
+    def __send_state_now(self):
         """
         Sends information back to javascript representing the current context.
         """
         # alert js that the state is about to change. this allows the panel to
-        # clear its current state and display a loading message.
-        self.adobe.context_about_to_change()
+        # clear its current state and display a loading message. when the
+        # panel already shows this context, it's left as is, and only what
+        # changed is sent again.
+        if self.__state_context is None or self.__state_context != self.context:
+            self.__context_about_to_change()
+        self.__state_context = self.context
 
         # ---- process the context for display
 
@@ -1483,7 +2043,52 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
         }
 
         # send the commands back to adobe
+        self.__send_commands(all_commands)
+
+    def __send_commands(self, all_commands):
+        """
+        Sends the commands to display back to javascript. Nothing is sent if
+        they are the same as the last ones sent.
+
+        :param dict all_commands: The commands to display, keyed by section.
+        """
+        commands_hash = self.__tk_photoshopcc.get_commands_hash(all_commands)
+
+        if commands_hash == self.__sent_commands_hash:
+            self.logger.debug("Commands unchanged since last sent. Not resending.")
+            return
+
         self.adobe.send_commands(all_commands)
+        self.__sent_commands_hash = commands_hash
+
+    def __context_about_to_change(self):
+        """
+        Tells the panel that the context is about to change, which clears
+        everything it displays. Whatever we know was on display is forgotten,
+        so that it's sent again.
+        """
+        self.adobe.context_about_to_change()
+        self.__context_display_html = None
+        self.__sent_commands_hash = None
+        self.__state_context = None
+
+    def __on_state_requested(self):
+        """
+        Handles the panel requesting the current state. The panel doesn't
+        hold on to anything we sent previously in that case, so the full state
+        is sent.
+        """
+        self.__on_connection_activity()
+
+        # the panel may have reconnected, in which case the functions we
+        # installed in the host can no longer be called through it.
+        self.__property_snapshot.invalidate()
+        self.__export_as_jpeg_op.invalidate()
+
+        self.__sent_commands_hash = None
+        self.__context_display_html = None
+        self.__state_context = None
+        self.__send_state()
 
     def __setup_connection_timer(self, force=False):
         """
@@ -1517,14 +2122,67 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
 
             timer.timeout.connect(self._check_connection)
 
-            # The class variable is in seconds, so multiply to get milliseconds.
             timer.start(
-                self.SHOTGUN_ADOBE_HEARTBEAT_INTERVAL * 1000.0,
+                _seconds_to_ms(self.__heartbeat.min_interval),
             )
 
             self._CHECK_CONNECTION_TIMER = timer
             self.log_debug("Connection timer created and started.")
 
+    def __on_connection_activity(self):
+        """
+        Called when a message from the panel is dispatched, such as commands,
+        log messages or document changes. Brings the heartbeat back to its
+        minimum interval.
+        """
+        self.__heartbeat.activity()
+
+    def __setup_rpc_metrics_timer(self):
+        """
+        Sets up the timer that periodically writes the rpc metrics to file, if
+        metrics are enabled and a file is configured.
+        """
+        if not self.__rpc_metrics or not self.SHOTGUN_ADOBE_RPC_METRICS_FILE:
+            return
+
+        # keep the metrics of the last few sessions rather than overwriting
+        # them, without letting them pile up.
+        try:
+            self.__tk_photoshopcc.RPCMetrics.rotate_file(
+                self.SHOTGUN_ADOBE_RPC_METRICS_FILE
+            )
+        except Exception as e:
+            self.logger.debug(
+                "Unable to rotate rpc metrics file %s: %s"
+                % (self.SHOTGUN_ADOBE_RPC_METRICS_FILE, e)
+            )
+
+        from sgtk.platform.qt import QtCore
+
+        self.__rpc_metrics_timer = QtCore.QTimer(
+            parent=QtCore.QCoreApplication.instance(),
+        )
+        self.__rpc_metrics_timer.timeout.connect(self.__write_rpc_metrics)
+
+        self.__rpc_metrics_timer.start(
+            _seconds_to_ms(self.SHOTGUN_ADOBE_RPC_METRICS_INTERVAL),
+        )
+
+    def __write_rpc_metrics(self):
+        """
+        Writes the rpc metrics to the configured file, if any.
+        """
+        if not self.SHOTGUN_ADOBE_RPC_METRICS_FILE:
+            return
+
+        try:
+            self.__rpc_metrics.write(self.SHOTGUN_ADOBE_RPC_METRICS_FILE)
+        except Exception as e:
+            self.logger.debug(
+                "Unable to write rpc metrics to %s: %s"
+                % (self.SHOTGUN_ADOBE_RPC_METRICS_FILE, e)
+            )
+
     def _jump_to_sg(self):
         """
         Jump to shotgun, launch web browser
@@ -1565,39 +2223,247 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
     def add_to_context_cache(self, path, context):
         """
         Adds the given active document path to the context cache, associating
-        it with the given context object. This will trigger the storing of a
-        serialized cache as a user setting for use during panel extension
-        restarts.
+        it with the given context object. The serialized context is also
+        stored in the context index for use during panel extension restarts.
 
         :param str path: The document path to add to the cache.
         :param context: The context object to associate with the document.
         """
-        if path not in self._CONTEXT_CACHE:
-            # We're storing the context cache in a sgtk user setting at the project
-            # level. This will ensure that when we read the cache back, we'll only
-            # be getting contexts in our current project. Anything outside of that
-            # scope would be unusable, as we don't allow context changing across
-            # project boundaries.
-            self._CONTEXT_CACHE[path] = context
+        key = self.__tk_photoshopcc.ContextIndex.normalize_path(path)
 
-            serial_cache = dict()
-            for k, v in self._CONTEXT_CACHE.items():
-                serial_cache[k] = v.serialize()
+        if key not in self._CONTEXT_CACHE:
+            self._CONTEXT_CACHE.put(key, context)
 
-            self.logger.debug("Storing context cache: %s" % serial_cache)
-            self.__settings_manager.store(
-                self._CONTEXT_CACHE_KEY,
-                serial_cache,
-                self.__settings_manager.SCOPE_PROJECT,
-            )
+            # The index lives in the engine's cache location, which is
+            # specific to the current project. Anything outside of that scope
+            # would be unusable, as we don't allow context changing across
+            # project boundaries.
+            if self.__context_index:
+                self.logger.debug("Storing context for %s: %r" % (path, context))
+                try:
+                    self.__context_index.put(
+                        path,
+                        context.serialize(),
+                        self.__get_pipeline_config_id(context.sgtk),
+                    )
+                except Exception:
+                    self.logger.debug(
+                        "Unable to store context for %s." % path, exc_info=True
+                    )
 
     def __get_from_context_cache(self, path):
         """
         Gets the document path's associated context object, if one has been cached.
+        Documents that aren't in memory are looked up in the context index.
 
         :returns: Context object, or None
         """
-        return self._CONTEXT_CACHE.get(path)
+        key = self.__tk_photoshopcc.ContextIndex.normalize_path(path)
+
+        try:
+            context = self._CONTEXT_CACHE.get(key)
+        except Exception:
+            self.logger.debug(
+                "Unable to read cached context for %s." % path, exc_info=True
+            )
+            context = None
+
+        if context is not None or not self.__context_index:
+            return context
+
+        try:
+            serialized = self.__context_index.get(
+                path, self.__get_pipeline_config_id(self.sgtk)
+            )
+            if serialized:
+                context = sgtk.Context.deserialize(serialized)
+        except Exception:
+            self.logger.debug(
+                "Unable to read stored context for %s." % path, exc_info=True
+            )
+            return None
+
+        if context is not None:
+            self._CONTEXT_CACHE.put(key, context)
+        return context
+
+    def __start_context_prefetch(self):
+        """
+        Starts resolving the contexts of all the open documents that have been
+        saved from a background thread, caching them ahead of the documents
+        being switched to.
+        """
+        if not self.SHOTGUN_ADOBE_CONTEXT_PREFETCH:
+            return
+
+        if not self.get_setting("automatic_context_switch"):
+            return
+
+        # Reading the documents has to happen on the main thread. Documents
+        # that haven't been saved have no path to read.
+        paths = []
+        for document in self.adobe.app.documents:
+            try:
+                path = self.snapshot(document, ["fullName.fsName"])["fullName.fsName"]
+            except Exception:
+                path = None
+            if path:
+                paths.append(path)
+
+        if not paths:
+            return
+
+        def _on_finished(prefetcher):
+            self.__startup_metrics.update(
+                contexts_warmed=prefetcher.warmed,
+                contexts_prefetch_failed=prefetcher.failed,
+                contexts_prefetch_time=prefetcher.elapsed,
+            )
+
+        self.logger.debug("Prefetching contexts for %d documents." % len(paths))
+        self.__context_prefetcher = self.__tk_photoshopcc.ContextPrefetcher(
+            paths,
+            self.__prefetch_context,
+            self.SHOTGUN_ADOBE_CONTEXT_PREFETCH_INTERVAL,
+            self.logger,
+            on_finished=_on_finished,
+        )
+        self.__context_prefetcher.start()
+
+    def __add_recent_project(self, context):
+        """
+        Records the project of a context as the most recently worked in.
+
+        :param context: The context.
+        """
+        if context.project:
+            self.__recent_projects.add(context.project["id"])
+
+    def __prewarm_schemas(self):
+        """
+        Loads the schemas of the projects recently worked in, other than the
+        current one, in the background.
+        """
+        project_ids = self.__recent_projects.project_ids
+
+        current_project_id = self.__get_project_id()
+        project_ids = [p for p in project_ids if p != current_project_id]
+        project_ids = project_ids[: self.SCHEMA_PREWARM_MAX_PROJECTS]
+        if not project_ids:
+            return
+
+        self.logger.debug("Prewarming schemas for projects %s." % (project_ids,))
+        start = time.perf_counter()
+        pending = set(project_ids)
+
+        def _get_callback(project_id):
+            # sg globals runs the callback once the project's schema is loaded,
+            # straight away if it's already cached.
+            def _on_schema_loaded():
+                pending.discard(project_id)
+                if not pending:
+                    self.__startup_metrics.update(
+                        schemas_warmed=len(project_ids),
+                        schemas_prewarm_time=time.perf_counter() - start,
+                    )
+
+            return _on_schema_loaded
+
+        for project_id in project_ids:
+            self.__shotgun_globals.run_on_schema_loaded(
+                _get_callback(project_id), project_id=project_id
+            )
+
+    def __get_toolkit(self, path):
+        """
+        Returns a Toolkit API instance for a document from the pool.
+
+        A document that isn't under any pipeline configuration is remembered,
+        so that we don't go looking again every time it's activated. Anything
+        else that fails, like the connection to PTR, may not fail next time,
+        so it isn't remembered.
+
+        :param str path: The document path.
+        :raises TankInitError: If the document isn't under pipeline control.
+        """
+        try:
+            return self.__toolkit_pool.get(path)
+        except sgtk.TankInitError:
+            self.__non_pipeline_paths.add(path)
+            raise
+
+    def __prefetch_context(self, path):
+        """
+        Resolves and caches the context of a document. Called from the
+        prefetch thread.
+
+        :param str path: The document path.
+        :returns: ``False`` if the document's context was already known.
+        :raises: If the document's context couldn't be resolved.
+        """
+        key = self.__tk_photoshopcc.ContextIndex.normalize_path(path)
+        if key in self._CONTEXT_CACHE or self.__non_pipeline_paths.contains(path):
+            return False
+
+        # Only a document found not to be under pipeline control is
+        # remembered. Any other failure is retried once it's activated. The
+        # context is resolved the same way as on activation, so that the
+        # cached context is the one activation would have resolved.
+        context = self.__get_toolkit(path).context_from_path(
+            path, previous_context=self.context
+        )
+        self.add_to_context_cache(path, context)
+        return True
+
+    def __load_stored_contexts(self):
+        """
+        Fills the in-memory context cache with the most recent contexts stored
+        in the context index. They're left serialized until they're used.
+        """
+        if not self.__context_index:
+            return
+
+        try:
+            recent = self.__context_index.get_recent(
+                self.get_setting("context_cache_size"),
+                self.__get_pipeline_config_id(self.sgtk),
+            )
+        except Exception:
+            self.logger.debug("Unable to read the context index.", exc_info=True)
+            return
+
+        # The most recent go in last, so that they're the last evicted.
+        for key, serialized in reversed(recent):
+            self._CONTEXT_CACHE.put_serialized(key, serialized)
+
+    def __open_context_index(self):
+        """
+        Opens the context index in the engine's cache location.
+
+        :returns: A :class:`ContextIndex`, or ``None`` if it couldn't be opened,
+            in which case contexts are only cached in memory.
+        """
+        index_path = os.path.join(self.cache_location, "context_index.db")
+
+        try:
+            return self.__tk_photoshopcc.ContextIndex(index_path, self.logger)
+        except Exception:
+            self.logger.warning(
+                "Unable to open the context index %s. Contexts will not be "
+                "remembered across panel restarts." % index_path,
+                exc_info=True,
+            )
+            return None
+
+    def __get_pipeline_config_id(self, tk):
+        """
+        Returns the id of the given toolkit instance's pipeline configuration,
+        or None if it doesn't have one.
+        """
+        try:
+            return tk.pipeline_configuration.get_shotgun_id()
+        except Exception:
+            return None
 
     def __request_context_display(self, entity):
         """
@@ -1614,7 +2480,7 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
                 entity=None,
                 sg_globals=self.__shotgun_globals,
             )
-            self.adobe.send_context_display(fields_html)
+            self.__send_context_display(fields_html)
 
             # go ahead and forward the site thumbnail back to js
             data = dict(
@@ -1638,11 +2504,146 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
         entity_type = entity["type"]
         entity_id = entity["id"]
 
+        # display what we know about the entity straight away. if it's recent
+        # enough, there is no need to query it again.
+        key = self.__header_cache.get_key(entity_type, entity_id, fields)
+        record, fresh = self.__header_cache.get(key)
+
+        if record:
+            self.__display_context_entity(record)
+            if fresh:
+                return
+            self.logger.debug(
+                "Refreshing context header for %s %s." % (entity_type, entity_id)
+            )
+        else:
+            self.__displayed_context_entity = None
+
+            # if we know the entity's image from a previous query, start
+            # downloading its thumbnail alongside the query rather than after.
+            image_url = self.__get_context_image_url(entity_type, entity_id)
+            if image_url:
+                self.__request_context_thumbnail(
+                    dict(type=entity_type, id=entity_id, image=image_url),
+                    speculative=True,
+                )
+
         # kick off an async request to query the necessary fields
+        self.__context_find_key = key
         self.__context_find_uid = self.__sg_data.execute_find_one(
             entity_type, [["id", "is", entity_id]], fields
         )
 
+    def __display_context_entity(self, context_entity):
+        """
+        Sends the context header's html and thumbnail for an entity record to
+        the panel.
+
+        :param dict context_entity: The entity record, with the fields to
+            display and its image.
+        """
+        self.__displayed_context_entity = context_entity
+        thumbnail_key = self.__header_cache.get_thumbnail_key(context_entity)
+
+        # should have an image url now. if we've already downloaded the
+        # entity's thumbnail, send it right away. if it isn't already being
+        # downloaded, submit a request to download it.
+        if "image" in context_entity and context_entity["image"]:
+            thumbnail = self.__header_cache.get_thumbnail(thumbnail_key)
+            if thumbnail:
+                self.adobe.send_context_thumbnail(thumbnail)
+            elif not (
+                self.__context_thumb_uid and self.__context_thumb_key == thumbnail_key
+            ):
+                self.__request_context_thumbnail(context_entity)
+        # no image, use a default image based on the entity type
+        else:
+            if context_entity["type"] in ["Asset", "Project", "Shot", "Task"]:
+                thumb_path = "../images/default_%s_thumb_dark.png" % (
+                    context_entity["type"]
+                )
+            else:
+                thumb_path = "../images/default_Entity_thumb_dark.png"
+
+            data = dict(
+                thumb_path=thumb_path,
+                url=self.get_entity_url(context_entity),
+            )
+            self.adobe.send_context_thumbnail(data)
+
+        # now that we have all the field values, go back to the hook and
+        # build the html to display them.
+        fields_html = self.execute_hook_method(
+            "context_fields_display_hook",
+            "get_context_html",
+            entity=context_entity,
+            sg_globals=self.__shotgun_globals,
+        )
+
+        # forward the display html back to the js panel
+        self.__send_context_display(fields_html)
+
+    def __send_context_display(self, fields_html):
+        """
+        Sends the context header's html to the panel, unless it's already on
+        display.
+
+        :param str fields_html: The html to display.
+        """
+        if fields_html == self.__context_display_html:
+            self.logger.debug("Context header unchanged. Not sending it again.")
+            return
+
+        self.__context_display_html = fields_html
+        self.adobe.send_context_display(fields_html)
+
+    def __request_context_thumbnail(self, context_entity, speculative=False):
+        """
+        Submits a request to download the thumbnail of an entity.
+
+        :param dict context_entity: The entity record, with its image url.
+        :param bool speculative: ``True`` if the image url is the last one
+            known rather than a freshly queried one. It may have expired, in
+            which case the download is retried once the entity is queried.
+        """
+        self.__context_thumb_key = self.__header_cache.get_thumbnail_key(context_entity)
+        self.__context_thumb_speculative = speculative
+        self.__context_thumb_uid = self.__sg_data.request_thumbnail(
+            context_entity["image"],
+            context_entity["type"],
+            context_entity["id"],
+            "image",
+            load_image=False,
+        )
+
+    def __get_context_image_url(self, entity_type, entity_id):
+        """
+        Returns the last known image url of an entity, or None.
+        """
+        if not self.__context_index:
+            return None
+
+        try:
+            return self.__context_index.get_image_url(entity_type, entity_id)
+        except Exception:
+            self.logger.debug("Unable to read the last image url.", exc_info=True)
+            return None
+
+    def __remember_context_image_url(self, context_entity):
+        """
+        Remembers the image url of an entity record, if it has one, so that
+        its thumbnail can be requested early the next time it's shown.
+        """
+        if not self.__context_index or not context_entity.get("image"):
+            return
+
+        try:
+            self.__context_index.put_image_url(
+                context_entity["type"], context_entity["id"], context_entity["image"]
+            )
+        except Exception:
+            self.logger.debug("Unable to store the image url.", exc_info=True)
+
     def __on_worker_failure(self, uid, msg):
         """
         Asynchronous callback - the worker thread errored.
@@ -1654,7 +2655,7 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
             self.__context_find_uid = None
 
             # send an error message back to the context header.
-            self.adobe.send_context_display("""
+            self.__send_context_display("""
                 There was an error retrieving fields for this context. Please
                 see the logs for the specific error message. If this is a
                 recurring error and you need further assistance, please
@@ -1665,6 +2666,19 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
             # clear the thumb id since we are now processing it
             self.__context_thumb_uid = None
 
+            # the last known image url may have expired. if the entity has
+            # been queried since, try again with its current url. otherwise
+            # the query's result will request the thumbnail.
+            if self.__context_thumb_speculative:
+                self.logger.debug(
+                    "Last known context thumbnail unavailable: %s" % (msg,)
+                )
+                self.__context_thumb_key = None
+                displayed = self.__displayed_context_entity
+                if displayed and displayed.get("image"):
+                    self.__request_context_thumbnail(displayed)
+                return
+
             # log this. the panel will display a default thumbnail, so this
             # should be sufficient
             self.logger.error("Failed to query context thumbnail: %s" % (msg,))
@@ -1682,44 +2696,30 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
             self.__context_find_uid = None
 
             context_entity = data["sg"]
+            self.__header_cache.put(self.__context_find_key, context_entity)
+            self.__remember_context_image_url(context_entity)
+
+            # if the header is already showing this data, from the cache,
+            # there is nothing to update.
+            if self.__header_cache.same_record(
+                context_entity, self.__displayed_context_entity
+            ):
+                self.logger.debug("Context header is up to date.")
+                self.__displayed_context_entity = context_entity
+
+                # the thumbnail was requested with the cached record's image
+                # url, which may have expired. if that download failed, try
+                # again with the refreshed url.
+                thumbnail_key = self.__header_cache.get_thumbnail_key(context_entity)
+                if (
+                    context_entity.get("image")
+                    and not self.__context_thumb_uid
+                    and not self.__header_cache.get_thumbnail(thumbnail_key)
+                ):
+                    self.__request_context_thumbnail(context_entity)
+                return
 
-            # should have an image url now. submit a request to download the
-            # entity's thumbnail.
-            if "image" in context_entity and context_entity["image"]:
-                self.__context_thumb_uid = self.__sg_data.request_thumbnail(
-                    context_entity["image"],
-                    context_entity["type"],
-                    context_entity["id"],
-                    "image",
-                    load_image=False,
-                )
-            # no image, use a default image based on the entity type
-            else:
-                if context_entity["type"] in ["Asset", "Project", "Shot", "Task"]:
-                    thumb_path = "../images/default_%s_thumb_dark.png" % (
-                        context_entity["type"]
-                    )
-                    data["thumb_path"] = thumb_path
-                else:
-                    thumb_path = "../images/default_Entity_thumb_dark.png"
-
-                data = dict(
-                    thumb_path=thumb_path,
-                    url=self.get_entity_url(context_entity),
-                )
-                self.adobe.send_context_thumbnail(data)
-
-            # now that we have all the field values, go back to the hook and
-            # build the html to display them.
-            fields_html = self.execute_hook_method(
-                "context_fields_display_hook",
-                "get_context_html",
-                entity=context_entity,
-                sg_globals=self.__shotgun_globals,
-            )
-
-            # forward the display html back to the js panel
-            self.adobe.send_context_display(fields_html)
+            self.__display_context_entity(context_entity)
 
         # thumbnail download. forward the path and a url back to js
         elif uid == self.__context_thumb_uid:
@@ -1731,6 +2731,9 @@ class PhotoshopCCEngine(sgtk.platform.Engine):
             # add a url to allow the panel to make the thumbnail clickable
             data["url"] = self.get_entity_url(context_entity)
 
+            # remember the thumbnail for the next time this entity is shown
+            self.__header_cache.put_thumbnail(self.__context_thumb_key, data)
+
             self.adobe.send_context_thumbnail(data)
 
     def __get_project_id(self):
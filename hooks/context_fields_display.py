@@ -7,6 +7,8 @@
 # By accessing, using, copying or modifying this work you indicate your
 # agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
 # not expressly granted therein are reserved by Shotgun Software Inc.
+import collections
+
 import sgtk
 
 HookBaseClass = sgtk.get_hook_baseclass()
@@ -17,6 +19,31 @@ class ContextFieldsDisplay(HookBaseClass):
     Used to control the way the current context fields are displayed.
     """
 
+    # The html rendered by get_context_html(), keyed by hook class and entity
+    # values. The hook is instantiated for every call, so this is shared by
+    # the class. Only the most recent entities are remembered.
+    _html_cache = collections.OrderedDict()
+    _MAX_HTML_CACHE_SIZE = 100
+
+    # The html the header is made of, ready to be filled in. Each entity type
+    # builds a list of (label, value) rows that is rendered as a table.
+    _TABLE_HTML = "<table>{rows}</table>".format
+    _ROW_HTML = (
+        "<tr>"
+        "<td class='sg_label_td'>{label}:</td>"
+        "<td class='sg_value_td'>{value}</td>"
+        "</tr>"
+    ).format
+    _QUALIFIED_NAME_HTML = (
+        "{name}&nbsp;<span class='sg_label'>({qualifier})</span>"
+    ).format
+    _CUT_HTML = "{cut_in} - {cut_out}".format
+    _HEAD_TAIL_HTML = (
+        "<small><span class='sg_label'>{head_in} | </span></small>"
+        "{cut_display}"
+        "<small><span class='sg_label'> | {tail_out}</span></small>"
+    ).format
+
     def get_entity_fields(self, entity_type):
         """
         Given a particular entity type for the current context, return a list of
@@ -94,6 +121,10 @@ class ContextFieldsDisplay(HookBaseClass):
             names for fields, statuses, etc.
         :returns: An html ``str`` that will be displayed in the panel.
 
+        The html is remembered per entity and field values, so displaying an
+        entity whose values haven't changed doesn't render it again, nor
+        resolve its status.
+
         Here are some css classes that can be used to display text in various
         ways::
 
@@ -120,6 +151,20 @@ class ContextFieldsDisplay(HookBaseClass):
             # site context
             return self._get_site_html()
 
+        # reuse the html of an entity displayed before with the same values.
+        # the image isn't displayed here and its url changes with every query,
+        # so it's left out.
+        key = (
+            type(self),
+            self.parent.sgtk.shotgun_url,
+            _freeze(dict((k, v) for k, v in entity.items() if k != "image")),
+        )
+        cache = self._html_cache
+        html = cache.get(key)
+        if html is not None:
+            cache.move_to_end(key)
+            return html
+
         # retrieve the html based on the entity type
         entity_type = entity.get("type")
 
@@ -133,6 +178,17 @@ class ContextFieldsDisplay(HookBaseClass):
             # fallback for other entity types.
             html = self._get_entity_html(entity, sg_globals)
 
+        # until the project's schema is loaded, a status is displayed as its
+        # code. that html isn't remembered, so that the status is displayed
+        # by name once the schema is there.
+        status_code = entity.get("sg_status_list")
+        if status_code and self._get_status(entity, sg_globals) == status_code:
+            return html
+
+        cache[key] = html
+        while len(cache) > self._MAX_HTML_CACHE_SIZE:
+            cache.popitem(last=False)
+
         return html
 
     def _get_site_html(self):
@@ -142,82 +198,35 @@ class ContextFieldsDisplay(HookBaseClass):
         site_display = site_url.split("//")[-1]
         site_link = self.parent.get_panel_link(site_url, site_display)
 
-        return """
-            <table>
-              <tr>
-                <td class='sg_label_td'>Site:</td>
-                <td class='sg_value_td'>{name}</td>
-              </tr>
-            </table>
-            """.format(
-            name=site_link,
-        )
+        return self._get_table_html([("Site", site_link)])
 
     def _get_asset_html(self, entity, sg_globals):
         """Returns html for displaying an asset context."""
 
         asset_link = self._get_entity_sg_link(entity["code"], entity)
 
-        status = sg_globals.get_status_display_name(
-            entity["sg_status_list"], project_id=entity["project"]["id"]
-        )
-
         # always include name, type, and status
-        html = """
-            <table>
-              <tr>
-                <td class='sg_label_td'>Asset:</td>
-                <td class='sg_value_td'>{name}</td>
-              </tr>
-              <tr>
-                <td class='sg_label_td'>Type:</td>
-                <td class='sg_value_td'>{type}</td>
-              </tr>
-              <tr>
-                <td class='sg_label_td'>Status:</td>
-                <td class='sg_value_td'>{status}</td>
-              </tr>
-            """.format(
-            name=asset_link,
-            type=entity["sg_asset_type"],
-            status=status,
-        )
+        rows = [
+            ("Asset", asset_link),
+            ("Type", entity["sg_asset_type"]),
+            ("Status", self._get_status(entity, sg_globals)),
+        ]
 
         # tags if there are any
         if entity["tag_list"]:
-            tag_display = ", ".join(entity["tag_list"])
-            html += """
-                <tr>
-                  <td class='sg_label_td'>Tags:</td>
-                  <td class='sg_value_td'>{tags}</td>
-                </tr>
-                """.format(
-                tags=tag_display,
-            )
+            rows.append(("Tags", ", ".join(entity["tag_list"])))
 
         # description if there is one
         if entity["description"]:
-            html += """
-                <tr>
-                  <td class='sg_label_td'>Desc:</td>
-                  <td class='sg_value_td'>{desc}</td>
-                </tr>
-                """.format(desc=entity["description"])
+            rows.append(("Desc", entity["description"]))
 
-        # close up the table
-        html += "</table>"
-
-        return html
+        return self._get_table_html(rows)
 
     def _get_shot_html(self, entity, sg_globals):
         """Returns html for displaying a shot context."""
 
         shot_link = self._get_entity_sg_link(entity["code"], entity)
 
-        status = sg_globals.get_status_display_name(
-            entity["sg_status_list"], project_id=entity["project"]["id"]
-        )
-
         # by default show the shot url
         shot_display = shot_link
 
@@ -225,42 +234,18 @@ class ContextFieldsDisplay(HookBaseClass):
         # display it as a field name to allow shot name to stand out
         seq = entity["sg_sequence"]
         if seq:
-            seq_name = seq["name"]
-            seq_link = self._get_entity_sg_link(seq_name, seq)
-            shot_display = """
-                {name}&nbsp;<span class='sg_label'>({seq_name})</span>
-                """.format(
-                name=shot_link,
-                seq_name=seq_link,
-            )
+            seq_link = self._get_entity_sg_link(seq["name"], seq)
+            shot_display = self._QUALIFIED_NAME_HTML(name=shot_link, qualifier=seq_link)
 
-        # always include name, type, and status
-        html = """
-            <table>
-              <tr>
-                <td class='sg_label_td'>Shot:</td>
-                <td class='sg_value_td'>{name}</td>
-              </tr>
-              <tr>
-                <td class='sg_label_td'>Status:</td>
-                <td class='sg_value_td'>{status}</td>
-              </tr>
-            """.format(
-            name=shot_display,
-            status=status,
-        )
+        # always include name and status
+        rows = [
+            ("Shot", shot_display),
+            ("Status", self._get_status(entity, sg_globals)),
+        ]
 
         # tags if there are any
         if entity["tag_list"]:
-            tag_display = ", ".join(entity["tag_list"])
-            html += """
-                <tr>
-                  <td class='sg_label_td'>Tags:</td>
-                  <td class='sg_value_td'>{tags}</td>
-                </tr>
-                """.format(
-                tags=tag_display,
-            )
+            rows.append(("Tags", ", ".join(entity["tag_list"])))
 
         # ---- show some cut info if available
 
@@ -268,9 +253,9 @@ class ContextFieldsDisplay(HookBaseClass):
 
         # cut in/out
         if entity["sg_cut_in"] is not None and entity["sg_cut_out"] is not None:
-            cut_display = """
-                    {cut_in} - {cut_out}
-                """.format(cut_in=entity["sg_cut_in"], cut_out=entity["sg_cut_out"])
+            cut_display = self._CUT_HTML(
+                cut_in=entity["sg_cut_in"], cut_out=entity["sg_cut_out"]
+            )
 
         # include head/tail if set
         if (
@@ -278,74 +263,41 @@ class ContextFieldsDisplay(HookBaseClass):
             and entity["sg_head_in"] is not None
             and entity["sg_tail_out"] is not None
         ):
-
-            cut_display = """
-                    <small><span class='sg_label'>{head_in} | </span></small>
-                    {cut_display}
-                    <small><span class='sg_label'> | {tail_out}</span></small>
-                """.format(
+            cut_display = self._HEAD_TAIL_HTML(
                 head_in=entity["sg_head_in"],
                 cut_display=cut_display,
                 tail_out=entity["sg_tail_out"],
             )
 
         if cut_display:
-            html += """
-                <tr>
-                  <td class='sg_label_td'>Cut:</td>
-                  <td class='sg_value_td'>{cut_display}</td>
-                </tr>
-                """.format(
-                cut_display=cut_display,
-            )
+            rows.append(("Cut", cut_display))
 
         # description if there is one
         if entity["description"]:
-            html += """
-                <tr>
-                  <td class='sg_label_td'>Desc:</td>
-                  <td class='sg_value_td'>{desc}</td>
-                </tr>
-                """.format(desc=entity["description"])
+            rows.append(("Desc", entity["description"]))
 
-        # close up the table
-        html += "</table>"
-
-        return html
+        return self._get_table_html(rows)
 
     def _get_task_html(self, entity, sg_globals):
         """Returns html for displaying a task context."""
 
         task_link = self._get_entity_sg_link(entity["content"], entity)
 
-        status = sg_globals.get_status_display_name(
-            entity["sg_status_list"], project_id=entity["project"]["id"]
-        )
-
-        # by default show the shot url
+        # by default show the task url
         task_display = task_link
 
-        # include step name next to shot name if not the same.
-        # display it as a field name to allow shot name to stand out
+        # include step name next to task name if not the same.
+        # display it as a field name to allow task name to stand out
         step = entity["step"]
         if step:
             step_name = step["name"]
             if step_name != entity["content"]:
-                task_display = """
-                    {name}&nbsp;<span class='sg_label'>({step_name})</span>
-                    """.format(
-                    name=task_display,
-                    step_name=step_name,
+                task_display = self._QUALIFIED_NAME_HTML(
+                    name=task_display, qualifier=step_name
                 )
 
         # always include name
-        html = """
-            <table>
-              <tr>
-                <td class='sg_label_td'>Task:</td>
-                <td class='sg_value_td'>{name}</td>
-              </tr>
-            """.format(name=task_display)
+        rows = [("Task", task_display)]
 
         # entity
         if entity["entity"]:
@@ -358,60 +310,26 @@ class ContextFieldsDisplay(HookBaseClass):
             linked_entity_link = self._get_entity_sg_link(
                 linked_entity_display, linked_entity
             )
-            html += """
-                  <tr>
-                    <td class='sg_label_td'>{entity_type}:</td>
-                    <td class='sg_value_td'>{name}</td>
-                  </tr>
-                """.format(
-                entity_type=linked_entity["type"],
-                name=linked_entity_link,
-            )
+            rows.append((linked_entity["type"], linked_entity_link))
 
         # always show the status
-        html += """
-              <tr>
-                <td class='sg_label_td'>Status:</td>
-                <td class='sg_value_td'>{status}</td>
-              </tr>
-            """.format(status=status)
+        rows.append(("Status", self._get_status(entity, sg_globals)))
 
         # artist
         if entity["task_assignees"]:
             assignee_entities = entity["task_assignees"]
-            assignee_links = []
-            for assignee_entity in assignee_entities:
-                asignee_name = assignee_entity["name"]
-                assignee_links.append(
-                    self._get_entity_sg_link(asignee_name, assignee_entity)
-                )
-            assignee_display = ", ".join(assignee_links)
+            assignee_links = [
+                self._get_entity_sg_link(assignee_entity["name"], assignee_entity)
+                for assignee_entity in assignee_entities
+            ]
             assignee_label = "Artists" if len(assignee_entities) > 1 else "Artist"
-            html += """
-                  <tr>
-                    <td class='sg_label_td'>{label}:</td>
-                    <td class='sg_value_td'>{name}</td>
-                  </tr>
-                """.format(
-                label=assignee_label,
-                name=assignee_display,
-            )
+            rows.append((assignee_label, ", ".join(assignee_links)))
 
         # due date
         if entity["due_date"]:
-            html += """
-                  <tr>
-                    <td class='sg_label_td'>Due:</td>
-                    <td class='sg_value_td'>{date}</td>
-                  </tr>
-                """.format(
-                date=entity["due_date"],
-            )
+            rows.append(("Due", entity["due_date"]))
 
-        # close up the table
-        html += "</table>"
-
-        return html
+        return self._get_table_html(rows)
 
     def _get_entity_html(self, entity, sg_globals):
         """Returns html for displaying a generic entity context."""
@@ -419,50 +337,18 @@ class ContextFieldsDisplay(HookBaseClass):
         # default to name, fall back to code
         entity_display = entity.get("name", entity.get("code"))
         entity_link = self._get_entity_sg_link(entity_display, entity)
-        entity_type = entity["type"]
 
         # always include type/name
-        html = """
-            <table>
-              <tr>
-                <td class='sg_label_td'>{entity_type}:</td>
-                <td class='sg_value_td'>{name}</td>
-              </tr>
-            """.format(
-            entity_type=entity_type,
-            name=entity_link,
-        )
+        rows = [(entity["type"], entity_link)]
 
         # show a status if one can be determined
-        status = None
-        if "sg_status_list" in entity:
-            status = sg_globals.get_status_display_name(
-                entity["sg_status_list"], project_id=entity.get("project", {}).get("id")
-            )
-        elif "sg_status" in entity:
-            status = entity["sg_status"]
-
+        status = self._get_status(entity, sg_globals)
         if status:
-            html += """
-                  <tr>
-                    <td class='sg_label_td'>Status:</td>
-                    <td class='sg_value_td'>{status}</td>
-                  </tr>
-                """.format(
-                status=status,
-            )
+            rows.append(("Status", status))
 
         # tags if there are any
         if entity["tag_list"]:
-            tag_display = ", ".join(entity["tag_list"])
-            html += """
-                <tr>
-                  <td class='sg_label_td'>Tags:</td>
-                  <td class='sg_value_td'>{tags}</td>
-                </tr>
-                """.format(
-                tags=tag_display,
-            )
+            rows.append(("Tags", ", ".join(entity["tag_list"])))
 
         # description if there is one
         desc = None
@@ -472,17 +358,33 @@ class ContextFieldsDisplay(HookBaseClass):
             desc = entity["sg_description"]
 
         if desc:
-            html += """
-                <tr>
-                  <td class='sg_label_td'>Desc:</td>
-                  <td class='sg_value_td'>{desc}</td>
-                </tr>
-                """.format(desc=desc)
+            rows.append(("Desc", desc))
 
-        # close up the table
-        html += "</table>"
+        return self._get_table_html(rows)
 
-        return html
+    def _get_status(self, entity, sg_globals):
+        """
+        Returns the status to display for an entity, or ``None`` if it
+        doesn't have one.
+        """
+
+        if "sg_status_list" in entity:
+            project = entity.get("project") or {}
+            return sg_globals.get_status_display_name(
+                entity["sg_status_list"], project_id=project.get("id")
+            )
+        return entity.get("sg_status")
+
+    def _get_table_html(self, rows):
+        """
+        Returns the html table displaying the given (label, value) rows.
+        """
+
+        return self._TABLE_HTML(
+            rows="".join(
+                self._ROW_HTML(label=label, value=value) for label, value in rows
+            )
+        )
 
     def _get_entity_sg_link(self, text, entity):
         """
@@ -496,3 +398,15 @@ class ContextFieldsDisplay(HookBaseClass):
         )
 
         return self.parent.get_panel_link(url, text)
+
+
+def _freeze(value):
+    """
+    Returns a hashable equivalent of a queried field value.
+    """
+
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
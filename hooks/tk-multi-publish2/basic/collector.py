@@ -111,7 +111,7 @@ class PhotoshopCCSceneCollector(HookBaseClass):
             document_item.set_icon_from_path(icon_path)
             document_item.thumbnail_enabled = False
             document_item.properties["document"] = document
-            path = _document_path(document)
+            path = _document_path(engine, document)
             if path:
                 document_item.set_thumbnail_from_path(path)
             document_item.properties["work_template"] = work_template
@@ -132,12 +132,16 @@ class PhotoshopCCSceneCollector(HookBaseClass):
         # iterate over all open documents and add them as publish items
         for document in engine.adobe.app.documents:
 
+            # read the name and path of the document in a single round trip
+            doc_info = engine.snapshot(document, ["name", "fullName.fsName"])
+            doc_name = doc_info["name"]
+
             # ensure the document is the current one
             engine.adobe.app.activeDocument = document
 
             # create a publish item for the document
             document_item = parent_item.create_item(
-                "photoshop.document", "Photoshop Image", document.name
+                "photoshop.document", "Photoshop Image", doc_name
             )
 
             document_item.set_icon_from_path(icon_path)
@@ -151,7 +155,6 @@ class PhotoshopCCSceneCollector(HookBaseClass):
             # plugins know which open document to associate with this item
             document_item.properties["document"] = document
 
-            doc_name = document.name
             self.logger.info("Collected Photoshop document: %s" % (doc_name))
 
             # enable the active document and expand it. other documents are
@@ -165,7 +168,7 @@ class PhotoshopCCSceneCollector(HookBaseClass):
                 document_item.expanded = False
                 document_item.checked = False
 
-            path = _document_path(document)
+            path = doc_info["fullName.fsName"]
 
             if path:
                 # try to set the thumbnail for display. won't display anything
@@ -190,15 +193,11 @@ class PhotoshopCCSceneCollector(HookBaseClass):
         engine.adobe.app.activeDocument = current_document
 
 
-def _document_path(document):
+def _document_path(engine, document):
     """
     Returns the path on disk to the supplied document. May be ``None`` if the
     document has not been saved.
     """
 
-    try:
-        path = document.fullName.fsName
-    except Exception:
-        path = None
-
-    return path
+    # the full name and its file system path are read in a single round trip
+    return engine.snapshot(document, ["fullName.fsName"])["fullName.fsName"]
@@ -166,7 +166,7 @@ class PhotoshopCCDocumentPublishPlugin(HookBaseClass):
         if settings.get("Publish Template").value:
             item.context_change_allowed = False
 
-        path = _document_path(document)
+        path = _document_path(self.parent.engine, document)
 
         if not path:
             # the document has not been saved before (no path determined).
@@ -199,7 +199,7 @@ class PhotoshopCCDocumentPublishPlugin(HookBaseClass):
         publisher = self.parent
         engine = publisher.engine
         document = item.properties["document"]
-        path = _document_path(document)
+        path = _document_path(engine, document)
 
         # ---- ensure the document has been saved
 
@@ -224,7 +224,7 @@ class PhotoshopCCDocumentPublishPlugin(HookBaseClass):
         # a different path
         work_template = item.properties.get("work_template")
         if work_template:
-            if not work_template.validate(path):
+            if not engine.validate_template_path(work_template, path):
                 self.logger.warning(
                     "The current document does not match the configured work "
                     "template.",
@@ -305,7 +305,7 @@ class PhotoshopCCDocumentPublishPlugin(HookBaseClass):
         publisher = self.parent
         engine = publisher.engine
         document = item.properties["document"]
-        path = _document_path(document)
+        path = _document_path(engine, document)
 
         # get the path in a normalized state. no trailing separator, separators
         # are appropriate for current os, no double separators, etc.
@@ -376,15 +376,11 @@ def _get_save_as_action(document):
     }
 
 
-def _document_path(document):
+def _document_path(engine, document):
     """
     Returns the path on disk to the supplied document. May be ``None`` if the
     document has not been saved.
     """
 
-    try:
-        path = document.fullName.fsName
-    except Exception:
-        path = None
-
-    return path
+    # the full name and its file system path are read in a single round trip
+    return engine.snapshot(document, ["fullName.fsName"])["fullName.fsName"]
@@ -136,7 +136,7 @@ class PhotoshopCCImagePublishPlugin(HookBaseClass):
 
         publisher = self.parent
         document = item.parent.properties["document"]
-        path = _document_path(document)
+        path = _document_path(publisher.engine, document)
         template_name = settings["Publish Template"].value
 
         # ---- ensure the Export settings contains at least a "format" key
@@ -184,7 +184,7 @@ class PhotoshopCCImagePublishPlugin(HookBaseClass):
 
             # get the current scene path and extract fields from it using the work
             # template:
-            work_fields = work_template.get_fields(path)
+            work_fields = publisher.engine.get_template_fields(work_template, path)
 
             # ensure the fields work for the publish template
             missing_keys = publish_template.missing_keys(work_fields)
@@ -236,14 +236,14 @@ class PhotoshopCCImagePublishPlugin(HookBaseClass):
         publisher = self.parent
         engine = publisher.engine
         document = item.parent.properties["document"]
-        path = sgtk.util.ShotgunPath.normalize(_document_path(document))
+        path = sgtk.util.ShotgunPath.normalize(_document_path(engine, document))
 
         # as we cannot rely on properties to hold the publish path, build it from scratch
         template_name = settings["Publish Template"].value
         if template_name:
             publish_template = publisher.get_template_by_name(template_name)
             work_template = item.parent.properties.get("work_template")
-            work_fields = work_template.get_fields(path)
+            work_fields = publisher.engine.get_template_fields(work_template, path)
 
             item.local_properties["path"] = publish_template.apply_fields(work_fields)
         else:
@@ -310,15 +310,11 @@ def _get_save_as_action(document):
     }
 
 
-def _document_path(document):
+def _document_path(engine, document):
     """
     Returns the path on disk to the supplied document. May be ``None`` if the
     document has not been saved.
     """
 
-    try:
-        path = document.fullName.fsName
-    except Exception:
-        path = None
-
-    return path
+    # the full name and its file system path are read in a single round trip
+    return engine.snapshot(document, ["fullName.fsName"])["fullName.fsName"]
@@ -121,7 +121,7 @@ class PhotoshopStartVersionControlPlugin(HookBaseClass):
             self.logger.warn("Could not determine the document for item")
             return {"accepted": False}
 
-        path = _document_path(document)
+        path = _document_path(self.parent.engine, document)
 
         if path:
             version_number = self._get_version_number(path, item)
@@ -168,7 +168,7 @@ class PhotoshopStartVersionControlPlugin(HookBaseClass):
 
         publisher = self.parent
         document = item.properties["document"]
-        path = _document_path(document)
+        path = _document_path(publisher.engine, document)
 
         if not path:
             # the session still requires saving. provide a save button.
@@ -210,7 +210,7 @@ class PhotoshopStartVersionControlPlugin(HookBaseClass):
         publisher = self.parent
         engine = publisher.engine
         document = item.properties["document"]
-        path = _document_path(document)
+        path = _document_path(engine, document)
 
         # get the path in a normalized state. no trailing separator, separators
         # are appropriate for current os, no double separators, etc.
@@ -273,9 +273,9 @@ class PhotoshopStartVersionControlPlugin(HookBaseClass):
 
         work_template = item.properties.get("work_template")
         if work_template:
-            if work_template.validate(path):
+            if publisher.engine.validate_template_path(work_template, path):
                 self.logger.debug("Using work template to determine version number.")
-                work_fields = work_template.get_fields(path)
+                work_fields = publisher.engine.get_template_fields(work_template, path)
                 if "version" in work_fields:
                     version_number = work_fields.get("version")
             else:
@@ -328,15 +328,11 @@ def _get_version_docs_action():
     }
 
 
-def _document_path(document):
+def _document_path(engine, document):
     """
     Returns the path on disk to the supplied document. May be ``None`` if the
     document has not been saved.
     """
 
-    try:
-        path = document.fullName.fsName
-    except Exception:
-        path = None
-
-    return path
+    # the full name and its file system path are read in a single round trip
+    return engine.snapshot(document, ["fullName.fsName"])["fullName.fsName"]
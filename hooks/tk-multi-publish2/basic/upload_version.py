@@ -131,7 +131,7 @@ class PhotoshopUploadVersionPlugin(HookBaseClass):
             self.logger.warn("Could not determine the document for item")
             return {"accepted": False}
 
-        path = _document_path(document)
+        path = _document_path(self.parent.engine, document)
 
         if not path:
             # the document has not been saved before (no path determined).
@@ -162,7 +162,7 @@ class PhotoshopUploadVersionPlugin(HookBaseClass):
         """
 
         document = item.properties["document"]
-        path = _document_path(document)
+        path = _document_path(self.parent.engine, document)
 
         if not path:
             # the document still requires saving. provide a save button.
@@ -189,7 +189,7 @@ class PhotoshopUploadVersionPlugin(HookBaseClass):
         engine = publisher.engine
         document = item.properties["document"]
 
-        path = _document_path(document)
+        path = _document_path(engine, document)
         upload_path = path
 
         file_info = publisher.util.get_file_path_components(path)
@@ -359,15 +359,11 @@ def _get_save_as_action(document):
     }
 
 
-def _document_path(document):
+def _document_path(engine, document):
     """
     Returns the path on disk to the supplied document. May be ``None`` if the
     document has not been saved.
     """
 
-    try:
-        path = document.fullName.fsName
-    except Exception:
-        path = None
-
-    return path
+    # the full name and its file system path are read in a single round trip
+    return engine.snapshot(document, ["fullName.fsName"])["fullName.fsName"]
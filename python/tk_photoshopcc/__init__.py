@@ -29,10 +29,24 @@ shotgun_globals = sgtk.platform.import_framework(
 )
 
 
-shotgun_settings = sgtk.platform.import_framework(
-    "tk-framework-shotgunutils", "settings"
-)
-
+from .command_index import CommandIndex
+from .context_cache import ContextCache
+from .context_guard import ContextChangeGuard
+from .context_index import ContextIndex
+from .context_prefetcher import ContextPrefetcher
+from .header_cache import HeaderCache
+from .heartbeat import HeartbeatScheduler
+from .jpeg_export import export_as_jpeg, export_as_jpeg_by_steps
+from .log_forwarder import LogForwarder
+from .message_pump import MessagePump
+from .negative_cache import NegativeCache
+from .recent_projects import RecentProjects
+from .rpc_metrics import RPCMetrics
+from .scripted_operation import ScriptedOperation, EXPORT_AS_JPEG_SCRIPT
+from .snapshot import PropertySnapshot
+from .state_hash import get_commands_hash
+from .template_index import TemplateIndex
+from .toolkit_pool import ToolkitPool
 
 if sys.platform == "win32":
     win_32_api = sgtk.platform.import_framework(
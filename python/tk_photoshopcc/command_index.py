@@ -0,0 +1,65 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+
+class CommandIndex(object):
+    """
+    Maps the uids of registered engine commands to the commands themselves,
+    so that a command triggered from the panel is found without going through
+    every registered command.
+
+    Commands are indexed by their entry in the engine's commands, a dictionary
+    with the command's callback and properties. Those entries are kept as is
+    when the engine renames a command whose name clashes with another one.
+    """
+
+    def __init__(self):
+        """
+        Initialize the index.
+        """
+        self._commands = dict()
+
+    def add(self, command):
+        """
+        Indexes a registered command by the uid in its properties. Commands
+        without a uid are ignored.
+
+        :param dict command: The command's entry in the engine's commands.
+        """
+        uid = command.get("properties", dict()).get("uid")
+        if uid is not None:
+            self._commands[uid] = command
+
+    def get(self, uid):
+        """
+        Returns the command with the given uid, or ``None`` if there isn't one.
+
+        :param int uid: The uid of the command.
+        """
+        return self._commands.get(uid)
+
+    def rebuild(self, commands):
+        """
+        Indexes the given commands, replacing everything indexed so far.
+
+        :param commands: The entries of the engine's commands.
+        """
+        self._commands.clear()
+        for command in commands:
+            self.add(command)
+
+    def clear(self):
+        """
+        Forgets all the commands, when they're about to be registered again.
+        """
+        self._commands.clear()
+
+    def __len__(self):
+        return len(self._commands)
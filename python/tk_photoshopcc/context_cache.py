@@ -0,0 +1,154 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import collections
+import threading
+
+# Marks a cached context that hasn't been deserialized yet.
+_Serialized = collections.namedtuple("_Serialized", ["data"])
+
+
+class ContextCache(object):
+    """
+    An in-memory cache of document paths to contexts, holding at most a fixed
+    number of documents. Adding a document to a full cache evicts the least
+    recently used one.
+
+    Contexts can be added in serialized form, in which case they are only
+    deserialized the first time they're looked up.
+    """
+
+    def __init__(self, max_size, deserialize):
+        """
+        Initialize the cache.
+
+        :param int max_size: The maximum number of documents in the cache.
+        :param deserialize: Callable turning a serialized context back into a
+            context, such as :meth:`sgtk.Context.deserialize`.
+        """
+        self._max_size = max(1, max_size)
+        self._deserialize = deserialize
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._deserializations = 0
+
+    def __contains__(self, path):
+        with self._lock:
+            return path in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, path):
+        """
+        Returns the context cached for a document, deserializing it if needed,
+        and marks the document as the most recently used.
+
+        :param str path: The document path.
+        :returns: The context, or ``None`` if the document isn't cached.
+        """
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            self._entries.move_to_end(path)
+
+        # Deserializing can be slow, so it's done outside of the lock. If two
+        # threads race, they both end up with an equivalent context.
+        if isinstance(entry, _Serialized):
+            entry = self._deserialize(entry.data)
+            with self._lock:
+                self._deserializations += 1
+                if path in self._entries:
+                    self._entries[path] = entry
+
+        return entry
+
+    def put(self, path, context):
+        """
+        Caches the context of a document.
+
+        :param str path: The document path.
+        :param context: The context.
+        """
+        self._put(path, context)
+
+    def put_serialized(self, path, serialized_context):
+        """
+        Caches the serialized context of a document. It is only deserialized
+        once the document is looked up.
+
+        :param str path: The document path.
+        :param str serialized_context: The serialized context.
+        """
+        self._put(path, _Serialized(serialized_context))
+
+    def resize(self, max_size):
+        """
+        Changes the maximum number of documents in the cache, evicting the
+        least recently used ones beyond it.
+
+        :param int max_size: The maximum number of documents in the cache.
+        """
+        with self._lock:
+            self._max_size = max(1, max_size)
+            self._evict()
+
+    def clear(self):
+        """
+        Removes all the documents from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """
+        Returns the cache's statistics.
+
+        :returns: A dictionary with the current ``size``, the ``max_size``,
+            and the number of ``hits``, ``misses``, ``evictions`` and
+            ``deserializations`` so far.
+        """
+        with self._lock:
+            return dict(
+                size=len(self._entries),
+                max_size=self._max_size,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                deserializations=self._deserializations,
+            )
+
+    def _put(self, path, entry):
+        """
+        Caches an entry, evicting the least recently used ones beyond the
+        maximum size.
+        """
+        with self._lock:
+            self._entries[path] = entry
+            self._entries.move_to_end(path)
+            self._evict()
+
+    def _evict(self):
+        """
+        Evicts the least recently used entries beyond the maximum size. Must
+        be called with the lock held.
+        """
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
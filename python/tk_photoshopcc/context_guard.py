@@ -0,0 +1,46 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import contextlib
+
+
+class ContextChangeGuard(object):
+    """
+    Tracks whether context changes are disabled.
+
+    Disabling nests: an app may disable context changes around a call to an
+    engine method that disables them itself. Context changes are only enabled
+    again once every block that disabled them has exited, whether it returned
+    or raised.
+    """
+
+    def __init__(self):
+        """
+        Initialize the guard, with context changes enabled.
+        """
+        self._depth = 0
+
+    @property
+    def disabled(self):
+        """
+        ``True`` if context changes are disabled.
+        """
+        return self._depth > 0
+
+    @contextlib.contextmanager
+    def disable(self):
+        """
+        A context manager that disables context changes within it.
+        """
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
@@ -0,0 +1,281 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import sqlite3
+import threading
+import time
+
+
+class ContextIndex(object):
+    """
+    A persistent index of document paths to serialized contexts, backed by a
+    local SQLite database so that it survives restarts of the panel extension.
+
+    Each document is its own row, keyed by its normalized path, so adding or
+    looking up a document doesn't depend on how many are indexed. Along with
+    the serialized context, each row records the document's modification time
+    and the id of the pipeline configuration the context was resolved with.
+
+    The index also remembers the last known image url of the entities shown in
+    the context header, so that their thumbnail can be requested without
+    waiting for the entity to be queried.
+    """
+
+    SCHEMA_VERSION = 4
+
+    def __init__(self, path, logger):
+        """
+        Initialize the index, creating the database if needed.
+
+        :param str path: The path of the database file.
+        :param logger: The logger to use for debug output.
+        :raises sqlite3.Error: If the database can't be opened.
+        """
+        self._path = path
+        self._logger = logger
+        self._lock = threading.Lock()
+
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        # The index may be used from worker threads, so the connection isn't
+        # tied to the thread that created it. Access is serialized by the lock.
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._create_schema()
+
+    @staticmethod
+    def normalize_path(path):
+        """
+        Returns the key the given document path is indexed by. Paths that
+        refer to the same file on this platform give the same key.
+
+        :param str path: A document path.
+        """
+        return os.path.normcase(os.path.normpath(os.path.abspath(path)))
+
+    def get(self, path, pipeline_config_id=None):
+        """
+        Returns the serialized context indexed for a document.
+
+        :param str path: The document path.
+        :param pipeline_config_id: If given, only a context resolved with this
+            pipeline configuration is returned.
+        :returns: The serialized context, or ``None`` if there isn't one.
+        """
+        entry = self.get_entry(path)
+        if entry is None:
+            return None
+
+        if pipeline_config_id is not None and entry["pipeline_config_id"] not in (
+            None,
+            pipeline_config_id,
+        ):
+            return None
+
+        return entry["context"]
+
+    def get_entry(self, path):
+        """
+        Returns everything indexed for a document.
+
+        A document moved or deleted since it was indexed is removed from the
+        index instead. Saving a document doesn't change its context, so a
+        document modified since it was indexed is still returned.
+
+        :param str path: The document path.
+        :returns: A dictionary with ``context``, ``mtime`` and
+            ``pipeline_config_id`` keys, or ``None`` if the document isn't
+            indexed.
+        """
+        key = self.normalize_path(path)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT context, mtime, pipeline_config_id FROM contexts "
+                "WHERE path = ?",
+                (key,),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        if not self._is_current(path):
+            self._logger.debug("Removing outdated context index entry for %s" % path)
+            self.remove(path)
+            return None
+
+        return dict(context=row[0], mtime=row[1], pipeline_config_id=row[2])
+
+    def get_recent(self, limit, pipeline_config_id=None):
+        """
+        Returns the most recently indexed documents.
+
+        :param int limit: The maximum number of documents to return.
+        :param pipeline_config_id: If given, only contexts resolved with this
+            pipeline configuration are returned.
+        :returns: A list of (normalized path, serialized context) tuples, most
+            recently indexed first. Outdated documents are left out and
+            removed, as in :meth:`get_entry`.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT path, context, pipeline_config_id FROM contexts "
+                "ORDER BY updated DESC"
+            )
+            recent = []
+            outdated = []
+            for path, context, config_id in rows:
+                if len(recent) >= limit:
+                    break
+                if not self._is_current(path):
+                    outdated.append(path)
+                elif pipeline_config_id is None or config_id in (
+                    None,
+                    pipeline_config_id,
+                ):
+                    recent.append((path, context))
+
+        for path in outdated:
+            self.remove(path)
+
+        return recent
+
+    def put(self, path, serialized_context, pipeline_config_id=None):
+        """
+        Indexes the serialized context of a document, replacing anything
+        already indexed for it.
+
+        :param str path: The document path.
+        :param str serialized_context: The serialized context.
+        :param pipeline_config_id: The id of the pipeline configuration the
+            context was resolved with.
+        """
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = None
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO contexts "
+                "(path, context, mtime, pipeline_config_id, updated) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    self.normalize_path(path),
+                    serialized_context,
+                    mtime,
+                    pipeline_config_id,
+                    time.time(),
+                ),
+            )
+
+    def get_image_url(self, entity_type, entity_id):
+        """
+        Returns the last known image url of an entity.
+
+        :param str entity_type: The type of the entity.
+        :param int entity_id: The id of the entity.
+        :returns: The url, or ``None`` if it isn't known.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT url FROM entity_images WHERE entity_type = ? AND entity_id = ?",
+                (entity_type, entity_id),
+            ).fetchone()
+
+        return row[0] if row else None
+
+    def put_image_url(self, entity_type, entity_id, url):
+        """
+        Remembers the image url of an entity.
+
+        :param str entity_type: The type of the entity.
+        :param int entity_id: The id of the entity.
+        :param str url: The url of the entity's image.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO entity_images (entity_type, entity_id, url) "
+                "VALUES (?, ?, ?)",
+                (entity_type, entity_id, url),
+            )
+
+    def remove(self, path):
+        """
+        Removes a document from the index.
+
+        :param str path: The document path.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM contexts WHERE path = ?", (self.normalize_path(path),)
+            )
+
+    def clear(self):
+        """
+        Removes all the documents from the index.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM contexts")
+
+    def close(self):
+        """
+        Closes the database.
+        """
+        with self._lock:
+            self._connection.close()
+
+    def __len__(self):
+        with self._lock:
+            row = self._connection.execute("SELECT COUNT(*) FROM contexts").fetchone()
+        return row[0]
+
+    @staticmethod
+    def _is_current(path):
+        """
+        Returns ``True`` if a document is still where it was indexed.
+
+        :param str path: The document path.
+        """
+        return os.path.isfile(path)
+
+    def _create_schema(self):
+        """
+        Creates the index tables, recreating them if they were made by a
+        different version of this class.
+        """
+        with self._lock, self._connection:
+            version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+            if version != self.SCHEMA_VERSION:
+                self._logger.debug(
+                    "Creating context index version %d in %s"
+                    % (self.SCHEMA_VERSION, self._path)
+                )
+                self._connection.execute("DROP TABLE IF EXISTS contexts")
+                self._connection.execute("DROP TABLE IF EXISTS entity_images")
+                self._connection.execute(
+                    "CREATE TABLE contexts ("
+                    "path TEXT PRIMARY KEY, "
+                    "context TEXT NOT NULL, "
+                    "mtime REAL, "
+                    "pipeline_config_id INTEGER, "
+                    "updated REAL NOT NULL)"
+                )
+                self._connection.execute(
+                    "CREATE TABLE entity_images ("
+                    "entity_type TEXT NOT NULL, "
+                    "entity_id INTEGER NOT NULL, "
+                    "url TEXT NOT NULL, "
+                    "PRIMARY KEY (entity_type, entity_id))"
+                )
+                self._connection.execute(
+                    "PRAGMA user_version = %d" % self.SCHEMA_VERSION
+                )
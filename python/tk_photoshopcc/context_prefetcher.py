@@ -0,0 +1,107 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import threading
+import time
+
+
+class ContextPrefetcher(threading.Thread):
+    """
+    Resolves the contexts of a list of documents from a background thread,
+    ahead of them being switched to.
+
+    Resolutions are spaced out by a minimum interval so that prefetching
+    doesn't compete with the main thread for the filesystem and the site.
+    Prefetching can be cancelled at any time, in which case it stops after the
+    resolution in progress, if any.
+    """
+
+    def __init__(self, paths, resolve, interval, logger, on_finished=None):
+        """
+        Initialize the prefetcher.
+
+        :param list paths: The document paths to resolve.
+        :param resolve: Callable resolving and caching the context of a path.
+            It returns ``False`` if the path didn't need resolving, and raises
+            if its context couldn't be resolved.
+        :param float interval: The minimum time between two resolutions, in
+            seconds.
+        :param logger: The logger to use for debug output.
+        :param on_finished: Optional callable, called from the prefetch thread
+            with the prefetcher once it's done, unless it was cancelled.
+        """
+        super().__init__(name="tk-photoshopcc context prefetch")
+        self.daemon = True
+
+        self._paths = list(paths)
+        self._resolve = resolve
+        self._interval = interval
+        self._logger = logger
+        self._on_finished = on_finished
+        self._cancelled = threading.Event()
+
+        self.warmed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.elapsed = 0.0
+
+    @property
+    def cancelled(self):
+        """
+        ``True`` if prefetching was cancelled.
+        """
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """
+        Cancels prefetching. Returns without waiting for the thread to finish.
+        """
+        self._cancelled.set()
+
+    def run(self):
+        """
+        Resolves the documents' contexts until they're all resolved or
+        prefetching is cancelled.
+        """
+        start = time.perf_counter()
+
+        for index, path in enumerate(self._paths):
+            # Wait between resolutions, returning early if cancelled.
+            if index and self._cancelled.wait(self._interval):
+                break
+            if self._cancelled.is_set():
+                break
+
+            try:
+                if self._resolve(path):
+                    self.warmed += 1
+                else:
+                    self.skipped += 1
+            except Exception:
+                self._logger.debug("Unable to prefetch the context of %s." % path)
+                self.failed += 1
+
+        self.elapsed = time.perf_counter() - start
+
+        self._logger.debug(
+            "Context prefetch %s after %.2fs: %d warmed, %d already known, "
+            "%d failed, out of %d documents."
+            % (
+                "cancelled" if self.cancelled else "finished",
+                self.elapsed,
+                self.warmed,
+                self.skipped,
+                self.failed,
+                len(self._paths),
+            )
+        )
+
+        if self._on_finished and not self.cancelled:
+            self._on_finished(self)
@@ -0,0 +1,156 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import collections
+import time
+from urllib.parse import urlparse
+
+
+class HeaderCache(object):
+    """
+    Remembers the entity records queried to display the context header, keyed
+    by entity and the fields queried.
+
+    A record stays fresh for a length of time after it was stored. Stale
+    records are still returned, so that they can be displayed while they're
+    refreshed.
+
+    The thumbnails downloaded for the records are remembered alongside them.
+    Both hold at most a fixed number of entries, and adding one to a full
+    cache evicts the least recently used. The downloaded thumbnail files
+    belong to the shared thumbnail cache of the data retriever, so they're
+    never deleted here.
+    """
+
+    def __init__(self, ttl, max_size):
+        """
+        Initialize the cache.
+
+        :param float ttl: How long a record stays fresh, in seconds.
+        :param int max_size: The maximum number of records, and of
+            thumbnails, in the cache.
+        """
+        self._ttl = ttl
+        self._max_size = max(1, max_size)
+        self._records = collections.OrderedDict()
+        self._thumbnails = collections.OrderedDict()
+
+    @staticmethod
+    def get_key(entity_type, entity_id, fields):
+        """
+        Returns the key a record is cached under.
+
+        :param str entity_type: The type of the entity.
+        :param int entity_id: The id of the entity.
+        :param list fields: The fields queried.
+        """
+        return (entity_type, entity_id, tuple(sorted(fields)))
+
+    @staticmethod
+    def get_thumbnail_key(record):
+        """
+        Returns the key a downloaded thumbnail of an entity record can be
+        remembered under. It changes when the entity's image changes.
+
+        :param dict record: An entity record with its image.
+        """
+        return (record["type"], record["id"], _comparable(record).get("image"))
+
+    def get(self, key):
+        """
+        Returns the record cached under a key.
+
+        :param key: A key from :meth:`get_key`.
+        :returns: A (record, fresh) tuple. The record is ``None`` if nothing
+            is cached under the key.
+        """
+        entry = self._records.get(key)
+        if entry is None:
+            return None, False
+
+        self._records.move_to_end(key)
+        record, stored = entry
+        return record, time.monotonic() - stored < self._ttl
+
+    def put(self, key, record):
+        """
+        Caches a record, making it fresh.
+
+        :param key: A key from :meth:`get_key`.
+        :param dict record: The entity record.
+        """
+        self._records[key] = (record, time.monotonic())
+        self._records.move_to_end(key)
+
+        while len(self._records) > self._max_size:
+            self._records.popitem(last=False)
+
+    def get_thumbnail(self, key):
+        """
+        Returns the thumbnail downloaded for a record.
+
+        :param key: A key from :meth:`get_thumbnail_key`.
+        :returns: The thumbnail data, as sent to the panel, or ``None`` if it
+            hasn't been downloaded.
+        """
+        data = self._thumbnails.get(key)
+        if data is None:
+            return None
+
+        self._thumbnails.move_to_end(key)
+        return dict(data)
+
+    def put_thumbnail(self, key, data):
+        """
+        Remembers the thumbnail downloaded for a record.
+
+        :param key: A key from :meth:`get_thumbnail_key`.
+        :param dict data: The thumbnail data, with the downloaded file's path
+            as ``thumb_path``.
+        """
+        self._thumbnails[key] = dict(data)
+        self._thumbnails.move_to_end(key)
+
+        while len(self._thumbnails) > self._max_size:
+            self._thumbnails.popitem(last=False)
+
+    def clear(self):
+        """
+        Forgets all the records and thumbnails.
+        """
+        self._records.clear()
+        self._thumbnails.clear()
+
+    @staticmethod
+    def same_record(record, other):
+        """
+        Returns ``True`` if two records of an entity would display the same.
+
+        Image fields hold signed urls that change with every query, so only
+        the location of the image is compared.
+
+        :param dict record: An entity record.
+        :param dict other: Another record of the same entity.
+        """
+        if record is None or other is None:
+            return record is other
+        return _comparable(record) == _comparable(other)
+
+
+def _comparable(record):
+    """
+    Returns a copy of a record with its image url reduced to its location.
+    """
+    record = dict(record)
+    image = record.get("image")
+    if image:
+        parsed = urlparse(image)
+        record["image"] = (parsed.netloc, parsed.path)
+    return record
@@ -0,0 +1,122 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import time
+
+
+class HeartbeatScheduler(object):
+    """
+    Decides when the next heartbeat is due, and when failed heartbeats mean
+    the connection is lost.
+
+    The interval doubles after each heartbeat that finds the connection idle,
+    up to a ceiling, and snaps back to the minimum as soon as there is
+    activity or a heartbeat fails. Failures are tolerated for a length of time
+    rather than a number of heartbeats, so the tolerance doesn't depend on the
+    current interval.
+    """
+
+    def __init__(self, min_interval, max_interval, tolerance, backoff=2.0):
+        """
+        Initialize the scheduler.
+
+        :param float min_interval: The interval used while the connection is
+            active, in seconds.
+        :param float max_interval: The longest interval used while the
+            connection is idle, in seconds.
+        :param float tolerance: How long heartbeats may keep failing before
+            the connection is considered lost, in seconds.
+        :param float backoff: The factor the interval grows by after each
+            idle heartbeat.
+        """
+        self._min_interval = min_interval
+        self._max_interval = max(min_interval, max_interval)
+        self._tolerance = tolerance
+        self._backoff = backoff
+        self._interval = min_interval
+        self._failing_since = None
+        self._last_heartbeat = None
+
+    @property
+    def interval(self):
+        """
+        The number of seconds to wait until the next heartbeat.
+        """
+        return self._interval
+
+    def is_due(self, now=None):
+        """
+        Returns ``True`` if the next heartbeat is due.
+
+        :param float now: The current time. Defaults to :func:`time.time`.
+        """
+        if self._last_heartbeat is None:
+            return True
+        now = time.time() if now is None else now
+        # Checks are made by a timer running at the minimum interval, which
+        # can fire a little early. Allow for that so that a heartbeat isn't
+        # put off by a whole tick.
+        elapsed = now - self._last_heartbeat + self._min_interval / 2.0
+        return elapsed >= self._interval
+
+    @property
+    def min_interval(self):
+        """
+        The interval used while the connection is active, in seconds.
+        """
+        return self._min_interval
+
+    def activity(self):
+        """
+        Records activity on the connection, returning to the minimum interval.
+
+        :returns: ``True`` if the interval changed.
+        """
+        changed = self._interval != self._min_interval
+        self._interval = self._min_interval
+        return changed
+
+    def idle(self, now=None):
+        """
+        Records a successful heartbeat that found the connection idle, which
+        backs off the interval.
+
+        :param float now: The current time. Defaults to :func:`time.time`.
+        """
+        self._last_heartbeat = time.time() if now is None else now
+        self._failing_since = None
+        self._interval = min(self._interval * self._backoff, self._max_interval)
+
+    def success(self, now=None):
+        """
+        Records a successful heartbeat while the connection is active.
+
+        :param float now: The current time. Defaults to :func:`time.time`.
+        """
+        self._last_heartbeat = time.time() if now is None else now
+        self._failing_since = None
+
+    def failure(self, now=None):
+        """
+        Records a failed heartbeat. The interval returns to the minimum so that
+        the connection is checked again quickly.
+
+        :param float now: The current time. Defaults to :func:`time.time`.
+        :returns: ``True`` if heartbeats have been failing for longer than the
+            tolerance, meaning the connection should be considered lost.
+        """
+        now = time.time() if now is None else now
+
+        self._last_heartbeat = now
+        if self._failing_since is None:
+            self._failing_since = now
+        self._interval = self._min_interval
+
+        return now - self._failing_since >= self._tolerance
@@ -0,0 +1,181 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import re
+
+
+def export_as_jpeg(
+    adobe, operation, document, jpeg_pub_path, max_size, quality, snapshot, logger
+):
+    """
+    Export a Jpeg image from the given document or from the current document.
+
+    The export is run as a single job in the host with the given scripted
+    operation when there is one. If that fails for any reason, the export is
+    driven step by step over RPC instead, with
+    :func:`export_as_jpeg_by_steps`.
+
+    :param adobe: The Adobe bridge.
+    :param operation: The :class:`ScriptedOperation` running
+        ``EXPORT_AS_JPEG_SCRIPT``, or ``None`` to always export step by step.
+    :param document: The document to export. Assumes the active document if
+        ``None`` is supplied.
+    :param str jpeg_pub_path: The output file path to write the image to.
+    :param int max_size: The maximum width and height of the exported image.
+    :param int quality: The Jpeg quality of the exported image.
+    :param snapshot: Callable reading several properties of a host object in
+        a single round trip, like the engine's ``snapshot()``.
+    :param logger: The logger to use for debug output.
+    :returns: The full path to the exported image.
+    :raises: RuntimeError if the document or its size can't be retrieved.
+    """
+    if operation is not None:
+        try:
+            result = operation(document, jpeg_pub_path, max_size, quality)
+        except Exception as e:
+            logger.debug(
+                "Scripted jpeg export failed, exporting step by step: %s" % e,
+                exc_info=True,
+            )
+        else:
+            logger.debug(
+                "Exported %s (%sx%s) in %.3fs in the host."
+                % (
+                    result["path"],
+                    result["width"],
+                    result["height"],
+                    result["elapsed"],
+                )
+            )
+            return result["path"]
+
+    return export_as_jpeg_by_steps(
+        adobe, document, jpeg_pub_path, max_size, quality, snapshot, logger
+    )
+
+
+def export_as_jpeg_by_steps(
+    adobe, document, jpeg_pub_path, max_size, quality, snapshot, logger
+):
+    """
+    Export a Jpeg image from the given document or from the current document,
+    issuing an RPC request for each step of the export. This is what the
+    ``EXPORT_AS_JPEG_SCRIPT`` scripted operation does in a single job.
+
+    :param adobe: The Adobe bridge.
+    :param document: The document to export. Assumes the active document if
+        ``None`` is supplied.
+    :param str jpeg_pub_path: The output file path to write the image to.
+    :param int max_size: The maximum width and height of the exported image.
+    :param int quality: The Jpeg quality of the exported image.
+    :param snapshot: Callable reading several properties of a host object in
+        a single round trip, like the engine's ``snapshot()``.
+    :param logger: The logger to use for debug output.
+    :returns: The full path to the exported image.
+    :raises: RuntimeError if the document or its size can't be retrieved.
+    """
+    # Get some current values so we can restore them.
+    original_ruler_units = adobe.app.preferences.rulerUnits
+    original_dialog_mode = adobe.app.displayDialogs
+
+    try:
+        # Set unit system to pixels:
+        adobe.app.preferences.rulerUnits = adobe.Units.PIXELS
+        # Disable dialogs.
+        adobe.app.displayDialogs = adobe.DialogModes.NO
+
+        try:
+            active_doc = document or adobe.app.activeDocument
+        except RuntimeError as e:
+            # Exceptions reported by Photoshop CEP through the RPC API
+            # are pretty useless, so catch the error, raise our own exception
+            # but still log the original exception for debug purpose.
+            logger.debug(
+                "Unable to retrieve a document: %s" % e,
+                exc_info=True,  # Get traceback automatically
+            )
+            raise RuntimeError("Unable to retrieve a document")
+
+        doc_info = snapshot(active_doc, ["name", "width.value", "height.value"])
+        orig_name = doc_info["name"]
+        width_str = str(doc_info["width.value"])
+        height_str = str(doc_info["height.value"])
+
+        if orig_name is None:
+            raise RuntimeError("Unable to retrieve the document name")
+
+        # Get a temp document name so we can manipulate the document without
+        # affecting the original docuement.
+        name, sfx = os.path.splitext(orig_name)
+        # a "." is included in the extension returned by splitext
+        jpeg_name = "%s_tkjpeg%s" % (name, sfx)
+
+        # Find the doc size in pixels
+        # Note: this doesn't handle measurements other than pixels.
+        doc_width = doc_height = 0
+        # It seems we used to get back "<size> px" but now we receive back
+        # just a number, so let's have the " px" bit optional.
+        exp = re.compile("^(?P<value>[0-9]+)( px)?$")
+        mo = exp.match(width_str)
+        if mo:
+            doc_width = int(mo.group("value"))
+        mo = exp.match(height_str)
+        if mo:
+            doc_height = int(mo.group("value"))
+
+        jpeg_width = jpeg_height = 0
+        if doc_width and doc_height:
+            max_sz = max(doc_width, doc_height)
+            if max_sz > max_size:
+                scale = min(float(max_size) / float(max_sz), 1.0)
+                jpeg_width = max(min(int(doc_width * scale), doc_width), 1)
+                jpeg_height = max(min(int(doc_height * scale), doc_height), 1)
+        else:
+            raise RuntimeError(
+                "Unable to retrieve document size from %s x %s "
+                % (
+                    width_str,
+                    height_str,
+                )
+            )
+
+        # Get a file object from Photoshop for this path and the current
+        # jpg save options:
+        jpeg_file = adobe.File(jpeg_pub_path)
+        jpeg_options = adobe.JPEGSaveOptions()
+        jpeg_options.quality = quality
+
+        # duplicate the original doc:
+        save_options = adobe.SaveOptions.DONOTSAVECHANGES
+        jpeg_doc = active_doc.duplicate(jpeg_name)
+
+        try:
+            # Flatten image:
+            jpeg_doc.flatten()
+            # Convert to eight bits
+            jpeg_doc.bitsPerChannel = adobe.BitsPerChannelType.EIGHT
+            # Resize if needed:
+            if jpeg_width and jpeg_height:
+                jpeg_doc.resizeImage("%d px" % jpeg_width, "%d px" % jpeg_height)
+            # Save:
+            jpeg_doc.saveAs(jpeg_file, jpeg_options, True)
+
+        finally:
+            # Close the doc:
+            jpeg_doc.close(save_options)
+
+    finally:
+        # Set units back to original
+        adobe.app.preferences.rulerUnits = original_ruler_units
+        # Set dialog mode back to original.
+        adobe.app.displayDialogs = original_dialog_mode
+
+    return jpeg_pub_path
@@ -0,0 +1,108 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import collections
+import itertools
+import threading
+
+
+class LogForwarder(object):
+    """
+    Buffers log messages destined for the panel and forwards them from the
+    main thread, at each tick of the connection timer or once enough of them
+    are waiting, rather than as they're logged.
+
+    The bridge has no call to forward several messages at once, but each
+    message carries a single level. Consecutive messages of the same level are
+    joined with newlines and sent to the panel as one message, so a batch
+    costs one round trip per change of level rather than one per message.
+
+    The buffer is bounded. When it is full, the oldest messages are dropped to
+    make room for new ones, and the number of dropped messages is reported
+    with the next batch.
+    """
+
+    def __init__(self, adobe, buffer_size, batch_size):
+        """
+        Initialize the forwarder.
+
+        :param adobe: The Adobe bridge to forward messages through.
+        :param int buffer_size: The maximum number of messages held in the
+            buffer before the oldest ones are dropped.
+        :param int batch_size: The number of buffered messages at which the
+            buffer should be flushed without waiting for the next tick.
+        """
+        self._adobe = adobe
+        self._batch_size = batch_size
+        self._messages = collections.deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._flushing = False
+        self._dropped = 0
+
+    @property
+    def dropped(self):
+        """
+        The number of messages dropped since the last flush because the buffer
+        was full.
+        """
+        with self._lock:
+            return self._dropped
+
+    def add(self, level, message):
+        """
+        Adds a message to the buffer. The buffer is flushed right away if it
+        reached the batch size and this is called from the main thread.
+        Messages added from other threads are forwarded on the next flush.
+
+        :param str level: The js log level of the message.
+        :param str message: The message to forward.
+        """
+        with self._lock:
+            if len(self._messages) == self._messages.maxlen:
+                self._dropped += 1
+            self._messages.append((level, message))
+            batch_ready = len(self._messages) >= self._batch_size
+
+        if batch_ready and threading.current_thread() is threading.main_thread():
+            self.flush()
+
+    def flush(self):
+        """
+        Forwards all the buffered messages to the panel, in the order they
+        were logged, joining consecutive messages of the same level.
+        """
+        with self._lock:
+            # Forwarding can itself log messages, such as network debug
+            # output. Those are buffered for the next flush rather than
+            # recursing.
+            if self._flushing:
+                return
+
+            messages = list(self._messages)
+            self._messages.clear()
+            dropped = self._dropped
+            self._dropped = 0
+
+            if not messages and not dropped:
+                return
+            self._flushing = True
+
+        if dropped:
+            messages.insert(
+                0,
+                ("warn", "%d log messages were dropped before this batch." % dropped),
+            )
+
+        try:
+            for level, group in itertools.groupby(messages, key=lambda m: m[0]):
+                self._adobe.log_message(level, "\n".join(m for _, m in group))
+        finally:
+            with self._lock:
+                self._flushing = False
@@ -0,0 +1,258 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import collections
+import time
+
+
+class MessagePump(object):
+    """
+    Handles the messages received from the panel within a time budget per
+    tick of the event loop.
+
+    The bridge's signals are connected to the pump rather than to their
+    handlers, so reading messages off the socket only queues them up and
+    schedules a tick. The queue is then drained until the budget runs out, at
+    which point the pump yields back to the event loop and picks up where it
+    left off on the next tick. At least one message is handled per tick,
+    however long it takes.
+
+    Messages are queued in priority lanes. Each tick drains the normal lane
+    before the low one, so that a flood of low priority messages, like js log
+    messages, can't hold up a user-facing one. Messages within a lane are
+    handled in the order they arrived in, so user-facing messages that depend
+    on each other, like a command triggered right after a document switch,
+    must share a lane. Signals connected in bulk have all their queued
+    messages handled by a single call.
+    """
+
+    # The priority lanes, highest priority first.
+    NORMAL = "normal"
+    LOW = "low"
+    LANES = [NORMAL, LOW]
+
+    def __init__(self, budget, logger):
+        """
+        Initialize the pump.
+
+        :param float budget: The time the pump may spend handling messages
+            per tick, in seconds.
+        :param logger: The logger to use for debug output.
+        """
+        self._budget = budget
+        self._logger = logger
+        self._lanes = collections.OrderedDict(
+            (lane, collections.deque()) for lane in self.LANES
+        )
+        self._connections = []
+        self._tick_scheduled = False
+
+        self._ticks = 0
+        self._max_depth = 0
+        self._tick_time = 0.0
+        self._max_tick_time = 0.0
+        self._last_tick_time = 0.0
+        self._lane_counters = dict(
+            (lane, dict(queued=0, handled=0, calls=0, max_depth=0))
+            for lane in self.LANES
+        )
+
+    @property
+    def depth(self):
+        """
+        The number of messages waiting to be handled, across all lanes.
+        """
+        return sum(len(queue) for queue in self._lanes.values())
+
+    def connect(self, signal, handler, lane=NORMAL, bulk=False):
+        """
+        Connects a bridge signal so that its emissions are queued up and
+        handled by the pump.
+
+        :param signal: The bridge signal to connect.
+        :param handler: The callable to handle the signal's emissions with.
+        :param str lane: The priority lane to queue the emissions in.
+        :param bool bulk: If ``True``, the handler is called with a list of
+            the argument tuples of all the queued emissions, rather than once
+            per emission.
+        """
+
+        def _queue(*args):
+            self.post(handler, *args, lane=lane, bulk=bulk)
+
+        signal.connect(_queue)
+        self._connections.append((signal, _queue))
+
+    def disconnect(self):
+        """
+        Disconnects all the signals connected to the pump and drops any
+        messages still waiting to be handled.
+        """
+        for signal, slot in self._connections:
+            signal.disconnect(slot)
+        self._connections = []
+
+        for queue in self._lanes.values():
+            queue.clear()
+
+    def post(self, handler, *args, lane=NORMAL, bulk=False):
+        """
+        Queues up a message to be handled on a later tick.
+
+        :param handler: The callable to handle the message with.
+        :param args: The arguments to call the handler with.
+        :param str lane: The priority lane to queue the message in.
+        :param bool bulk: If ``True``, the message is handled together with
+            the other queued bulk messages for the same handler. See
+            :meth:`connect`.
+        """
+        queue = self._lanes[lane]
+        queue.append((handler, args, bulk))
+
+        counters = self._lane_counters[lane]
+        counters["queued"] += 1
+        counters["max_depth"] = max(counters["max_depth"], len(queue))
+        self._max_depth = max(self._max_depth, self.depth)
+
+        self._schedule_tick()
+
+    def pump(self):
+        """
+        Handles queued up messages, highest priority first, until the time
+        budget runs out.
+        """
+        self._tick_scheduled = False
+
+        if not self.depth:
+            return
+
+        start = time.perf_counter()
+        elapsed = 0.0
+
+        # Handlers may run the event loop, for example while waiting on an
+        # RPC response, which can run a nested tick. Each message is taken off
+        # its queue before it is handled so that it is only handled once.
+        while True:
+            lane = self._next_lane()
+            if lane is None:
+                break
+
+            handler, args, bulk = self._lanes[lane].popleft()
+            if bulk:
+                messages = [args] + self._take_bulk(lane, handler)
+                args = (messages,)
+                handled = len(messages)
+            else:
+                handled = 1
+
+            try:
+                handler(*args)
+            except Exception:
+                self._logger.exception("Failed to handle message from the panel.")
+
+            counters = self._lane_counters[lane]
+            counters["handled"] += handled
+            counters["calls"] += 1
+
+            elapsed = time.perf_counter() - start
+            if elapsed >= self._budget:
+                break
+
+        self._ticks += 1
+        self._tick_time += elapsed
+        self._last_tick_time = elapsed
+        self._max_tick_time = max(self._max_tick_time, elapsed)
+
+        if self.depth:
+            self._logger.debug(
+                "Message budget spent after %.1fms. %d messages left for the "
+                "next tick." % (elapsed * 1000.0, self.depth)
+            )
+            self._schedule_tick()
+
+    def get_metrics(self):
+        """
+        Returns the pump's metrics. Times are in seconds.
+
+        :returns: A dictionary of the following form::
+
+            {
+                "depth": 0,
+                "max_depth": 250,
+                "handled": 1200,
+                "ticks": 40,
+                "last_tick_time": 0.002,
+                "mean_tick_time": 0.031,
+                "max_tick_time": 0.120,
+                "lanes": {
+                    "normal": {
+                        "depth": 0,
+                        "max_depth": 1,
+                        "queued": 3,
+                        "handled": 3,
+                        "calls": 3,
+                    },
+                    ...
+                },
+            }
+        """
+        lanes = dict()
+        for lane, queue in self._lanes.items():
+            lanes[lane] = dict(self._lane_counters[lane], depth=len(queue))
+
+        return dict(
+            depth=self.depth,
+            max_depth=self._max_depth,
+            handled=sum(counters["handled"] for counters in lanes.values()),
+            ticks=self._ticks,
+            last_tick_time=self._last_tick_time,
+            mean_tick_time=(self._tick_time / self._ticks) if self._ticks else 0.0,
+            max_tick_time=self._max_tick_time,
+            lanes=lanes,
+        )
+
+    def _next_lane(self):
+        """
+        Returns the highest priority lane with messages waiting, or ``None``
+        if all the lanes are empty.
+        """
+        for lane, queue in self._lanes.items():
+            if queue:
+                return lane
+        return None
+
+    def _take_bulk(self, lane, handler):
+        """
+        Takes all the bulk messages queued in the given lane for the given
+        handler off the queue, and returns their arguments in order.
+        """
+        queue = self._lanes[lane]
+        taken = []
+        kept = collections.deque()
+
+        while queue:
+            item = queue.popleft()
+            if item[0] == handler and item[2]:
+                taken.append(item[1])
+            else:
+                kept.append(item)
+
+        queue.extend(kept)
+        return taken
+
+    def _schedule_tick(self):
+        """
+        Makes sure a tick runs on the next pass of the event loop.
+        """
+        from sgtk.platform.qt import QtCore
+
+        if not self._tick_scheduled:
+            self._tick_scheduled = True
+            QtCore.QTimer.singleShot(0, self.pump)
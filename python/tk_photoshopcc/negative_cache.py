@@ -0,0 +1,101 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import threading
+import time
+
+
+class NegativeCache(object):
+    """
+    Remembers the document paths found not to be under pipeline control, so
+    that they aren't resolved again every time the document is activated.
+
+    Only definitive results belong in the cache. A lookup that failed for a
+    reason that may go away, like a dropped connection, should be retried.
+
+    An entry expires after a length of time, or as soon as the document's
+    modification time changes, whichever comes first.
+    """
+
+    def __init__(self, ttl):
+        """
+        Initialize the cache.
+
+        :param float ttl: How long a path is remembered for, in seconds.
+        """
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = dict()
+        self._hits = 0
+
+    @property
+    def hits(self):
+        """
+        The number of lookups that found a remembered path.
+        """
+        return self._hits
+
+    def add(self, path):
+        """
+        Remembers that a document isn't under pipeline control.
+
+        :param str path: The document path.
+        """
+        with self._lock:
+            self._entries[path] = (time.monotonic(), _get_mtime(path))
+
+    def contains(self, path):
+        """
+        Returns ``True`` if the document was found not to be under pipeline
+        control recently, and hasn't changed since.
+
+        :param str path: The document path.
+        """
+        with self._lock:
+            entry = self._entries.get(path)
+
+        if entry is None:
+            return False
+
+        added, mtime = entry
+        if time.monotonic() - added < self._ttl and _get_mtime(path) == mtime:
+            with self._lock:
+                self._hits += 1
+            return True
+
+        self.discard(path)
+        return False
+
+    def discard(self, path):
+        """
+        Forgets a document path.
+
+        :param str path: The document path.
+        """
+        with self._lock:
+            self._entries.pop(path, None)
+
+    def clear(self):
+        """
+        Forgets all the document paths.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+def _get_mtime(path):
+    """
+    Returns the modification time of a file, or ``None`` if it can't be read.
+    """
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
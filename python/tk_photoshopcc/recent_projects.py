@@ -0,0 +1,97 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import json
+import os
+import threading
+
+
+class RecentProjects(object):
+    """
+    The ids of the projects most recently worked in, most recent first,
+    stored in a small JSON file so that they're remembered across launches.
+
+    The file is meant to live outside of any one project's cache location,
+    and is never cleared, so that it holds the projects a user moves between.
+    """
+
+    def __init__(self, path, max_size, logger):
+        """
+        Initialize the history, reading it back from disk if it exists.
+
+        :param str path: The path of the JSON file.
+        :param int max_size: The maximum number of projects remembered.
+        :param logger: The logger to use for debug output.
+        """
+        self._path = path
+        self._max_size = max(1, max_size)
+        self._logger = logger
+        self._lock = threading.Lock()
+        self._project_ids = self._read()
+
+    @property
+    def project_ids(self):
+        """
+        The ids of the most recent projects, most recent first.
+        """
+        with self._lock:
+            return list(self._project_ids)
+
+    def add(self, project_id):
+        """
+        Records a project as the most recent one, and writes the history to
+        disk if that changed it.
+
+        :param int project_id: The id of the project.
+        """
+        with self._lock:
+            project_ids = [project_id] + [
+                p for p in self._project_ids if p != project_id
+            ]
+            project_ids = project_ids[: self._max_size]
+            if project_ids == self._project_ids:
+                return
+
+            self._project_ids = project_ids
+            self._write(project_ids)
+
+    def _read(self):
+        """
+        Returns the project ids stored on disk, or an empty list if there
+        aren't any or they can't be read.
+        """
+        try:
+            with open(self._path) as fh:
+                project_ids = json.load(fh)
+        except (IOError, OSError, ValueError):
+            return []
+
+        if not isinstance(project_ids, list):
+            return []
+
+        return [p for p in project_ids if isinstance(p, int)][: self._max_size]
+
+    def _write(self, project_ids):
+        """
+        Writes the project ids to disk. The file is replaced in one go, so
+        that another process never reads a partial history.
+        """
+        temp_path = "%s.%d.tmp" % (self._path, os.getpid())
+        try:
+            folder = os.path.dirname(self._path)
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder)
+            with open(temp_path, "w") as fh:
+                json.dump(project_ids, fh)
+            os.replace(temp_path, self._path)
+        except (IOError, OSError):
+            self._logger.debug(
+                "Unable to store recent projects in %s." % self._path, exc_info=True
+            )
@@ -0,0 +1,236 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import collections
+import functools
+import json
+import os
+import threading
+import time
+
+
+class RPCMetrics(object):
+    """
+    Records the number of calls, total time and latency percentiles of the
+    RPC requests made through the Adobe bridge.
+
+    Recording works by wrapping the bridge's methods on the bridge instance
+    when :meth:`install` is called. Nothing is wrapped otherwise, so there is
+    no cost when metrics aren't enabled. Named helpers, like ``send_commands``,
+    are recorded on their own as well as through the generic requests they
+    make, if any.
+    """
+
+    # The bridge methods that are recorded, if the bridge provides them.
+    METHOD_NAMES = [
+        "rpc_get",
+        "rpc_set",
+        "rpc_call",
+        "rpc_eval",
+        "rpc_get_index",
+        "ping",
+        "context_about_to_change",
+        "export_image",
+        "get_active_document_path",
+        "log_message",
+        "save_as_psb",
+        "send_commands",
+        "send_context_display",
+        "send_context_thumbnail",
+    ]
+
+    # The number of most recent latencies kept per method for computing
+    # percentiles. Call counts and total time cover all calls.
+    MAX_SAMPLES = 1000
+
+    # The number of previous sessions' metrics files kept by rotate_file().
+    MAX_BACKUPS = 5
+
+    def __init__(self, adobe):
+        """
+        Initialize the metrics.
+
+        :param adobe: The Adobe bridge to record requests for.
+        """
+        self._adobe = adobe
+        self._lock = threading.Lock()
+        self._installed = []
+        self._counts = collections.defaultdict(int)
+        self._totals = collections.defaultdict(float)
+        self._samples = collections.defaultdict(
+            lambda: collections.deque(maxlen=self.MAX_SAMPLES)
+        )
+
+    def install(self):
+        """
+        Starts recording the bridge's requests.
+        """
+        available = dir(self._adobe)
+
+        for method_name in self.METHOD_NAMES:
+            if method_name in self._installed or method_name not in available:
+                continue
+            method = getattr(self._adobe, method_name)
+            setattr(self._adobe, method_name, self._wrap(method_name, method))
+            self._installed.append(method_name)
+
+    def uninstall(self):
+        """
+        Stops recording the bridge's requests. Recorded metrics are kept.
+        """
+        for method_name in self._installed:
+            try:
+                delattr(self._adobe, method_name)
+            except AttributeError:
+                pass
+        self._installed = []
+
+    def record(self, method_name, elapsed):
+        """
+        Records a single request.
+
+        :param str method_name: The name of the bridge method called.
+        :param float elapsed: The time the request took, in seconds.
+        """
+        with self._lock:
+            self._counts[method_name] += 1
+            self._totals[method_name] += elapsed
+            self._samples[method_name].append(elapsed)
+
+    def get_metrics(self):
+        """
+        Returns the recorded metrics. Times are in seconds.
+
+        :returns: A dictionary of the following form, keyed by method name::
+
+            {
+                "rpc_get": {
+                    "count": 120,
+                    "total": 3.2,
+                    "mean": 0.026,
+                    "p50": 0.021,
+                    "p90": 0.045,
+                    "p99": 0.110,
+                    "max": 0.130,
+                },
+                ...
+            }
+        """
+        metrics = dict()
+
+        with self._lock:
+            for method_name, count in self._counts.items():
+                samples = sorted(self._samples[method_name])
+                total = self._totals[method_name]
+                metrics[method_name] = dict(
+                    count=count,
+                    total=total,
+                    mean=total / count,
+                    p50=_percentile(samples, 50),
+                    p90=_percentile(samples, 90),
+                    p99=_percentile(samples, 99),
+                    max=samples[-1],
+                )
+
+        return metrics
+
+    def format(self):
+        """
+        Returns the recorded metrics as a human readable table, slowest
+        methods by total time first.
+        """
+        lines = [
+            "%-26s %8s %10s %10s %10s %10s"
+            % ("method", "count", "total(s)", "p50(ms)", "p90(ms)", "p99(ms)")
+        ]
+        metrics = self.get_metrics()
+
+        for method_name in sorted(metrics, key=lambda m: -metrics[m]["total"]):
+            m = metrics[method_name]
+            lines.append(
+                "%-26s %8d %10.3f %10.1f %10.1f %10.1f"
+                % (
+                    method_name,
+                    m["count"],
+                    m["total"],
+                    m["p50"] * 1000.0,
+                    m["p90"] * 1000.0,
+                    m["p99"] * 1000.0,
+                )
+            )
+
+        return "\n".join(lines)
+
+    def write(self, path):
+        """
+        Writes the recorded metrics to a JSON file, replacing its contents.
+        The file is replaced in one go, so that it's never read half written.
+
+        :param str path: The path of the file to write.
+        """
+        temp_path = "%s.%d.tmp" % (path, os.getpid())
+        with open(temp_path, "w") as fh:
+            json.dump(
+                dict(time=time.time(), methods=self.get_metrics()),
+                fh,
+                indent=2,
+                sort_keys=True,
+            )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def rotate_file(cls, path):
+        """
+        Moves a metrics file left by a previous session out of the way, so
+        that it isn't overwritten. ``path`` becomes ``path.1``, ``path.1``
+        becomes ``path.2`` and so on, and the oldest beyond
+        :attr:`MAX_BACKUPS` is deleted.
+
+        :param str path: The path of the metrics file.
+        """
+        if not os.path.exists(path):
+            return
+
+        oldest = "%s.%d" % (path, cls.MAX_BACKUPS)
+        if os.path.exists(oldest):
+            os.remove(oldest)
+
+        for index in range(cls.MAX_BACKUPS - 1, 0, -1):
+            backup = "%s.%d" % (path, index)
+            if os.path.exists(backup):
+                os.replace(backup, "%s.%d" % (path, index + 1))
+
+        os.replace(path, "%s.1" % path)
+
+    def _wrap(self, method_name, method):
+        """
+        Returns a wrapper of the given bridge method that records its calls.
+        """
+
+        @functools.wraps(method)
+        def _recorded(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.record(method_name, time.perf_counter() - start)
+
+        return _recorded
+
+
+def _percentile(samples, percent):
+    """
+    Returns the given percentile of a sorted list of samples, using the
+    nearest rank method.
+    """
+    if not samples:
+        return 0.0
+    rank = int(round(percent / 100.0 * (len(samples) - 1)))
+    return samples[rank]
@@ -0,0 +1,196 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import json
+
+# Encodes a value as a JSON string in the host. Older ExtendScript versions
+# don't provide a JSON implementation, and returning objects through the RPC
+# API would create proxies that cost a round trip per attribute read. Plain
+# objects and arrays are encoded recursively, anything else that isn't a
+# string, number or boolean is encoded in its string form.
+JSON_ENCODER_SCRIPT = r"""
+$.sgtkEncodeJSON = function(value) {
+    if (value === null || value === undefined) {
+        return "null";
+    }
+    var value_type = typeof value;
+    if (value_type == "number") {
+        return isFinite(value) ? String(value) : "null";
+    }
+    if (value_type == "boolean") {
+        return value ? "true" : "false";
+    }
+    var items = [];
+    if (value instanceof Array) {
+        for (var i = 0; i < value.length; i++) {
+            items.push($.sgtkEncodeJSON(value[i]));
+        }
+        return "[" + items.join(",") + "]";
+    }
+    if (value_type == "object" && value.constructor === Object) {
+        for (var key in value) {
+            items.push($.sgtkEncodeJSON(key) + ":" + $.sgtkEncodeJSON(value[key]));
+        }
+        return "{" + items.join(",") + "}";
+    }
+    return '"' + String(value).replace(
+        /[\\"\u0000-\u001f]/g,
+        function(c) {
+            return "\\u" + ("0000" + c.charCodeAt(0).toString(16)).slice(-4);
+        }
+    ) + '"';
+};
+"""
+
+
+# Exports a flattened, 8 bit, optionally downsized jpeg copy of a document.
+# This mirrors the step by step export done by export_as_jpeg_by_steps() over
+# RPC, but runs entirely in the host. Returns the output path along with the
+# time spent in the host, in seconds.
+EXPORT_AS_JPEG_SCRIPT = r"""
+$.sgtkExportAsJpeg = function(doc, outputPath, maxSize, quality) {
+    var start = new Date().getTime();
+    var originalRulerUnits = app.preferences.rulerUnits;
+    var originalDialogMode = app.displayDialogs;
+    var result = {};
+    try {
+        app.preferences.rulerUnits = Units.PIXELS;
+        app.displayDialogs = DialogModes.NO;
+
+        var sourceDoc = doc || app.activeDocument;
+        var width = Math.round(sourceDoc.width.value);
+        var height = Math.round(sourceDoc.height.value);
+        if (!(width > 0 && height > 0)) {
+            throw new Error(
+                "Unable to retrieve document size from " + sourceDoc.width +
+                " x " + sourceDoc.height
+            );
+        }
+
+        var name = sourceDoc.name;
+        var dot = name.lastIndexOf(".");
+        var jpegName = dot > 0 ?
+            name.slice(0, dot) + "_tkjpeg" + name.slice(dot) :
+            name + "_tkjpeg";
+
+        var jpegWidth = 0;
+        var jpegHeight = 0;
+        var maxDimension = Math.max(width, height);
+        if (maxDimension > maxSize) {
+            var scale = Math.min(maxSize / maxDimension, 1.0);
+            jpegWidth = Math.max(Math.min(Math.floor(width * scale), width), 1);
+            jpegHeight = Math.max(Math.min(Math.floor(height * scale), height), 1);
+        }
+
+        var jpegOptions = new JPEGSaveOptions();
+        jpegOptions.quality = quality;
+
+        var jpegDoc = sourceDoc.duplicate(jpegName);
+        try {
+            jpegDoc.flatten();
+            jpegDoc.bitsPerChannel = BitsPerChannelType.EIGHT;
+            if (jpegWidth && jpegHeight) {
+                jpegDoc.resizeImage(
+                    new UnitValue(jpegWidth, "px"),
+                    new UnitValue(jpegHeight, "px")
+                );
+            }
+            jpegDoc.saveAs(new File(outputPath), jpegOptions, true);
+        } finally {
+            jpegDoc.close(SaveOptions.DONOTSAVECHANGES);
+        }
+
+        result.path = outputPath;
+        result.width = jpegWidth || width;
+        result.height = jpegHeight || height;
+    } finally {
+        app.preferences.rulerUnits = originalRulerUnits;
+        app.displayDialogs = originalDialogMode;
+    }
+    result.elapsed = (new Date().getTime() - start) / 1000.0;
+    return $.sgtkEncodeJSON(result);
+};
+"""
+
+
+class ScriptedOperation(object):
+    """
+    An ExtendScript function that is installed in the host the first time it
+    is needed, and is then run in a single RPC round trip per call.
+
+    The supplied script must assign the function to an attribute of the $
+    helper object, and the function must return its result encoded with
+    ``$.sgtkEncodeJSON``. The decoded result is returned to the caller.
+
+    The installed function is forgotten when a call to it fails, or when
+    :meth:`invalidate` is called because the panel reconnected, so that it's
+    installed again on the next call.
+    """
+
+    def __init__(self, adobe, script, logger):
+        """
+        Initialize the scripted operation.
+
+        :param adobe: The Adobe bridge used to install and run the operation.
+        :param str script: The ExtendScript source defining the function.
+        :param logger: The logger to use for debug output.
+        """
+        self._adobe = adobe
+        self._script = script
+        self._logger = logger
+        self._function = None
+        self._install_failed = False
+
+    @property
+    def available(self):
+        """
+        ``True`` if the operation is installed in the host, installing it if
+        that hasn't been attempted yet.
+        """
+        if self._function is None and not self._install_failed:
+            try:
+                # The last statement of the script is the function assignment,
+                # so the function itself is what the evaluation returns.
+                self._function = self._adobe.rpc_eval(
+                    JSON_ENCODER_SCRIPT + self._script
+                )
+            except Exception as e:
+                self._logger.debug("Unable to install scripted operation: %s" % e)
+                self._install_failed = True
+
+        return self._function is not None
+
+    def invalidate(self):
+        """
+        Forgets the installed function, and any failure to install it, so that
+        the next call installs it again.
+        """
+        self._function = None
+        self._install_failed = False
+
+    def __call__(self, *args):
+        """
+        Runs the operation in the host with the given arguments.
+
+        :returns: The decoded result of the operation.
+        :raises: RuntimeError if the operation isn't available.
+        """
+        if not self.available:
+            raise RuntimeError("The scripted operation is not available.")
+
+        try:
+            result = self._function(*args)
+        except Exception:
+            # The function may no longer exist in the host, if the panel
+            # reconnected or ExtendScript restarted.
+            self.invalidate()
+            raise
+
+        return json.loads(result)
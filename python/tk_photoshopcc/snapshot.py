@@ -0,0 +1,110 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+from .scripted_operation import ScriptedOperation
+
+# Reads a list of dot separated attribute paths from a single object. Any path
+# that raises in the host resolves to null.
+SNAPSHOT_SCRIPT = r"""
+$.sgtkSnapshot = function(target, paths) {
+    var values = {};
+    for (var i = 0; i < paths.length; i++) {
+        var value = null;
+        try {
+            value = target;
+            var parts = paths[i].split(".");
+            for (var j = 0; j < parts.length; j++) {
+                value = value[parts[j]];
+            }
+        } catch (e) {
+            value = null;
+        }
+        values[paths[i]] = value;
+    }
+    return $.sgtkEncodeJSON(values);
+};
+"""
+
+
+class PropertySnapshot(object):
+    """
+    Reads a set of attributes from an Adobe proxy object in a single RPC
+    round trip.
+
+    The snapshot function is installed in the host the first time it is
+    needed. If that isn't possible, attributes are read one at a time through
+    the proxy object so that callers always get a result back.
+
+    The only requirement on the supplied bridge is an ``rpc_eval`` method,
+    which makes it easy to drive this class with a fake bridge that counts
+    round trips.
+    """
+
+    def __init__(self, adobe, logger):
+        """
+        Initialize the snapshot helper.
+
+        :param adobe: The Adobe bridge to issue the RPC requests through.
+        :param logger: The logger to use for debug output.
+        """
+        self._logger = logger
+        self._operation = ScriptedOperation(adobe, SNAPSHOT_SCRIPT, logger)
+
+    def snapshot(self, proxy, attr_paths):
+        """
+        Returns the values of the given attribute paths for the proxy object.
+
+        Attribute paths are dot separated, such as ``"width.value"`` or
+        ``"fullName.fsName"``. Any path that can't be resolved, because an
+        attribute doesn't exist or raised in the host, maps to ``None``.
+        Values that aren't strings, numbers or booleans are returned in their
+        string form, as given by the host.
+
+        :param proxy: The proxy object to read attributes from.
+        :param list attr_paths: A list of attribute path strings.
+
+        :returns: A dictionary mapping each attribute path to its value.
+        """
+        attr_paths = list(attr_paths)
+
+        if self._operation.available:
+            try:
+                return self._operation(proxy, attr_paths)
+            except Exception as e:
+                self._logger.debug(
+                    "Snapshot request failed, reading attributes individually: %s" % e
+                )
+
+        return self._read_individually(proxy, attr_paths)
+
+    def invalidate(self):
+        """
+        Forgets the snapshot function installed in the host, so that it's
+        installed again on the next snapshot.
+        """
+        self._operation.invalidate()
+
+    def _read_individually(self, proxy, attr_paths):
+        """
+        Reads each attribute path from the proxy object, one RPC request per
+        attribute.
+        """
+        values = dict()
+
+        for attr_path in attr_paths:
+            value = proxy
+            try:
+                for attr_name in attr_path.split("."):
+                    value = getattr(value, attr_name)
+            except Exception:
+                value = None
+            values[attr_path] = value
+
+        return values
@@ -0,0 +1,24 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import hashlib
+import json
+
+
+def get_commands_hash(all_commands):
+    """
+    Returns a hash of the commands payload sent to the panel. Two payloads
+    with the same content always hash to the same value.
+
+    :param dict all_commands: The commands payload, keyed by section name.
+    :returns: A hex digest ``str``.
+    """
+    serialized = json.dumps(all_commands, sort_keys=True)
+    return hashlib.sha1(serialized.encode("utf-8")).hexdigest()
@@ -0,0 +1,128 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import collections
+import threading
+
+
+class TemplateIndex(object):
+    """
+    Speeds up the engine's own template lookups for the path templates of a
+    Toolkit API instance.
+
+    A path is only validated against a template if it starts with the static
+    part of the template's path, up to its first key or optional section.
+    Static parts are compared case-insensitively and regardless of the path
+    separator, so no path the template would validate is rejected. The fields
+    parsed from a path are remembered, and forgotten when the instance reloads
+    its templates.
+
+    The Toolkit API instance is left untouched, so context resolution and the
+    template lookups of other apps aren't affected.
+    """
+
+    # The number of template fields results remembered by get_fields().
+    MAX_FIELDS_CACHE_SIZE = 500
+
+    def __init__(self, tk):
+        """
+        Initialize the index.
+
+        :param tk: The Toolkit API instance whose templates are looked up.
+        """
+        self._tk = tk
+        self._templates = tk.templates
+        self._lock = threading.Lock()
+        self._fields_cache = collections.OrderedDict()
+
+    def get_fields(self, template, path):
+        """
+        Returns the fields of a path for a template, like
+        :meth:`TemplatePath.get_fields`. Results are remembered, so asking for
+        the fields of the same path again is free.
+
+        :param template: The template to get the fields for.
+        :param str path: The path to get the fields of.
+        :returns: A dictionary of fields.
+        :raises TankError: If the path doesn't match the template.
+        """
+        # the memo is cleared when the templates are reloaded, so the name of
+        # a template identifies it. the template itself is kept with its
+        # fields, in case one from another Toolkit API instance is passed in.
+        self._check_templates()
+        key = (template.name, path)
+
+        with self._lock:
+            cached = self._fields_cache.get(key)
+            if cached is not None and cached[0] is template:
+                self._fields_cache.move_to_end(key)
+                return dict(cached[1])
+
+        fields = template.get_fields(path)
+
+        with self._lock:
+            self._fields_cache[key] = (template, fields)
+            while len(self._fields_cache) > self.MAX_FIELDS_CACHE_SIZE:
+                self._fields_cache.popitem(last=False)
+
+        return dict(fields)
+
+    def validate(self, template, path):
+        """
+        Returns ``True`` if the path matches the template, like
+        :meth:`TemplatePath.validate`. Paths that don't start with the
+        template's static part are rejected without being parsed.
+
+        :param template: The template to match.
+        :param str path: The path to match.
+        """
+        static = _get_static_part(template)
+        if static is not None and not _normalize(path).startswith(_normalize(static)):
+            return False
+
+        return template.validate(path)
+
+    def _check_templates(self):
+        """
+        Forgets the remembered fields if the Toolkit API instance reloaded its
+        templates.
+        """
+        templates = self._tk.templates
+        if templates is not self._templates:
+            with self._lock:
+                self._templates = templates
+                self._fields_cache.clear()
+
+
+def _normalize(path):
+    """
+    Returns a lowercase path with forward slashes, for comparing the start of
+    paths.
+    """
+    return path.replace("\\", "/").lower()
+
+
+def _get_static_part(template):
+    """
+    Returns the static start of a template's path, up to its first key or
+    optional section, or ``None`` if the template isn't a path template.
+    """
+    root_path = getattr(template, "root_path", None)
+    definition = getattr(template, "definition", None)
+    if not root_path or definition is None:
+        return None
+
+    end = len(definition)
+    for marker in ("{", "["):
+        index = definition.find(marker)
+        if index != -1:
+            end = min(end, index)
+
+    return "%s/%s" % (root_path.rstrip("/\\"), definition[:end])
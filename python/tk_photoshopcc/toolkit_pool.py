@@ -0,0 +1,178 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import threading
+
+
+class ToolkitPool(object):
+    """
+    Keeps one Toolkit API instance per pipeline configuration, so that
+    resolving the context of a document doesn't create a new instance, and
+    re-read the configuration, every time.
+
+    A pooled instance is reused for any path under one of its project roots.
+    Other paths get a new instance from the factory, which is then pooled
+    under its pipeline configuration's root. An instance is dropped from the
+    pool as soon as one of its core configuration files changes on disk.
+    """
+
+    def __init__(self, factory, logger):
+        """
+        Initialize the pool.
+
+        :param factory: Callable returning a new Toolkit API instance for a
+            path, such as :func:`sgtk.sgtk_from_path`.
+        :param logger: The logger to use for debug output.
+        """
+        self._factory = factory
+        self._logger = logger
+        self._lock = threading.Lock()
+        # pipeline configuration root -> (tk, project roots, config signature)
+        self._instances = dict()
+
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def add(self, tk):
+        """
+        Pools an existing Toolkit API instance, such as the engine's own.
+
+        :param tk: The Toolkit API instance.
+        """
+        config_root = _get_config_root(tk)
+        if config_root is None:
+            return
+
+        entry = (tk, _get_project_roots(tk), _get_config_signature(tk))
+        with self._lock:
+            self._instances[config_root] = entry
+
+    def get(self, path):
+        """
+        Returns a Toolkit API instance for a path, reusing a pooled one when
+        the path is under one of its project roots.
+
+        :param str path: The path to get an instance for.
+        :raises: Whatever the factory raises if the path isn't under pipeline
+            control.
+        """
+        normalized_path = _normalize(path)
+
+        with self._lock:
+            entries = list(self._instances.items())
+
+        for config_root, (tk, project_roots, signature) in entries:
+            if not any(_is_under(normalized_path, root) for root in project_roots):
+                continue
+
+            if _get_config_signature(tk) != signature:
+                self._logger.debug(
+                    "Configuration in %s changed. Dropping its pooled Toolkit "
+                    "instance." % config_root
+                )
+                with self._lock:
+                    self._instances.pop(config_root, None)
+                    self._invalidations += 1
+                continue
+
+            with self._lock:
+                self._hits += 1
+            return tk
+
+        with self._lock:
+            self._misses += 1
+
+        tk = self._factory(path)
+        self.add(tk)
+        return tk
+
+    def clear(self):
+        """
+        Drops all the pooled instances.
+        """
+        with self._lock:
+            self._instances.clear()
+
+    def get_stats(self):
+        """
+        Returns the pool's statistics.
+
+        :returns: A dictionary with the number of pooled ``instances``, and
+            the number of ``hits``, ``misses`` and ``invalidations`` so far.
+        """
+        with self._lock:
+            return dict(
+                instances=len(self._instances),
+                hits=self._hits,
+                misses=self._misses,
+                invalidations=self._invalidations,
+            )
+
+
+def _normalize(path):
+    """
+    Returns a path normalized for comparison on this platform.
+    """
+    return os.path.normcase(os.path.normpath(path))
+
+
+def _is_under(path, root):
+    """
+    Returns ``True`` if a normalized path is the given normalized root or is
+    inside it.
+    """
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+def _get_config_root(tk):
+    """
+    Returns the root of a Toolkit API instance's pipeline configuration, or
+    ``None`` if it can't be determined.
+    """
+    try:
+        return _normalize(tk.pipeline_configuration.get_path())
+    except Exception:
+        return None
+
+
+def _get_project_roots(tk):
+    """
+    Returns the normalized project roots of a Toolkit API instance.
+    """
+    try:
+        return [_normalize(root) for root in tk.roots.values() if root]
+    except Exception:
+        return []
+
+
+def _get_config_signature(tk):
+    """
+    Returns a value that changes whenever one of the core configuration files
+    of a Toolkit API instance, like templates.yml or roots.yml, changes.
+    """
+    try:
+        core_folder = os.path.join(
+            tk.pipeline_configuration.get_config_location(), "core"
+        )
+        names = sorted(os.listdir(core_folder))
+    except Exception:
+        return None
+
+    signature = []
+    for name in names:
+        try:
+            stat = os.stat(os.path.join(core_folder, name))
+        except OSError:
+            continue
+        signature.append((name, stat.st_mtime, stat.st_size))
+
+    return tuple(signature)
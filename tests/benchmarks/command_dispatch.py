@@ -0,0 +1,92 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Compares the time it takes to find a command triggered from the panel by
+going through every registered command, as the engine used to, and with the
+engine's command index.
+
+It doesn't need sgtk, and registers fake commands shaped like the engine's::
+
+    python command_dispatch.py -c 500 -n 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(__file__), os.pardir, os.pardir, "python", "tk_photoshopcc"
+    ),
+)
+
+from command_index import CommandIndex  # noqa: E402
+
+
+def _find_by_scan(commands, uid):
+    """
+    Finds a command the way the engine used to.
+    """
+    for command in commands.values():
+        if command.get("properties", dict()).get("uid") == uid:
+            return command
+    return None
+
+
+def _time_dispatch(find, uids):
+    """
+    Finds the command of each uid, and returns the time taken per lookup, in
+    seconds.
+    """
+    start = time.perf_counter()
+    for uid in uids:
+        find(uid)["callback"]()
+    return (time.perf_counter() - start) / len(uids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument(
+        "-c", "--commands", type=int, default=500, help="Registered commands."
+    )
+    parser.add_argument(
+        "-n", "--dispatches", type=int, default=100000, help="Commands triggered."
+    )
+    args = parser.parse_args()
+
+    commands = dict()
+    index = CommandIndex()
+    for uid in range(args.commands):
+        command = dict(
+            callback=lambda: None,
+            properties=dict(uid=uid, app=None, short_name="command_%d" % uid),
+        )
+        commands["Command %d" % uid] = command
+        index.add(command)
+
+    rng = random.Random(0)
+    uids = [rng.randrange(args.commands) for _ in range(args.dispatches)]
+
+    before = _time_dispatch(lambda uid: _find_by_scan(commands, uid), uids)
+    after = _time_dispatch(index.get, uids)
+
+    print("Commands:         %d" % args.commands)
+    print("Dispatches:       %d" % args.dispatches)
+    print("Scan:             %8.2fus per dispatch" % (before * 1000000.0))
+    print("CommandIndex:     %8.2fus per dispatch" % (after * 1000000.0))
+    print("Speedup:          %8.1fx" % (before / after))
+
+
+if __name__ == "__main__":
+    main()
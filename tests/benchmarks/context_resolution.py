@@ -0,0 +1,78 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Compares the time it takes to resolve the context of documents with a new
+Toolkit API instance per resolution, as the engine used to, and with the
+engine's pool of Toolkit API instances.
+
+Run it with a Python interpreter that can import sgtk, passing paths of
+documents under pipeline control::
+
+    python context_resolution.py -n 20 /path/to/doc_a.psd /path/to/doc_b.psd
+
+The default site user is used to authenticate.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import sgtk
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(__file__), os.pardir, os.pardir, "python", "tk_photoshopcc"
+    ),
+)
+
+from toolkit_pool import ToolkitPool  # noqa: E402
+
+
+def _time_resolutions(get_tk, paths, iterations):
+    """
+    Resolves the context of each path the given number of times, and returns
+    the time taken per resolution, in seconds.
+    """
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for path in paths:
+            get_tk(path).context_from_path(path)
+    return (time.perf_counter() - start) / (iterations * len(paths))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("paths", nargs="+", help="Documents under pipeline control.")
+    parser.add_argument(
+        "-n", "--iterations", type=int, default=10, help="Resolutions per path."
+    )
+    args = parser.parse_args()
+
+    user = sgtk.authentication.ShotgunAuthenticator().get_user()
+    sgtk.set_authenticated_user(user)
+
+    pool = ToolkitPool(sgtk.sgtk_from_path, logging.getLogger(__name__))
+
+    before = _time_resolutions(sgtk.sgtk_from_path, args.paths, args.iterations)
+    after = _time_resolutions(pool.get, args.paths, args.iterations)
+
+    print("Resolutions:      %d" % (args.iterations * len(args.paths)))
+    print("sgtk_from_path:   %8.2fms per resolution" % (before * 1000.0))
+    print("ToolkitPool:      %8.2fms per resolution" % (after * 1000.0))
+    print("Speedup:          %8.1fx" % (before / after))
+    print("Pool:             %s" % (pool.get_stats(),))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,10 @@
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
 import os
+import tempfile
+import uuid
+
+from contextlib import contextmanager
 
 import sgtk
 
@@ -54,3 +58,87 @@ class TestPhotoshopRPC(TestAdobeRPC):
 
         art_layers[0].remove()
         self.assertEqual(art_layers.length, current_layers)
+
+    def test_snapshot(self):
+        engine = sgtk.platform.current_engine()
+        attr_paths = ["name", "width.value", "height.value", "fullName.fsName"]
+
+        # The first snapshot installs the function in the host, so we don't
+        # count its round trips.
+        engine.snapshot(self.document, attr_paths)
+
+        with _count_round_trips(self.adobe) as round_trips:
+            snapshot = engine.snapshot(self.document, attr_paths)
+
+        self.assertEqual(1, len(round_trips))
+        self.assertEqual(self.document.name, snapshot["name"])
+        self.assertEqual(self.document.width.value, snapshot["width.value"])
+        self.assertEqual(self.document.height.value, snapshot["height.value"])
+        self.assertEqual(self.document.fullName.fsName, snapshot["fullName.fsName"])
+
+    def test_snapshot_unresolved_attribute(self):
+        engine = sgtk.platform.current_engine()
+        snapshot = engine.snapshot(self.document, ["name", "notAnAttribute.value"])
+
+        self.assertEqual(self.document.name, snapshot["name"])
+        self.assertIsNone(snapshot["notAnAttribute.value"])
+
+    def test_export_as_jpeg(self):
+        engine = sgtk.platform.current_engine()
+        output_path = os.path.join(
+            tempfile.gettempdir(), "%s_sgtk_test.jpg" % uuid.uuid4().hex
+        )
+
+        # The first export installs the function in the host, so we don't
+        # count its round trips.
+        os.remove(engine.export_as_jpeg(self.document, max_size=16))
+
+        try:
+            with _count_round_trips(self.adobe) as round_trips:
+                jpeg_path = engine.export_as_jpeg(
+                    self.document, output_path, max_size=16
+                )
+
+            self.assertEqual(output_path, jpeg_path)
+            self.assertTrue(os.path.exists(jpeg_path))
+            if engine.SHOTGUN_ADOBE_SCRIPTED_OPERATIONS:
+                self.assertEqual(1, len(round_trips))
+        finally:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+
+
+@contextmanager
+def _count_round_trips(adobe):
+    """
+    Records the name of each RPC method called on the bridge while the
+    context is active.
+    """
+    round_trips = []
+    method_names = [
+        m
+        for m in ["rpc_call", "rpc_eval", "rpc_get", "rpc_get_index", "rpc_set"]
+        if hasattr(adobe, m)
+    ]
+
+    # methods may already be wrapped on the instance, such as when rpc metrics
+    # are enabled. those wrappers are put back once we're done.
+    wrapped = dict((m, adobe.__dict__[m]) for m in method_names if m in adobe.__dict__)
+
+    for method_name in method_names:
+        method = getattr(adobe, method_name)
+
+        def _counted(*args, _name=method_name, _method=method, **kwargs):
+            round_trips.append(_name)
+            return _method(*args, **kwargs)
+
+        setattr(adobe, method_name, _counted)
+
+    try:
+        yield round_trips
+    finally:
+        for method_name in method_names:
+            if method_name in wrapped:
+                setattr(adobe, method_name, wrapped[method_name])
+            else:
+                delattr(adobe, method_name)
@@ -0,0 +1,32 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Makes the engine's python modules importable by the unit tests.
+
+The modules tested here don't depend on sgtk or Qt, so the tk_photoshopcc
+package is registered without running its ``__init__``, which imports the
+frameworks and can only run inside an engine.
+"""
+
+import os
+import sys
+import types
+
+_PACKAGE_PATH = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__), os.pardir, os.pardir, "python", "tk_photoshopcc"
+    )
+)
+
+if "tk_photoshopcc" not in sys.modules:
+    _package = types.ModuleType("tk_photoshopcc")
+    _package.__path__ = [_PACKAGE_PATH]
+    sys.modules["tk_photoshopcc"] = _package
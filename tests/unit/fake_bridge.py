@@ -0,0 +1,92 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+A local stand-in for the Adobe bridge that counts RPC round trips.
+
+ExtendScript functions installed through ``rpc_eval`` are emulated by Python
+callables registered by name, and objects in the host are emulated by
+:class:`FakeProxy` objects whose attribute reads each cost a round trip.
+"""
+
+import json
+
+
+class FakeBridge(object):
+    """
+    Counts the RPC round trips made through it.
+    """
+
+    def __init__(self, functions=None):
+        """
+        :param dict functions: Python implementations of the ExtendScript
+            functions that can be installed, keyed by the name they're
+            assigned to on the ``$`` helper object.
+        """
+        self.functions = functions or dict()
+        self.round_trips = 0
+        self.installs = 0
+        # when set, installed functions raise as if the host forgot them.
+        self.functions_lost = False
+
+    def rpc_eval(self, script):
+        self.round_trips += 1
+        for name, function in self.functions.items():
+            if "$.%s = function" % name in script:
+                self.installs += 1
+                self.functions_lost = False
+                return _FakeFunction(self, function)
+        raise RuntimeError("ExtendScript error evaluating the script.")
+
+
+class FakeProxy(object):
+    """
+    An object in the host. Reading one of its attributes costs a round trip.
+    """
+
+    def __init__(self, bridge, **attrs):
+        self._bridge = bridge
+        self._attrs = attrs
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        self._bridge.round_trips += 1
+        try:
+            return self._attrs[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+def host_getattr(value, name):
+    """
+    Reads an attribute the way a function running in the host would, without
+    a round trip.
+    """
+    if isinstance(value, FakeProxy):
+        return value._attrs[name]
+    return getattr(value, name)
+
+
+class _FakeFunction(object):
+    """
+    A proxy to a function installed in the host. Calling it costs a round
+    trip, and returns its result encoded as JSON, like ``$.sgtkEncodeJSON``.
+    """
+
+    def __init__(self, bridge, function):
+        self._bridge = bridge
+        self._function = function
+
+    def __call__(self, *args):
+        self._bridge.round_trips += 1
+        if self._bridge.functions_lost:
+            raise RuntimeError("The function no longer exists in the host.")
+        return json.dumps(self._function(*args))
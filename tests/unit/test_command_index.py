@@ -0,0 +1,52 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+from tk_photoshopcc.command_index import CommandIndex
+
+
+def _command(uid):
+    return dict(callback=lambda: uid, properties=dict(uid=uid))
+
+
+def test_get_by_uid():
+    index = CommandIndex()
+    first, second = _command(1), _command(2)
+    index.add(first)
+    index.add(second)
+    index.add(dict(callback=lambda: None, properties=dict()))
+
+    assert index.get(1) is first
+    assert index.get(2) is second
+    assert index.get(3) is None
+    assert len(index) == 2
+
+
+def test_rebuild_after_clear():
+    index = CommandIndex()
+    commands = dict(first=_command(1), second=_command(2))
+    for command in commands.values():
+        index.add(command)
+
+    index.clear()
+    assert index.get(1) is None
+
+    index.rebuild(commands.values())
+    assert index.get(1) is commands["first"]
+    assert index.get(2) is commands["second"]
+    assert len(index) == 2
+
+
+def test_rebuild_drops_unregistered_commands():
+    index = CommandIndex()
+    index.add(_command(1))
+
+    index.rebuild([_command(2)])
+    assert index.get(1) is None
+    assert index.get(2) is not None
@@ -0,0 +1,74 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import pytest
+
+from tk_photoshopcc.context_cache import ContextCache
+
+
+@pytest.fixture
+def deserialized():
+    return []
+
+
+@pytest.fixture
+def cache(deserialized):
+    def deserialize(data):
+        deserialized.append(data)
+        return "context:%s" % data
+
+    return ContextCache(2, deserialize)
+
+
+def test_evicts_least_recently_used(cache):
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_deserializes_lazily_and_once(cache, deserialized):
+    cache.put_serialized("a", "data")
+    assert deserialized == []
+
+    assert cache.get("a") == "context:data"
+    assert cache.get("a") == "context:data"
+    assert deserialized == ["data"]
+    assert cache.get_stats()["deserializations"] == 1
+
+
+def test_resize_in_place(cache):
+    cache.put("a", 1)
+    cache.put("b", 2)
+
+    cache.resize(1)
+    assert len(cache) == 1
+    assert "b" in cache
+    assert cache.get_stats()["max_size"] == 1
+
+    cache.resize(3)
+    cache.put("c", 3)
+    cache.put("d", 4)
+    assert len(cache) == 3
+
+
+def test_stats(cache):
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("missing")
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
@@ -0,0 +1,132 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import logging
+import os
+import sqlite3
+
+import pytest
+
+from tk_photoshopcc.context_index import ContextIndex
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "cache" / "contexts.db")
+
+
+@pytest.fixture
+def index(db_path):
+    index = ContextIndex(db_path, logging.getLogger(__name__))
+    yield index
+    index.close()
+
+
+@pytest.fixture
+def document(tmp_path):
+    path = tmp_path / "document.psd"
+    path.write_bytes(b"")
+    os.utime(str(path), (1000, 1000))
+    return str(path)
+
+
+def test_put_and_get(index, document):
+    index.put(document, "context", pipeline_config_id=1)
+
+    assert index.get(document) == "context"
+    assert index.get(document, pipeline_config_id=1) == "context"
+    assert index.get(document, pipeline_config_id=3) is None
+    assert index.get_entry(document)["mtime"] == 1000
+
+
+def test_modified_document_is_kept(db_path, index, document):
+    index.put(document, "context")
+    os.utime(document, (2000, 2000))
+    index.close()
+
+    # saving the document doesn't change its context, so it's still found
+    # after a restart.
+    index = ContextIndex(db_path, logging.getLogger(__name__))
+    assert index.get(document) == "context"
+    assert len(index) == 1
+    index.close()
+
+
+def test_deleted_document_is_evicted(index, document):
+    index.put(document, "context")
+    os.remove(document)
+
+    assert index.get(document) is None
+    assert len(index) == 0
+
+
+def test_get_recent_skips_outdated_documents(index, document, tmp_path):
+    other = str(tmp_path / "other.psd")
+    open(other, "w").close()
+    index.put(other, "other")
+    index.put(document, "context")
+    os.remove(document)
+
+    assert index.get_recent(10) == [(ContextIndex.normalize_path(other), "other")]
+    assert len(index) == 1
+
+
+def test_image_urls(index):
+    assert index.get_image_url("Shot", 1) is None
+
+    index.put_image_url("Shot", 1, "http://first")
+    index.put_image_url("Shot", 1, "http://second")
+    assert index.get_image_url("Shot", 1) == "http://second"
+    assert index.get_image_url("Asset", 1) is None
+
+
+def test_image_urls_outlive_documents(db_path, index, document):
+    index.put(document, "context")
+    index.put_image_url("Shot", 1, "http://image")
+
+    index.clear()
+    assert len(index) == 0
+    assert index.get_image_url("Shot", 1) == "http://image"
+
+    index.close()
+    reopened = ContextIndex(db_path, logging.getLogger(__name__))
+    assert reopened.get_image_url("Shot", 1) == "http://image"
+    reopened.close()
+
+
+def test_survives_reopening(db_path, document):
+    index = ContextIndex(db_path, logging.getLogger(__name__))
+    index.put(document, "context")
+    index.close()
+
+    index = ContextIndex(db_path, logging.getLogger(__name__))
+    assert index.get(document) == "context"
+    index.close()
+
+
+def test_older_schema_is_recreated(db_path, document):
+    os.makedirs(os.path.dirname(db_path))
+    connection = sqlite3.connect(db_path)
+    connection.execute("CREATE TABLE contexts (path TEXT PRIMARY KEY, context TEXT)")
+    connection.execute("INSERT INTO contexts VALUES (?, ?)", (document, "old"))
+    connection.execute("PRAGMA user_version = 3")
+    connection.commit()
+    connection.close()
+
+    index = ContextIndex(db_path, logging.getLogger(__name__))
+    assert len(index) == 0
+    index.put(document, "context", pipeline_config_id=1)
+    assert index.get(document) == "context"
+    index.close()
+
+    connection = sqlite3.connect(db_path)
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    connection.close()
+    assert version == ContextIndex.SCHEMA_VERSION == 4
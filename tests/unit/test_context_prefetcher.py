@@ -0,0 +1,64 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import logging
+import threading
+
+from tk_photoshopcc.context_prefetcher import ContextPrefetcher
+
+logger = logging.getLogger(__name__)
+
+
+def test_counts_outcomes():
+    def resolve(path):
+        if path == "failed":
+            raise RuntimeError("no connection")
+        return path == "warmed"
+
+    finished = []
+    prefetcher = ContextPrefetcher(
+        ["warmed", "skipped", "failed", "warmed"],
+        resolve,
+        0,
+        logger,
+        on_finished=finished.append,
+    )
+    prefetcher.start()
+    prefetcher.join(5)
+
+    assert (prefetcher.warmed, prefetcher.skipped, prefetcher.failed) == (2, 1, 1)
+    assert finished == [prefetcher]
+
+
+def test_cancel_stops_after_the_current_resolution():
+    resolving = threading.Event()
+    release = threading.Event()
+    resolved = []
+
+    def resolve(path):
+        resolved.append(path)
+        resolving.set()
+        release.wait(5)
+        return True
+
+    finished = []
+    prefetcher = ContextPrefetcher(
+        ["first", "second"], resolve, 0, logger, on_finished=finished.append
+    )
+    prefetcher.start()
+    assert resolving.wait(5)
+
+    prefetcher.cancel()
+    release.set()
+    prefetcher.join(5)
+
+    assert resolved == ["first"]
+    assert prefetcher.cancelled
+    assert finished == []
@@ -0,0 +1,120 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+
+import pytest
+
+from tk_photoshopcc import header_cache
+from tk_photoshopcc.header_cache import HeaderCache
+
+
+@pytest.fixture
+def cache():
+    return HeaderCache(60, 2)
+
+
+def _thumbnail(tmp_path, name):
+    path = tmp_path / name
+    path.write_bytes(b"")
+    return dict(thumb_path=str(path))
+
+
+def test_records_are_evicted_least_recently_used_first(cache):
+    cache.put("a", dict(id=1))
+    cache.put("b", dict(id=2))
+    cache.get("a")
+    cache.put("c", dict(id=3))
+
+    assert cache.get("a")[0] == dict(id=1)
+    assert cache.get("b") == (None, False)
+    assert cache.get("c")[0] == dict(id=3)
+
+
+def test_thumbnails_are_evicted_without_deleting_their_files(cache, tmp_path):
+    first = _thumbnail(tmp_path, "first.png")
+    second = _thumbnail(tmp_path, "second.png")
+    third = _thumbnail(tmp_path, "third.png")
+
+    cache.put_thumbnail("first", first)
+    cache.put_thumbnail("second", second)
+    assert cache.get_thumbnail("first") == first
+    cache.put_thumbnail("third", third)
+
+    assert cache.get_thumbnail("second") is None
+    assert cache.get_thumbnail("first") == first
+    assert cache.get_thumbnail("third") == third
+
+    # the files belong to the shared thumbnail cache.
+    assert os.path.exists(second["thumb_path"])
+
+
+def test_clear_leaves_thumbnail_files(cache, tmp_path):
+    thumbnail = _thumbnail(tmp_path, "thumb.png")
+    cache.put("a", dict(id=1))
+    cache.put_thumbnail("a", thumbnail)
+
+    cache.clear()
+    assert cache.get("a") == (None, False)
+    assert cache.get_thumbnail("a") is None
+    assert os.path.exists(thumbnail["thumb_path"])
+
+
+def test_records_go_stale(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(header_cache.time, "monotonic", lambda: now[0])
+    cache = HeaderCache(60, 2)
+    key = HeaderCache.get_key("Shot", 1, ["code", "image"])
+
+    cache.put(key, dict(id=1))
+    assert cache.get(key) == (dict(id=1), True)
+
+    now[0] += 60
+    assert cache.get(key) == (dict(id=1), False)
+
+
+def test_key_ignores_field_order():
+    assert HeaderCache.get_key("Shot", 1, ["code", "image"]) == HeaderCache.get_key(
+        "Shot", 1, ["image", "code"]
+    )
+
+
+def test_same_record_ignores_signed_image_urls():
+    record = dict(
+        type="Shot",
+        id=1,
+        code="010",
+        image="https://cdn.example.com/thumbs/1.jpg?Signature=abc&Expires=1",
+    )
+    resigned = dict(
+        record, image="https://cdn.example.com/thumbs/1.jpg?Signature=xyz&Expires=2"
+    )
+    replaced = dict(record, image="https://cdn.example.com/thumbs/2.jpg?Signature=abc")
+
+    assert HeaderCache.same_record(record, resigned)
+    assert not HeaderCache.same_record(record, replaced)
+    assert not HeaderCache.same_record(record, dict(record, code="020"))
+    assert not HeaderCache.same_record(record, None)
+    assert HeaderCache.same_record(None, None)
+
+
+def test_thumbnail_key_follows_the_image():
+    record = dict(type="Shot", id=1, image="https://cdn.example.com/1.jpg?sig=a")
+    resigned = dict(record, image="https://cdn.example.com/1.jpg?sig=b")
+    replaced = dict(record, image="https://cdn.example.com/2.jpg?sig=a")
+
+    key = HeaderCache.get_thumbnail_key(record)
+    assert key == HeaderCache.get_thumbnail_key(resigned)
+    assert key != HeaderCache.get_thumbnail_key(replaced)
+    assert HeaderCache.get_thumbnail_key(dict(type="Shot", id=1, image=None)) == (
+        "Shot",
+        1,
+        None,
+    )
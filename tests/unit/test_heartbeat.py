@@ -0,0 +1,85 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+from tk_photoshopcc.heartbeat import HeartbeatScheduler
+
+
+def test_scheduler_backs_off_to_the_max_interval():
+    scheduler = HeartbeatScheduler(min_interval=1.0, max_interval=10.0, tolerance=5)
+    assert scheduler.interval == 1.0
+
+    intervals = []
+    for _ in range(6):
+        scheduler.idle()
+        intervals.append(scheduler.interval)
+
+    assert intervals == [2.0, 4.0, 8.0, 10.0, 10.0, 10.0]
+
+
+def test_scheduler_resets_on_activity():
+    scheduler = HeartbeatScheduler(min_interval=1.0, max_interval=10.0, tolerance=5)
+    scheduler.idle()
+    scheduler.idle()
+
+    assert scheduler.activity()
+    assert scheduler.interval == 1.0
+
+    # already at the minimum, so nothing changes.
+    assert not scheduler.activity()
+
+
+def test_scheduler_max_interval_is_at_least_the_min():
+    scheduler = HeartbeatScheduler(min_interval=5.0, max_interval=1.0, tolerance=5)
+    scheduler.idle()
+    assert scheduler.interval == 5.0
+
+
+def test_scheduler_tolerates_failures_for_a_length_of_time():
+    scheduler = HeartbeatScheduler(min_interval=1.0, max_interval=10.0, tolerance=5)
+    scheduler.idle()
+
+    assert not scheduler.failure(now=100.0)
+    assert scheduler.interval == 1.0
+    assert not scheduler.failure(now=104.9)
+    assert scheduler.failure(now=105.0)
+
+
+def test_scheduler_success_resets_the_tolerance():
+    scheduler = HeartbeatScheduler(min_interval=1.0, max_interval=10.0, tolerance=5)
+
+    assert not scheduler.failure(now=100.0)
+    scheduler.success()
+    assert not scheduler.failure(now=200.0)
+    scheduler.idle()
+    assert not scheduler.failure(now=300.0)
+    assert scheduler.failure(now=305.0)
+
+
+def test_scheduler_is_due_once_the_interval_has_passed():
+    scheduler = HeartbeatScheduler(min_interval=1.0, max_interval=10.0, tolerance=5)
+    assert scheduler.is_due(now=100.0)
+
+    scheduler.idle(now=100.0)
+    assert scheduler.interval == 2.0
+    assert not scheduler.is_due(now=101.0)
+    assert scheduler.is_due(now=102.0)
+
+    # A timer tick that fires slightly early still counts.
+    assert scheduler.is_due(now=101.9)
+
+
+def test_scheduler_is_due_sooner_after_activity():
+    scheduler = HeartbeatScheduler(min_interval=1.0, max_interval=10.0, tolerance=5)
+    for _ in range(4):
+        scheduler.idle(now=100.0)
+    assert not scheduler.is_due(now=105.0)
+
+    scheduler.activity()
+    assert scheduler.is_due(now=101.0)
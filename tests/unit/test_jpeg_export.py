@@ -0,0 +1,282 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Checks the contract of the scripted jpeg export, the arguments it's run with
+and the fallback to exporting step by step over RPC, along with the effects
+of the step by step export in a fake host.
+"""
+
+import logging
+import re
+
+import pytest
+
+from fake_bridge import FakeBridge
+from tk_photoshopcc.context_guard import ContextChangeGuard
+from tk_photoshopcc.jpeg_export import export_as_jpeg, export_as_jpeg_by_steps
+from tk_photoshopcc.scripted_operation import EXPORT_AS_JPEG_SCRIPT, ScriptedOperation
+
+logger = logging.getLogger(__name__)
+
+
+class _Namespace(object):
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+
+def _pixels(size):
+    return int(size.replace(" px", ""))
+
+
+class _Document(object):
+    def __init__(self, host, name, width, height):
+        self._host = host
+        self.name = name
+        self.width = _Namespace(value=width)
+        self.height = _Namespace(value=height)
+
+    def duplicate(self, name):
+        self._host.events.append(("duplicate", name))
+        return _Document(self._host, name, self.width.value, self.height.value)
+
+    def flatten(self):
+        self._host.events.append(("flatten",))
+
+    @property
+    def bitsPerChannel(self):
+        return None
+
+    @bitsPerChannel.setter
+    def bitsPerChannel(self, value):
+        self._host.events.append(("bits", value))
+
+    def resizeImage(self, width, height):
+        self._host.events.append(("resize", _pixels(width), _pixels(height)))
+
+    def saveAs(self, file, options, as_copy):
+        if self._host.save_error:
+            raise RuntimeError(self._host.save_error)
+        self._host.events.append(("save", file.path, options.quality, as_copy))
+
+    def close(self, options):
+        self._host.events.append(("close", options))
+
+
+class _Host(object):
+    """
+    The parts of Photoshop's scripting API used to export a jpeg, recording
+    their effects.
+    """
+
+    Units = _Namespace(PIXELS="pixels")
+    DialogModes = _Namespace(NO="no")
+    SaveOptions = _Namespace(DONOTSAVECHANGES="do not save")
+    BitsPerChannelType = _Namespace(EIGHT=8)
+
+    def __init__(self, width, height, name="art.psd"):
+        self.events = []
+        self.save_error = None
+        self.app = _Namespace(
+            preferences=_Namespace(rulerUnits="inches"), displayDialogs="all"
+        )
+        self.app.activeDocument = _Document(self, name, width, height)
+
+    @staticmethod
+    def File(path):
+        return _Namespace(path=path)
+
+    @staticmethod
+    def JPEGSaveOptions():
+        return _Namespace(quality=None)
+
+
+def _snapshot(proxy, attr_paths):
+    values = dict()
+    for attr_path in attr_paths:
+        value = proxy
+        for name in attr_path.split("."):
+            value = getattr(value, name)
+        values[attr_path] = value
+    return values
+
+
+def _get_operation(bridge):
+    return ScriptedOperation(bridge, EXPORT_AS_JPEG_SCRIPT, logger)
+
+
+def _export(host, operation, document, path, max_size, quality):
+    return export_as_jpeg(
+        host, operation, document, path, max_size, quality, _snapshot, logger
+    )
+
+
+def _export_by_steps(host, document, path, max_size, quality):
+    return export_as_jpeg_by_steps(
+        host, document, path, max_size, quality, _snapshot, logger
+    )
+
+
+def _step_events(name, width, height, quality):
+    events = [("duplicate", name), ("flatten",), ("bits", 8)]
+    if width and height:
+        events.append(("resize", width, height))
+    events.append(("save", "/tmp/out.jpg", quality, True))
+    events.append(("close", "do not save"))
+    return events
+
+
+def _assert_restored(host):
+    assert host.app.preferences.rulerUnits == "inches"
+    assert host.app.displayDialogs == "all"
+
+
+def test_script_defines_the_function_it_is_called_as():
+    # the engine calls the installed function with the document, the output
+    # path, the maximum size and the quality, in that order.
+    assert re.search(
+        r"\$\.sgtkExportAsJpeg = function\(doc, outputPath, maxSize, quality\)",
+        EXPORT_AS_JPEG_SCRIPT,
+    )
+    assert "return $.sgtkEncodeJSON(result);" in EXPORT_AS_JPEG_SCRIPT
+    for key in ("path", "width", "height", "elapsed"):
+        assert re.search(r"result\.%s = " % key, EXPORT_AS_JPEG_SCRIPT)
+
+
+def test_script_restores_the_host_settings():
+    finally_block = EXPORT_AS_JPEG_SCRIPT.rsplit("} finally {", 1)[1]
+    assert "app.preferences.rulerUnits = originalRulerUnits;" in finally_block
+    assert "app.displayDialogs = originalDialogMode;" in finally_block
+
+
+def test_script_names_the_copy_like_the_fallback():
+    # the steps name the copy art_tkjpeg.psd, see test_steps_downsize_to_the_max_size.
+    assert 'name.slice(0, dot) + "_tkjpeg" + name.slice(dot)' in EXPORT_AS_JPEG_SCRIPT
+
+
+def test_scripted_export_runs_in_one_call():
+    calls = []
+
+    def _export_in_host(*args):
+        calls.append(args)
+        return dict(path=args[1], width=2048, height=1536, elapsed=0.1)
+
+    host = _Host(4000, 3000)
+    bridge = FakeBridge(dict(sgtkExportAsJpeg=_export_in_host))
+    operation = _get_operation(bridge)
+
+    assert _export(host, operation, None, "/tmp/out.jpg", 2048, 12) == "/tmp/out.jpg"
+    assert calls == [(None, "/tmp/out.jpg", 2048, 12)]
+    assert bridge.round_trips == 2
+
+    # nothing was done step by step.
+    assert host.events == []
+
+
+def test_falls_back_to_steps_when_the_script_fails():
+    def _export_in_host(*args):
+        raise RuntimeError("ExtendScript error")
+
+    host = _Host(4000, 3000)
+    bridge = FakeBridge(dict(sgtkExportAsJpeg=_export_in_host))
+    operation = _get_operation(bridge)
+
+    assert _export(host, operation, None, "/tmp/out.jpg", 2048, 12) == "/tmp/out.jpg"
+    assert host.events == _step_events("art_tkjpeg.psd", 2048, 1536, 12)
+    _assert_restored(host)
+
+    # the function is installed again for the next export.
+    _export(host, operation, None, "/tmp/out.jpg", 2048, 12)
+    assert bridge.installs == 2
+
+
+def test_falls_back_to_steps_when_the_script_cant_be_installed():
+    host = _Host(4000, 3000)
+    operation = _get_operation(FakeBridge())
+
+    assert _export(host, operation, None, "/tmp/out.jpg", 2048, 12) == "/tmp/out.jpg"
+    assert host.events == _step_events("art_tkjpeg.psd", 2048, 1536, 12)
+
+
+def test_exports_by_steps_without_an_operation():
+    host = _Host(100, 50)
+
+    assert _export(host, None, None, "/tmp/out.jpg", 2048, 3) == "/tmp/out.jpg"
+    assert host.events == _step_events("art_tkjpeg.psd", 0, 0, 3)
+
+
+@pytest.mark.parametrize(
+    "width, height, max_size, expected",
+    [
+        (4000, 3000, 2048, (2048, 1536)),
+        (3000, 4000, 512, (384, 512)),
+        (100, 50, 2048, (0, 0)),
+        (2048, 10, 2048, (0, 0)),
+        (4000, 1, 2048, (2048, 1)),
+    ],
+)
+def test_steps_downsize_to_the_max_size(width, height, max_size, expected):
+    host = _Host(width, height)
+    _export_by_steps(host, None, "/tmp/out.jpg", max_size, 12)
+
+    assert host.events == _step_events("art_tkjpeg.psd", expected[0], expected[1], 12)
+    _assert_restored(host)
+
+
+def test_fallback_exports_the_given_document():
+    host = _Host(100, 100)
+    other = _Document(host, "other.psb", 100, 100)
+
+    _export_by_steps(host, other, "/tmp/out.jpg", 2048, 3)
+    assert host.events[0] == ("duplicate", "other_tkjpeg.psb")
+
+
+def test_failed_save_cleans_up():
+    host = _Host(100, 100)
+    host.save_error = "Disk full"
+
+    with pytest.raises(RuntimeError):
+        _export_by_steps(host, None, "/tmp/out.jpg", 2048, 3)
+
+    assert host.events[-1] == ("close", "do not save")
+    _assert_restored(host)
+
+
+def test_fallback_rejects_documents_without_a_size():
+    host = _Host("unknown", "unknown")
+
+    with pytest.raises(RuntimeError):
+        _export_by_steps(host, None, "/tmp/out.jpg", 2048, 3)
+
+    assert host.events == []
+    _assert_restored(host)
+
+
+def test_context_changes_disabled_nests():
+    guard = ContextChangeGuard()
+    assert not guard.disabled
+
+    with guard.disable():
+        with guard.disable():
+            assert guard.disabled
+        # the outer block still disables context changes.
+        assert guard.disabled
+
+    assert not guard.disabled
+
+
+def test_context_changes_enabled_again_after_an_error():
+    guard = ContextChangeGuard()
+
+    with pytest.raises(RuntimeError):
+        with guard.disable():
+            raise RuntimeError("Export failed")
+
+    assert not guard.disabled
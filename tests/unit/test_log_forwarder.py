@@ -0,0 +1,104 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import threading
+
+from tk_photoshopcc.log_forwarder import LogForwarder
+
+
+class _Bridge(object):
+    """
+    Records the log messages sent to the panel.
+    """
+
+    def __init__(self):
+        self.messages = []
+        self.on_log_message = None
+
+    def log_message(self, level, message):
+        self.messages.append((level, message))
+        if self.on_log_message:
+            self.on_log_message(level, message)
+
+
+def test_one_panel_message_per_run_of_the_same_level():
+    bridge = _Bridge()
+    forwarder = LogForwarder(bridge, buffer_size=10, batch_size=10)
+
+    forwarder.add("info", "first")
+    forwarder.add("info", "second")
+    forwarder.add("error", "third")
+    forwarder.add("info", "fourth")
+    assert bridge.messages == []
+
+    forwarder.flush()
+    assert bridge.messages == [
+        ("info", "first\nsecond"),
+        ("error", "third"),
+        ("info", "fourth"),
+    ]
+
+    forwarder.flush()
+    assert len(bridge.messages) == 3
+
+
+def test_flushes_once_the_batch_is_ready():
+    bridge = _Bridge()
+    forwarder = LogForwarder(bridge, buffer_size=10, batch_size=2)
+
+    forwarder.add("info", "first")
+    assert bridge.messages == []
+    forwarder.add("info", "second")
+    assert bridge.messages == [("info", "first\nsecond")]
+
+
+def test_other_threads_leave_the_flush_to_the_main_thread():
+    bridge = _Bridge()
+    forwarder = LogForwarder(bridge, buffer_size=10, batch_size=1)
+
+    thread = threading.Thread(target=forwarder.add, args=("info", "threaded"))
+    thread.start()
+    thread.join()
+    assert bridge.messages == []
+
+    forwarder.flush()
+    assert bridge.messages == [("info", "threaded")]
+
+
+def test_dropped_messages_are_reported():
+    bridge = _Bridge()
+    forwarder = LogForwarder(bridge, buffer_size=2, batch_size=10)
+
+    for index in range(5):
+        forwarder.add("info", str(index))
+    assert forwarder.dropped == 3
+
+    forwarder.flush()
+    assert forwarder.dropped == 0
+    assert bridge.messages[0][0] == "warn"
+    assert "3 log messages were dropped" in bridge.messages[0][1]
+    assert bridge.messages[1:] == [("info", "3\n4")]
+
+
+def test_messages_logged_while_flushing_wait_for_the_next_flush():
+    bridge = _Bridge()
+    forwarder = LogForwarder(bridge, buffer_size=10, batch_size=1)
+
+    def _on_log_message(level, message):
+        if message == "first":
+            forwarder.add("debug", "network debug output")
+
+    bridge.on_log_message = _on_log_message
+
+    forwarder.add("info", "first")
+    assert bridge.messages == [("info", "first")]
+
+    forwarder.flush()
+    assert bridge.messages == [("info", "first"), ("debug", "network debug output")]
@@ -0,0 +1,214 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import logging
+
+import pytest
+
+from tk_photoshopcc import message_pump
+from tk_photoshopcc.message_pump import MessagePump
+
+
+class _Clock(object):
+    """
+    A clock that only moves when told to.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+
+class _Signal(object):
+    """
+    The connect/disconnect/emit part of a Qt signal.
+    """
+
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+    def disconnect(self, slot):
+        self.slots.remove(slot)
+
+    def emit(self, *args):
+        for slot in list(self.slots):
+            slot(*args)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(message_pump, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def pump(clock):
+    pump = MessagePump(0.05, logging.getLogger(__name__))
+    # ticks are run by the tests rather than by the Qt event loop.
+    pump.ticks_scheduled = 0
+
+    def _schedule_tick():
+        pump.ticks_scheduled += 1
+
+    pump._schedule_tick = _schedule_tick
+    return pump
+
+
+def test_post_schedules_a_tick(pump):
+    handled = []
+    pump.post(handled.append, 1)
+
+    assert pump.ticks_scheduled == 1
+    assert pump.depth == 1
+    assert handled == []
+
+    pump.pump()
+    assert handled == [1]
+    assert pump.depth == 0
+
+
+def test_budget_spreads_messages_over_ticks(pump, clock):
+    handled = []
+
+    def _slow_handler(value):
+        handled.append(value)
+        clock.now += 0.02
+
+    for value in range(5):
+        pump.post(_slow_handler, value)
+
+    # 3 messages take 60ms, past the 50ms budget.
+    pump.pump()
+    assert handled == [0, 1, 2]
+    assert pump.depth == 2
+
+    pump.pump()
+    assert handled == [0, 1, 2, 3, 4]
+    assert pump.depth == 0
+
+
+def test_at_least_one_message_per_tick(pump, clock):
+    handled = []
+
+    def _very_slow_handler(value):
+        handled.append(value)
+        clock.now += 1.0
+
+    pump.post(_very_slow_handler, 1)
+    pump.post(_very_slow_handler, 2)
+
+    pump.pump()
+    assert handled == [1]
+    pump.pump()
+    assert handled == [1, 2]
+
+
+def test_bulk_messages_handled_in_one_call(pump):
+    calls = []
+    signal = _Signal()
+    pump.connect(signal, calls.append, pump.LOW, bulk=True)
+
+    for value in range(3):
+        signal.emit("info", value)
+
+    pump.pump()
+    assert calls == [[("info", 0), ("info", 1), ("info", 2)]]
+
+
+def test_handler_errors_dont_stop_the_pump(pump):
+    handled = []
+
+    def _failing_handler():
+        raise RuntimeError("boom")
+
+    pump.post(_failing_handler)
+    pump.post(handled.append, 1)
+
+    pump.pump()
+    assert handled == [1]
+
+
+def test_disconnect_drops_queued_messages(pump):
+    handled = []
+    signal = _Signal()
+    pump.connect(signal, handled.append)
+
+    signal.emit(1)
+    pump.disconnect()
+    signal.emit(2)
+
+    assert signal.slots == []
+    assert pump.depth == 0
+    pump.pump()
+    assert handled == []
+
+
+def test_metrics(pump, clock):
+    def _handler(value):
+        clock.now += 0.01
+
+    for value in range(3):
+        pump.post(_handler, value)
+    pump.pump()
+
+    metrics = pump.get_metrics()
+    assert metrics["depth"] == 0
+    assert metrics["max_depth"] == 3
+    assert metrics["handled"] == 3
+    assert metrics["ticks"] == 1
+    assert metrics["last_tick_time"] == pytest.approx(0.03)
+    assert metrics["mean_tick_time"] == pytest.approx(0.03)
+    assert metrics["lanes"][pump.NORMAL]["handled"] == 3
+    assert metrics["lanes"][pump.NORMAL]["calls"] == 3
+
+
+def test_user_facing_messages_keep_their_order(pump):
+    handled = []
+    command_received = _Signal()
+    active_document_changed = _Signal()
+    state_requested = _Signal()
+    logging_received = _Signal()
+
+    # connected the way the engine connects the bridge's signals.
+    pump.connect(command_received, lambda uid: handled.append(("command", uid)))
+    pump.connect(
+        active_document_changed, lambda path: handled.append(("document", path))
+    )
+    pump.connect(state_requested, lambda: handled.append(("state",)))
+    pump.connect(
+        logging_received,
+        lambda messages: handled.append(("logging", len(messages))),
+        pump.LOW,
+        bulk=True,
+    )
+
+    logging_received.emit("info", "message")
+    active_document_changed.emit("/a.psd")
+    command_received.emit(1)
+    state_requested.emit()
+    active_document_changed.emit("/b.psd")
+    logging_received.emit("info", "message")
+    command_received.emit(2)
+
+    pump.pump()
+    assert handled == [
+        ("document", "/a.psd"),
+        ("command", 1),
+        ("state",),
+        ("document", "/b.psd"),
+        ("command", 2),
+        ("logging", 2),
+    ]
@@ -0,0 +1,83 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+
+import pytest
+
+from tk_photoshopcc import negative_cache
+from tk_photoshopcc.negative_cache import NegativeCache
+
+
+class _Clock(object):
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(negative_cache, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def document(tmp_path):
+    path = tmp_path / "document.psd"
+    path.write_bytes(b"")
+    os.utime(str(path), (1000, 1000))
+    return str(path)
+
+
+def test_remembers_paths(clock, document):
+    cache = NegativeCache(60)
+    assert not cache.contains(document)
+
+    cache.add(document)
+    assert cache.contains(document)
+    assert cache.contains(document)
+    assert cache.hits == 2
+
+
+def test_entries_expire(clock, document):
+    cache = NegativeCache(60)
+    cache.add(document)
+
+    clock.now += 61
+    assert not cache.contains(document)
+
+    # expired entries are dropped rather than kept around.
+    clock.now -= 61
+    assert not cache.contains(document)
+
+
+def test_modified_document_is_forgotten(clock, document):
+    cache = NegativeCache(60)
+    cache.add(document)
+
+    os.utime(document, (2000, 2000))
+    assert not cache.contains(document)
+
+
+def test_discard_and_clear(clock, document, tmp_path):
+    other = str(tmp_path / "other.psd")
+    cache = NegativeCache(60)
+    cache.add(document)
+    cache.add(other)
+
+    cache.discard(document)
+    assert not cache.contains(document)
+    assert cache.contains(other)
+
+    cache.clear()
+    assert not cache.contains(other)
@@ -0,0 +1,49 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import logging
+
+import pytest
+
+from tk_photoshopcc.recent_projects import RecentProjects
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "site" / "recent_projects.json")
+
+
+def test_most_recent_first(path):
+    recent = RecentProjects(path, 3, logger)
+    for project_id in (1, 2, 3, 1, 4):
+        recent.add(project_id)
+
+    assert recent.project_ids == [4, 1, 3]
+
+
+def test_survives_relaunch(path):
+    RecentProjects(path, 3, logger).add(1)
+    RecentProjects(path, 3, logger).add(2)
+
+    assert RecentProjects(path, 3, logger).project_ids == [2, 1]
+
+
+def test_unreadable_history_is_ignored(path, tmp_path):
+    (tmp_path / "site").mkdir()
+    with open(path, "w") as fh:
+        fh.write("not json")
+
+    recent = RecentProjects(path, 3, logger)
+    assert recent.project_ids == []
+
+    recent.add(1)
+    assert RecentProjects(path, 3, logger).project_ids == [1]
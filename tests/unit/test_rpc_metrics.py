@@ -0,0 +1,87 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import json
+
+import pytest
+
+from tk_photoshopcc.rpc_metrics import RPCMetrics
+
+
+class _Bridge(object):
+    def ping(self):
+        return "pong"
+
+
+def test_aggregation():
+    metrics = RPCMetrics(_Bridge())
+    for elapsed in range(1, 101):
+        metrics.record("rpc_get", elapsed / 1000.0)
+    metrics.record("ping", 0.5)
+
+    rpc_get = metrics.get_metrics()["rpc_get"]
+    assert rpc_get["count"] == 100
+    assert rpc_get["total"] == pytest.approx(5.05)
+    assert rpc_get["mean"] == pytest.approx(0.0505)
+    # nearest rank over the sorted samples 0.001 .. 0.100.
+    assert rpc_get["p50"] == pytest.approx(0.051)
+    assert rpc_get["p90"] == pytest.approx(0.090)
+    assert rpc_get["p99"] == pytest.approx(0.099)
+    assert rpc_get["max"] == pytest.approx(0.100)
+
+    ping = metrics.get_metrics()["ping"]
+    assert ping["count"] == 1
+    assert ping["p50"] == ping["p99"] == ping["max"] == 0.5
+
+
+def test_percentiles_only_cover_recent_samples(monkeypatch):
+    monkeypatch.setattr(RPCMetrics, "MAX_SAMPLES", 10)
+    metrics = RPCMetrics(_Bridge())
+    for _ in range(90):
+        metrics.record("rpc_get", 1.0)
+    for _ in range(10):
+        metrics.record("rpc_get", 0.1)
+
+    rpc_get = metrics.get_metrics()["rpc_get"]
+    assert rpc_get["count"] == 100
+    assert rpc_get["total"] == pytest.approx(91.0)
+    assert rpc_get["max"] == pytest.approx(0.1)
+
+
+def test_install_and_uninstall():
+    bridge = _Bridge()
+    metrics = RPCMetrics(bridge)
+
+    metrics.install()
+    assert bridge.ping() == "pong"
+    assert metrics.get_metrics()["ping"]["count"] == 1
+
+    metrics.uninstall()
+    bridge.ping()
+    assert metrics.get_metrics()["ping"]["count"] == 1
+
+
+def test_write_and_rotate(tmp_path, monkeypatch):
+    monkeypatch.setattr(RPCMetrics, "MAX_BACKUPS", 2)
+    path = str(tmp_path / "metrics.json")
+    metrics = RPCMetrics(_Bridge())
+    metrics.record("ping", 0.5)
+
+    for session in range(4):
+        RPCMetrics.rotate_file(path)
+        metrics.write(path)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "metrics.json",
+        "metrics.json.1",
+        "metrics.json.2",
+    ]
+    with open(path) as fh:
+        assert json.load(fh)["methods"]["ping"]["count"] == 1
@@ -0,0 +1,83 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import logging
+
+import pytest
+
+from fake_bridge import FakeBridge
+from tk_photoshopcc.scripted_operation import ScriptedOperation
+
+SCRIPT = """
+$.sgtkAdd = function(a, b) {
+    return $.sgtkEncodeJSON({sum: a + b});
+};
+"""
+
+
+def _add(a, b):
+    return dict(sum=a + b)
+
+
+def _get_operation(bridge):
+    return ScriptedOperation(bridge, SCRIPT, logging.getLogger(__name__))
+
+
+def test_installed_once_then_one_round_trip_per_call():
+    bridge = FakeBridge(dict(sgtkAdd=_add))
+    operation = _get_operation(bridge)
+
+    assert operation(1, 2) == dict(sum=3)
+    assert bridge.round_trips == 2
+
+    assert operation(3, 4) == dict(sum=7)
+    assert bridge.round_trips == 3
+    assert bridge.installs == 1
+
+
+def test_unavailable_when_the_install_fails():
+    bridge = FakeBridge()
+    operation = _get_operation(bridge)
+
+    assert not operation.available
+    with pytest.raises(RuntimeError):
+        operation(1, 2)
+
+    # the install isn't attempted again until invalidated.
+    assert bridge.round_trips == 1
+    bridge.functions["sgtkAdd"] = _add
+    assert not operation.available
+
+    operation.invalidate()
+    assert operation.available
+    assert operation(1, 2) == dict(sum=3)
+
+
+def test_failed_call_reinstalls_on_the_next_one():
+    bridge = FakeBridge(dict(sgtkAdd=_add))
+    operation = _get_operation(bridge)
+    operation(1, 2)
+
+    bridge.functions_lost = True
+    with pytest.raises(RuntimeError):
+        operation(1, 2)
+
+    assert operation(1, 2) == dict(sum=3)
+    assert bridge.installs == 2
+
+
+def test_invalidate_reinstalls():
+    bridge = FakeBridge(dict(sgtkAdd=_add))
+    operation = _get_operation(bridge)
+    operation(1, 2)
+
+    operation.invalidate()
+    operation(1, 2)
+    assert bridge.installs == 2
@@ -0,0 +1,113 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import logging
+
+import pytest
+
+from fake_bridge import FakeBridge, FakeProxy, host_getattr
+from tk_photoshopcc.snapshot import PropertySnapshot
+
+ATTR_PATHS = ["name", "width.value", "height.value", "missing.value"]
+
+EXPECTED = {
+    "name": "shot_010.psd",
+    "width.value": 1920,
+    "height.value": 1080,
+    "missing.value": None,
+}
+
+
+def _snapshot(target, paths):
+    """
+    What $.sgtkSnapshot does in the host.
+    """
+    values = dict()
+    for path in paths:
+        value = target
+        try:
+            for name in path.split("."):
+                value = host_getattr(value, name)
+        except (AttributeError, KeyError):
+            value = None
+        values[path] = value
+    return values
+
+
+@pytest.fixture
+def document():
+    def _get_document(bridge):
+        return FakeProxy(
+            bridge,
+            name="shot_010.psd",
+            width=FakeProxy(bridge, value=1920),
+            height=FakeProxy(bridge, value=1080),
+        )
+
+    return _get_document
+
+
+def test_single_round_trip(document):
+    bridge = FakeBridge(dict(sgtkSnapshot=_snapshot))
+    snapshot = PropertySnapshot(bridge, logging.getLogger(__name__))
+    doc = document(bridge)
+
+    # the first snapshot installs the function.
+    assert snapshot.snapshot(doc, ATTR_PATHS) == EXPECTED
+    assert bridge.round_trips == 2
+
+    bridge.round_trips = 0
+    assert snapshot.snapshot(doc, ATTR_PATHS) == EXPECTED
+    assert bridge.round_trips == 1
+    assert bridge.installs == 1
+
+
+def test_fallback_reads_attributes_individually(document):
+    # the bridge can't install anything, so the snapshot function isn't there.
+    bridge = FakeBridge()
+    snapshot = PropertySnapshot(bridge, logging.getLogger(__name__))
+    doc = document(bridge)
+
+    assert snapshot.snapshot(doc, ATTR_PATHS) == EXPECTED
+
+    # the failed install is only attempted once.
+    # one round trip per attribute read, including the one that fails.
+    bridge.round_trips = 0
+    assert snapshot.snapshot(doc, ATTR_PATHS) == EXPECTED
+    assert bridge.round_trips == 6
+
+
+def test_fallback_when_the_function_is_lost(document):
+    bridge = FakeBridge(dict(sgtkSnapshot=_snapshot))
+    snapshot = PropertySnapshot(bridge, logging.getLogger(__name__))
+    doc = document(bridge)
+    snapshot.snapshot(doc, ATTR_PATHS)
+
+    # the host forgot the function. this snapshot falls back to reading the
+    # attributes one by one, and the next one installs the function again.
+    bridge.functions_lost = True
+    assert snapshot.snapshot(doc, ATTR_PATHS) == EXPECTED
+    assert bridge.installs == 1
+
+    bridge.round_trips = 0
+    assert snapshot.snapshot(doc, ATTR_PATHS) == EXPECTED
+    assert bridge.installs == 2
+    assert bridge.round_trips == 2
+
+
+def test_invalidate_reinstalls(document):
+    bridge = FakeBridge(dict(sgtkSnapshot=_snapshot))
+    snapshot = PropertySnapshot(bridge, logging.getLogger(__name__))
+    doc = document(bridge)
+    snapshot.snapshot(doc, ATTR_PATHS)
+
+    snapshot.invalidate()
+    assert snapshot.snapshot(doc, ATTR_PATHS) == EXPECTED
+    assert bridge.installs == 2
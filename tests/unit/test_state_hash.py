@@ -0,0 +1,47 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+from tk_photoshopcc.state_hash import get_commands_hash
+
+
+def _get_commands():
+    return dict(
+        favorites=[dict(uid=1, display_name="Publish...", icon_path="/a.png")],
+        commands=[
+            dict(uid=2, display_name="Load...", icon_path="/b.png"),
+            dict(uid=3, display_name="Snapshot...", icon_path="/c.png"),
+        ],
+    )
+
+
+def test_same_payload_same_hash():
+    first = _get_commands()
+    # the same content built in a different key order.
+    second = dict(
+        (section, [dict(reversed(list(c.items()))) for c in commands])
+        for section, commands in reversed(list(_get_commands().items()))
+    )
+    assert get_commands_hash(first) == get_commands_hash(second)
+
+
+def test_changed_payload_changes_hash():
+    commands = _get_commands()
+    original = get_commands_hash(commands)
+
+    commands["commands"][0]["display_name"] = "Load File..."
+    assert get_commands_hash(commands) != original
+
+
+def test_command_order_changes_hash():
+    commands = _get_commands()
+    original = get_commands_hash(commands)
+
+    commands["commands"].reverse()
+    assert get_commands_hash(commands) != original
@@ -0,0 +1,151 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import re
+
+import pytest
+
+from tk_photoshopcc.template_index import TemplateIndex
+
+ROOT = "/mnt/projects/demo"
+
+
+class _Template(object):
+    """
+    A path template with plain keys, like ``shots/{Shot}/{name}.psd``.
+    """
+
+    def __init__(self, name, definition, root_path=ROOT):
+        self.name = name
+        self.definition = definition
+        self.root_path = root_path
+        self.parses = 0
+
+        pattern = re.sub(r"\\{(\w+)\\}", r"(?P<\1>[^/]+)", re.escape(definition))
+        self._regex = re.compile("^%s/%s$" % (re.escape(root_path), pattern), re.I)
+
+    def get_fields(self, path):
+        self.parses += 1
+        match = self._regex.match(path.replace("\\", "/"))
+        if not match:
+            raise ValueError("%s doesn't match %s" % (path, self.name))
+        return match.groupdict()
+
+    def validate(self, path):
+        try:
+            self.get_fields(path)
+        except ValueError:
+            return False
+        return True
+
+
+class _StringTemplate(object):
+    """
+    A template that isn't a path template.
+    """
+
+    name = "publish_name"
+
+    def validate(self, path):
+        return False
+
+
+class _Toolkit(object):
+    def __init__(self, templates):
+        self.templates = dict((t.name, t) for t in templates)
+
+
+@pytest.fixture
+def templates():
+    return [
+        _Template("shot_work", "shots/{Shot}/work/{name}.psd"),
+        _Template("asset_work", "assets/{Asset}/work/{name}.psd"),
+        _Template("shot_publish", "shots/{Shot}/publish/{name}.psd"),
+        _Template("shot_review", "shots/{Shot}/review_{name}.jpg"),
+        _StringTemplate(),
+    ]
+
+
+def test_the_toolkit_instance_is_left_untouched(templates):
+    tk = _Toolkit(templates)
+    TemplateIndex(tk)
+    assert not hasattr(tk, "templates_from_path")
+
+
+def test_validate_rejects_paths_outside_the_static_part(templates):
+    index = TemplateIndex(_Toolkit(templates))
+    shot_work = templates[0]
+
+    assert not index.validate(shot_work, ROOT + "/assets/chair/work/model.psd")
+    assert shot_work.parses == 0
+
+    assert index.validate(shot_work, ROOT + "/shots/sh010/work/comp.psd")
+    assert not index.validate(shot_work, ROOT + "/shots/sh010/work/comp.jpg")
+
+
+def test_validate_ignores_case_and_separators(templates):
+    index = TemplateIndex(_Toolkit(templates))
+    asset_work = templates[1]
+
+    path = (ROOT + "/ASSETS/chair/work/model.psd").replace("/", "\\")
+    assert index.validate(asset_work, path)
+
+
+def test_validate_defers_to_templates_without_a_path(templates):
+    index = TemplateIndex(_Toolkit(templates))
+    assert not index.validate(templates[-1], ROOT + "/shots/sh010/work/comp.psd")
+
+
+def test_get_fields_is_remembered(templates):
+    index = TemplateIndex(_Toolkit(templates))
+    shot_work = templates[0]
+    path = ROOT + "/shots/sh010/work/comp.psd"
+
+    fields = index.get_fields(shot_work, path)
+    assert fields == dict(Shot="sh010", name="comp")
+
+    # callers may modify the fields they get back.
+    fields["name"] = "changed"
+    assert index.get_fields(shot_work, path) == dict(Shot="sh010", name="comp")
+    assert shot_work.parses == 1
+
+
+def test_get_fields_raises_for_paths_that_dont_match(templates):
+    index = TemplateIndex(_Toolkit(templates))
+
+    with pytest.raises(ValueError):
+        index.get_fields(templates[0], "/elsewhere/comp.psd")
+
+
+def test_reloaded_templates_are_reindexed(templates):
+    tk = _Toolkit(templates)
+    index = TemplateIndex(tk)
+    path = ROOT + "/shots/sh010/work/comp.psd"
+    index.get_fields(templates[0], path)
+
+    # the configuration is reloaded with a template of the same name.
+    reloaded = _Template("shot_work", "shots/{Shot}/work/{name}.psd")
+    tk.templates = dict(shot_work=reloaded)
+
+    assert index.get_fields(reloaded, path) == dict(Shot="sh010", name="comp")
+    assert reloaded.parses == 1
+
+
+def test_fields_memo_is_bounded(templates, monkeypatch):
+    monkeypatch.setattr(TemplateIndex, "MAX_FIELDS_CACHE_SIZE", 2)
+    index = TemplateIndex(_Toolkit(templates))
+    shot_work = templates[0]
+
+    for name in ("a", "b", "c"):
+        index.get_fields(shot_work, ROOT + "/shots/sh010/work/%s.psd" % name)
+    assert len(index._fields_cache) == 2
+
+    index.get_fields(shot_work, ROOT + "/shots/sh010/work/a.psd")
+    assert shot_work.parses == 4
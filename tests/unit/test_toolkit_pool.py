@@ -0,0 +1,135 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import logging
+import os
+
+import pytest
+
+from tk_photoshopcc.toolkit_pool import ToolkitPool
+
+
+class _PipelineConfiguration(object):
+    def __init__(self, path):
+        self._path = path
+
+    def get_path(self):
+        return self._path
+
+    def get_config_location(self):
+        return os.path.join(self._path, "config")
+
+
+class _Toolkit(object):
+    """
+    The parts of a Toolkit API instance the pool looks at.
+    """
+
+    def __init__(self, config_path, roots):
+        self.pipeline_configuration = _PipelineConfiguration(config_path)
+        self.roots = roots
+
+
+class _NotUnderPipeline(Exception):
+    pass
+
+
+@pytest.fixture
+def studio(tmp_path):
+    """
+    Two projects, each with its own pipeline configuration.
+    """
+    projects = dict()
+    for name in ("alpha", "beta"):
+        config = tmp_path / "configs" / name
+        (config / "config" / "core").mkdir(parents=True)
+        (config / "config" / "core" / "templates.yml").write_text("keys: {}")
+        root = tmp_path / "projects" / name
+        root.mkdir(parents=True)
+        projects[name] = (str(config), str(root))
+    return projects
+
+
+@pytest.fixture
+def created(studio):
+    return []
+
+
+@pytest.fixture
+def pool(studio, created):
+    def factory(path):
+        for config, root in studio.values():
+            if path.startswith(root + os.sep):
+                tk = _Toolkit(config, dict(primary=root))
+                created.append(tk)
+                return tk
+        raise _NotUnderPipeline(path)
+
+    return ToolkitPool(factory, logging.getLogger(__name__))
+
+
+def test_reuses_instance_per_configuration(pool, studio, created):
+    _, alpha_root = studio["alpha"]
+    _, beta_root = studio["beta"]
+
+    first = pool.get(os.path.join(alpha_root, "shot", "a.psd"))
+    second = pool.get(os.path.join(alpha_root, "shot", "b.psd"))
+    other = pool.get(os.path.join(beta_root, "c.psd"))
+
+    assert first is second
+    assert other is not first
+    assert len(created) == 2
+    assert pool.get_stats() == dict(instances=2, hits=1, misses=2, invalidations=0)
+
+
+def test_added_instance_is_reused(pool, studio, created):
+    config, root = studio["alpha"]
+    tk = _Toolkit(config, dict(primary=root))
+    pool.add(tk)
+
+    assert pool.get(os.path.join(root, "a.psd")) is tk
+    assert created == []
+
+
+def test_sibling_folder_is_not_under_root(pool, studio, created):
+    _, root = studio["alpha"]
+    pool.get(os.path.join(root, "a.psd"))
+
+    with pytest.raises(_NotUnderPipeline):
+        pool.get(root + "_old" + os.sep + "a.psd")
+
+
+def test_configuration_change_drops_instance(pool, studio, created):
+    config, root = studio["alpha"]
+    path = os.path.join(root, "a.psd")
+    first = pool.get(path)
+
+    templates = os.path.join(config, "config", "core", "templates.yml")
+    with open(templates, "w") as fh:
+        fh.write("keys: {shot: {type: str}}")
+
+    second = pool.get(path)
+    assert second is not first
+    assert pool.get_stats()["invalidations"] == 1
+
+
+def test_factory_errors_propagate(pool, tmp_path):
+    with pytest.raises(_NotUnderPipeline):
+        pool.get(str(tmp_path / "elsewhere" / "a.psd"))
+    assert pool.get_stats()["instances"] == 0
+
+
+def test_clear(pool, studio, created):
+    _, root = studio["alpha"]
+    pool.get(os.path.join(root, "a.psd"))
+
+    pool.clear()
+    pool.get(os.path.join(root, "a.psd"))
+    assert len(created) == 2